@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+benchmark of compressing loaded entries (indirect mode), for the
+tradeoff between load time, iteration (and sorted iteration) time and
+memory, with different block sizes and compression levels
+(see EntryList.startCompression, and entry_block_size and
+entry_compress_level prefs)
+
+for each config, synthetic entries (see benchmarks/synthetic.py) are
+loaded into a new EntryList in a new process, and time of loading,
+iterating, and sorting and iterating in sorted order, size of EntryList
+data and growth of peak RSS are recorded
+
+usage:
+	python3 benchmarks/entry_list.py [-o RESULT.json]
+		[--configs none,1:1,4:1,4:6,16:1,64:1] [--entries N] ...
+
+each config is "none" (no compression) or BLOCK_SIZE:LEVEL
+"""
+
+from os.path import dirname, abspath
+import sys
+import json
+import platform
+import subprocess
+import tempfile
+from time import perf_counter as now
+from typing import (
+	Dict,
+	List,
+	Tuple,
+	Any,
+	Optional,
+)
+
+rootDir = dirname(dirname(abspath(__file__)))
+if rootDir not in sys.path:
+	sys.path.insert(0, rootDir)
+
+from pyglossary.core import VERSION
+from pyglossary.glossary import Glossary
+from pyglossary.entry_list import EntryList
+
+from benchmarks.synthetic import defaultParams, generateEntries
+from benchmarks.memory import peakRss
+
+import logging
+log = logging.getLogger("root")
+
+defaultConfigs = "none,1:1,4:1,4:6,16:1,64:1"
+
+# (blockSize, level), or None for no compression
+ConfigType = Optional[Tuple[int, int]]
+
+
+def _parseConfig(value: str) -> ConfigType:
+	if value == "none":
+		return None
+	blockSize, sep, level = value.partition(":")
+	if not sep:
+		raise ValueError(f"invalid config {value!r}, BLOCK_SIZE:LEVEL expected")
+	return int(blockSize), int(level)
+
+
+def _storeSize(lst: EntryList) -> int:
+	"size of data and columns of EntryList in bytes"
+	size = len(lst._arena) + len(lst._blockArena) + len(lst._formats)
+	for column in (lst._offsets, lst._wordLens, lst._defiLens, lst._blockOffsets):
+		size += len(column) * column.itemsize
+	return size
+
+
+def measureConfig(
+	config: ConfigType,
+	params: Dict[str, Any],
+) -> Dict[str, Any]:
+	"""
+	must be called in a new process, because peak RSS can not be reset
+	"""
+	glos = Glossary()
+	# generated before loading, so time and memory of generating them
+	# are not counted
+	rawEntries = [
+		entry.getRaw(glos)
+		for entry in generateEntries(glos, **params)
+	]
+	byteCount = sum(len(raw[0]) + len(raw[1]) for raw in rawEntries)
+
+	rssBefore = peakRss()
+	lst = EntryList()
+	if config is not None:
+		lst.blockSize, lst.level = config
+		lst.startCompression()
+	t0 = now()
+	for rawEntry in rawEntries:
+		lst.append(rawEntry)
+	loadTime = now() - t0
+	rssAfter = peakRss()
+
+	t0 = now()
+	for _ in lst:
+		pass
+	iterTime = now() - t0
+
+	t0 = now()
+	lst.sort(bytes.lower)
+	for _ in lst:
+		pass
+	sortTime = now() - t0
+
+	result = {
+		"entries": len(lst),
+		"bytes": byteCount,
+		"loadTime": loadTime,
+		"iterTime": iterTime,
+		"sortTime": sortTime,
+		"storeBytes": _storeSize(lst),
+	}
+	if rssBefore is not None:
+		result["rssBytes"] = rssAfter - rssBefore
+	return result
+
+
+def runConfig(config: str, params: Dict[str, Any]) -> Dict[str, Any]:
+	with tempfile.NamedTemporaryFile(suffix=".json") as resultFile:
+		proc = subprocess.run(
+			[
+				sys.executable,
+				abspath(__file__),
+				"--child",
+				json.dumps({"config": config, "params": params}),
+				resultFile.name,
+			],
+			stderr=subprocess.PIPE,
+		)
+		if proc.returncode != 0:
+			return {"error": proc.stderr.decode("utf-8", errors="replace")}
+		with open(resultFile.name, encoding="utf-8") as _file:
+			return json.load(_file)
+
+
+def main() -> None:
+	import argparse
+	if len(sys.argv) == 4 and sys.argv[1] == "--child":
+		log.setLevel(logging.ERROR)
+		args = json.loads(sys.argv[2])
+		result = measureConfig(_parseConfig(args["config"]), args["params"])
+		with open(sys.argv[3], "w", encoding="utf-8") as _file:
+			json.dump(result, _file)
+		return
+
+	parser = argparse.ArgumentParser(
+		description="benchmark of compressing loaded entries",
+	)
+	parser.add_argument(
+		"-o",
+		"--output",
+		dest="outputJson",
+		default="",
+		help="save results into this json file",
+	)
+	parser.add_argument(
+		"--configs",
+		default=defaultConfigs,
+		help="comma-separated: none, or BLOCK_SIZE:LEVEL",
+	)
+	params = defaultParams()
+	params["entries"] = 100000
+	del params["resources"]
+	del params["resource_size"]
+	for key, value in params.items():
+		parser.add_argument(
+			"--" + key.replace("_", "-"),
+			dest=key,
+			type=type(value),
+			default=value,
+		)
+	args = parser.parse_args()
+
+	configs = args.configs.split(",")
+	for config in configs:
+		try:
+			_parseConfig(config)
+		except ValueError as e:
+			log.error(str(e))
+			sys.exit(1)
+
+	params = {key: getattr(args, key) for key in params}
+	results = {}  # type: Dict[str, Dict[str, Any]]
+	lines = []  # type: List[str]
+	for config in configs:
+		result = results[config] = runConfig(config, params)
+		if "error" in result:
+			lines.append(f"{config:8s} ERROR: {result['error'].strip()}")
+			continue
+		line = (
+			f"{config:8s}"
+			f"  load: {result['loadTime']:6.2f}s"
+			f"  iter: {result['iterTime']:6.2f}s"
+			f"  sort+iter: {result['sortTime']:6.2f}s"
+			f"  store: {result['storeBytes'] / result['entries']:7.1f} bytes/entry"
+		)
+		if "rssBytes" in result:
+			line += f"  rss: {result['rssBytes'] / result['entries']:7.1f} bytes/entry"
+		lines.append(line)
+	print("\n".join(lines))
+
+	if args.outputJson:
+		with open(args.outputJson, "w", encoding="utf-8") as _file:
+			json.dump({
+				"version": VERSION,
+				"python": platform.python_version(),
+				"params": params,
+				"results": results,
+			}, _file, indent="\t")
+
+
+if __name__ == "__main__":
+	main()
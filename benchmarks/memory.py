@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+peak memory benchmark of conversions, in direct and indirect mode
+
+for each reader->writer pair and each glossary size, a synthetic glossary
+(see benchmarks/synthetic.py) is converted in a new process, and peak RSS
+(above the RSS of the process before conversion) and peak memory traced by
+tracemalloc are recorded, with top allocators (source lines) near the peak.
+
+then a line is fitted to peak memory of each pair and mode, over glossary
+sizes, and its slope (bytes per entry) is recorded. in direct mode it
+should be close to zero, a reader or writer that keeps some state for
+every entry makes it grow.
+peak RSS is coarse for small glossaries (memory freed by Python is reused
+by later allocations), numbers traced by tracemalloc are more precise.
+
+usage:
+	python3 benchmarks/memory.py [-o RESULT.json] [--sizes 1000,5000,20000]
+		[--pairs Tabfile:Stardict,Stardict:Tabfile,...] [--modes direct,indirect]
+		[--top N] [--no-tracemalloc] [--alt-ratio R] [--html-ratio R] ...
+
+	python3 benchmarks/memory.py --compare OLD.json NEW.json
+		[--threshold 0.2] [--min-delta 32]
+
+--compare exits with status 1 if bytes per entry of any pair and mode has
+grown more than threshold (0.2 means 20%) and more than min-delta bytes
+"""
+
+from os.path import join, dirname, abspath, relpath
+import os
+import sys
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import tracemalloc
+from time import perf_counter as now
+from typing import (
+	Dict,
+	List,
+	Tuple,
+	Any,
+	Optional,
+)
+
+rootDir = dirname(dirname(abspath(__file__)))
+if rootDir not in sys.path:
+	sys.path.insert(0, rootDir)
+
+from pyglossary.core import VERSION
+from pyglossary.glossary import Glossary
+
+from benchmarks.synthetic import defaultParams, generateGlossary
+from benchmarks.throughput import benchFormats, formatsWriteOptions
+
+import logging
+log = logging.getLogger("root")
+
+modes = ("direct", "indirect")
+
+
+def _defaultSortKey(b_word: bytes) -> bytes:
+	return b_word
+
+
+def peakRss() -> Optional[int]:
+	"peak resident set size of this process in bytes, or None"
+	try:
+		import resource
+	except ImportError:  # Windows
+		return None
+	maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == "darwin":
+		return maxrss
+	return maxrss * 1024
+
+
+class MemorySamplerUI(object):
+	"""
+	passed to Glossary as ui, takes a tracemalloc snapshot on progress
+	updates whenever traced memory has grown 10% since the last snapshot,
+	so that top allocators can be reported near the peak
+	"""
+	def __init__(self) -> None:
+		self.pref = {}
+		self.snapshot = None
+		self._snapshotSize = 0
+
+	def progressInit(self, title: str) -> None:
+		pass
+
+	def progress(self, rat: float, text: str = "") -> None:
+		if not tracemalloc.is_tracing():
+			return
+		current, _ = tracemalloc.get_traced_memory()
+		if current < self._snapshotSize * 1.1:
+			return
+		self._snapshotSize = current
+		self.snapshot = tracemalloc.take_snapshot()
+
+	def progressEnd(self) -> None:
+		self.progress(1.0)
+
+
+def _topAllocators(
+	snapshot: "tracemalloc.Snapshot",
+	top: int,
+) -> List[Tuple[str, int, int]]:
+	snapshot = snapshot.filter_traces((
+		tracemalloc.Filter(False, tracemalloc.__file__),
+		tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+		tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+	))
+	result = []
+	for stat in snapshot.statistics("lineno")[:top]:
+		frame = stat.traceback[0]
+		filename = frame.filename
+		if filename.startswith(rootDir):
+			filename = relpath(filename, rootDir)
+		result.append((f"{filename}:{frame.lineno}", stat.size, stat.count))
+	return result
+
+
+def measureConversion(
+	inputFilename: str,
+	inputFormat: str,
+	outputFilename: str,
+	outputFormat: str,
+	direct: bool,
+	trace: bool,
+	top: int,
+) -> Dict[str, Any]:
+	"""
+	must be called in a new process, because peak RSS can not be reset
+	"""
+	Glossary.init()
+	rssBefore = peakRss()
+	if trace:
+		tracemalloc.start()
+	ui = MemorySamplerUI()
+	glos = Glossary(ui=ui)
+	t0 = now()
+	ok = glos.convert(
+		inputFilename=inputFilename,
+		inputFormat=inputFormat,
+		direct=direct,
+		outputFilename=outputFilename,
+		outputFormat=outputFormat,
+		defaultSortKey=_defaultSortKey,
+		writeOptions=formatsWriteOptions.get(outputFormat),
+	)
+	wall = now() - t0
+	if not ok:
+		return {"error": "conversion failed"}
+	result = {
+		"wall": wall,
+		"peakRss": None,
+		"peakTraced": None,
+		"top": [],
+	}
+	rssAfter = peakRss()
+	if rssBefore is not None:
+		result["peakRss"] = rssAfter - rssBefore
+	if trace:
+		result["peakTraced"] = tracemalloc.get_traced_memory()[1]
+		if ui.snapshot is not None:
+			result["top"] = _topAllocators(ui.snapshot, top)
+		tracemalloc.stop()
+	return result
+
+
+def _runChild(args: Dict[str, Any], tmpDir: str) -> Dict[str, Any]:
+	resultPath = join(tmpDir, "result.json")
+	proc = subprocess.run(
+		[
+			sys.executable,
+			abspath(__file__),
+			"--child",
+			json.dumps(args),
+			resultPath,
+		],
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.PIPE,
+	)
+	if proc.returncode != 0:
+		return {"error": proc.stderr.decode("utf-8", "replace")[-1000:]}
+	with open(resultPath, encoding="utf-8") as _file:
+		result = json.load(_file)
+	os.remove(resultPath)
+	return result
+
+
+def fitLine(points: List[Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+	"""
+	least squares fit of y = slope * x + intercept
+	returns (slope, intercept), or None if there are less than 2 x values
+	"""
+	n = len(points)
+	if len(set(x for x, _ in points)) < 2:
+		return None
+	meanX = sum(x for x, _ in points) / n
+	meanY = sum(y for _, y in points) / n
+	varX = sum((x - meanX) ** 2 for x, _ in points)
+	cov = sum((x - meanX) * (y - meanY) for x, y in points)
+	slope = cov / varX
+	return slope, meanY - slope * meanX
+
+
+def defaultPairs(formats: List[str]) -> List[Tuple[str, str]]:
+	"""
+	every format to Tabfile, and Tabfile to every format
+	"""
+	pairs = []
+	for format in formats:
+		if (format, "Tabfile") not in pairs:
+			pairs.append((format, "Tabfile"))
+		if ("Tabfile", format) not in pairs:
+			pairs.append(("Tabfile", format))
+	return pairs
+
+
+def runBenchmarks(
+	pairs: List[Tuple[str, str]],
+	sizes: List[int],
+	benchModes: List[str],
+	params: Dict[str, Any],
+	trace: bool,
+	top: int,
+) -> Dict[str, Any]:
+	tmpDir = tempfile.mkdtemp(prefix="pyglossary-membench-")
+	results = {}
+	try:
+		inputs = {}  # (format, size) => filename
+		for inputFormat, outputFormat in pairs:
+			pairKey = f"{inputFormat}->{outputFormat}"
+			results[pairKey] = pairResult = {}
+			for mode in benchModes:
+				points = []
+				for size in sizes:
+					log.warning(f"Measuring {pairKey} {mode} with {size} entries")
+					inputFilename = inputs.get((inputFormat, size))
+					if inputFilename is None:
+						inputDir = join(tmpDir, f"input_{inputFormat}_{size}")
+						os.makedirs(inputDir)
+						inputFilename = join(
+							inputDir,
+							"input" + Glossary.plugins[inputFormat].ext,
+						)
+						glos = generateGlossary(**dict(params, entries=size))
+						if not glos.write(
+							inputFilename,
+							format=inputFormat,
+							defaultSortKey=_defaultSortKey,
+							**formatsWriteOptions.get(inputFormat, {})
+						):
+							log.error(f"failed to create {inputFormat} input")
+							break
+						inputs[(inputFormat, size)] = inputFilename
+					outputDir = join(tmpDir, "output")
+					os.makedirs(outputDir)
+					point = _runChild({
+						"inputFilename": inputFilename,
+						"inputFormat": inputFormat,
+						"outputFilename": join(
+							outputDir,
+							"output" + Glossary.plugins[outputFormat].ext,
+						),
+						"outputFormat": outputFormat,
+						"direct": mode == "direct",
+						"trace": trace,
+						"top": top,
+					}, tmpDir)
+					shutil.rmtree(outputDir)
+					point["entries"] = size
+					points.append(point)
+				pairResult[mode] = modeResult = {"points": points}
+				for key, slopeKey in (
+					("peakRss", "rssBytesPerEntry"),
+					("peakTraced", "tracedBytesPerEntry"),
+				):
+					fit = fitLine([
+						(point["entries"], point[key])
+						for point in points
+						if point.get(key) is not None
+					])
+					modeResult[slopeKey] = fit[0] if fit else None
+	finally:
+		shutil.rmtree(tmpDir, ignore_errors=True)
+	return {
+		"version": VERSION,
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"params": params,
+		"sizes": sizes,
+		"tracemalloc": trace,
+		"pairs": results,
+	}
+
+
+def compareResults(
+	old: Dict[str, Any],
+	new: Dict[str, Any],
+	threshold: float,
+	minDelta: float,
+) -> Tuple[List[str], List[str]]:
+	"""
+	compares bytes per entry (traced by tracemalloc if both have it,
+	or peak RSS) of each pair and mode
+	returns (lines, regressions)
+	"""
+	lines = []
+	regressions = []
+	if old.get("params") != new.get("params"):
+		lines.append("WARNING: benchmark params are different")
+	slopeKey = "rssBytesPerEntry"
+	if old.get("tracemalloc") and new.get("tracemalloc"):
+		slopeKey = "tracedBytesPerEntry"
+	for pairKey, newPair in new["pairs"].items():
+		oldPair = old["pairs"].get(pairKey)
+		if not oldPair:
+			continue
+		for mode, newRes in newPair.items():
+			oldRes = oldPair.get(mode)
+			if not oldRes:
+				continue
+			oldValue = oldRes.get(slopeKey)
+			newValue = newRes.get(slopeKey)
+			if oldValue is None or newValue is None:
+				continue
+			line = (
+				f"{pairKey:30s} {mode:8s} {oldValue:10.1f} -> {newValue:10.1f}"
+				f" bytes/entry"
+			)
+			delta = newValue - oldValue
+			if delta > minDelta and delta > abs(oldValue) * threshold:
+				line += "  REGRESSION"
+				regressions.append(f"{pairKey} {mode}")
+			lines.append(line)
+	return lines, regressions
+
+
+def _parsePairs(value: str) -> List[Tuple[str, str]]:
+	pairs = []
+	for pairStr in value.split(","):
+		inputFormat, sep, outputFormat = pairStr.partition(":")
+		if not sep:
+			raise ValueError(f"invalid pair {pairStr!r}, INPUT:OUTPUT expected")
+		pairs.append((inputFormat, outputFormat))
+	return pairs
+
+
+def main() -> None:
+	import argparse
+	if len(sys.argv) == 4 and sys.argv[1] == "--child":
+		log.setLevel(logging.ERROR)
+		result = measureConversion(**json.loads(sys.argv[2]))
+		with open(sys.argv[3], "w", encoding="utf-8") as _file:
+			json.dump(result, _file)
+		return
+
+	parser = argparse.ArgumentParser(
+		description="peak memory benchmark of glossary conversions",
+	)
+	parser.add_argument(
+		"-o",
+		"--output",
+		dest="outputJson",
+		default="",
+		help="save results into this json file",
+	)
+	parser.add_argument(
+		"--sizes",
+		default="1000,5000,20000",
+		help="comma-separated entry counts",
+	)
+	parser.add_argument(
+		"--pairs",
+		default="",
+		help=(
+			"comma-separated INPUT:OUTPUT format pairs"
+			" (default: every format to and from Tabfile)"
+		),
+	)
+	parser.add_argument(
+		"--modes",
+		default=",".join(modes),
+		help="comma-separated: direct, indirect",
+	)
+	parser.add_argument(
+		"--top",
+		type=int,
+		default=10,
+		help="number of top allocators to record",
+	)
+	parser.add_argument(
+		"--no-tracemalloc",
+		dest="trace",
+		action="store_false",
+		help="only measure peak RSS (faster)",
+	)
+	parser.add_argument(
+		"--compare",
+		nargs=2,
+		metavar=("OLD_JSON", "NEW_JSON"),
+	)
+	parser.add_argument("--threshold", type=float, default=0.2)
+	parser.add_argument(
+		"--min-delta",
+		dest="minDelta",
+		type=float,
+		default=32,
+		help="minimum growth of bytes per entry to count as regression",
+	)
+	params = defaultParams()
+	del params["entries"]
+	for key, value in params.items():
+		parser.add_argument(
+			"--" + key.replace("_", "-"),
+			dest=key,
+			type=type(value),
+			default=value,
+		)
+	args = parser.parse_args()
+
+	log.setLevel(logging.WARNING)
+
+	if args.compare:
+		with open(args.compare[0], encoding="utf-8") as _file:
+			old = json.load(_file)
+		with open(args.compare[1], encoding="utf-8") as _file:
+			new = json.load(_file)
+		lines, regressions = compareResults(
+			old,
+			new,
+			args.threshold,
+			args.minDelta,
+		)
+		print("\n".join(lines))
+		if regressions:
+			print(f"Regressions: {', '.join(regressions)}")
+			sys.exit(1)
+		return
+
+	Glossary.init()
+	if args.pairs:
+		pairs = _parsePairs(args.pairs)
+		for pair in pairs:
+			for format in pair:
+				if format not in Glossary.plugins:
+					log.error(f"invalid format {format!r}")
+					sys.exit(1)
+	else:
+		pairs = defaultPairs(benchFormats())
+
+	benchModes = args.modes.split(",")
+	for mode in benchModes:
+		if mode not in modes:
+			log.error(f"invalid mode {mode!r}")
+			sys.exit(1)
+
+	sizes = [int(size) for size in args.sizes.split(",")]
+	params = {key: getattr(args, key) for key in params}
+	result = runBenchmarks(
+		pairs,
+		sizes,
+		benchModes,
+		params,
+		args.trace,
+		args.top,
+	)
+
+	for pairKey, pairResult in result["pairs"].items():
+		for mode, modeResult in pairResult.items():
+			errors = [
+				point["error"] for point in modeResult["points"]
+				if "error" in point
+			]
+			if errors:
+				print(f"{pairKey:30s} {mode:8s} ERROR: {errors[0].strip()}")
+				continue
+			parts = [f"{pairKey:30s} {mode:8s}"]
+			for key, title in (
+				("rssBytesPerEntry", "rss"),
+				("tracedBytesPerEntry", "traced"),
+			):
+				value = modeResult.get(key)
+				if value is not None:
+					parts.append(f"{title}: {value:8.1f} bytes/entry")
+			print("  ".join(parts))
+
+	if args.outputJson:
+		with open(args.outputJson, "w", encoding="utf-8") as _file:
+			json.dump(result, _file, indent="\t")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+synthetic glossary generator, for benchmarks
+
+the same arguments (including seed) always generate the same glossary
+
+usage:
+	python3 benchmarks/synthetic.py OUTPUT_FILE [--format FORMAT]
+		[--entries N] [--alt-ratio R] [--html-ratio R] [--resources N]
+		[--seed N]
+"""
+
+from os.path import dirname, abspath
+import sys
+import random
+from typing import (
+	Dict,
+	Any,
+	Iterator,
+)
+
+rootDir = dirname(dirname(abspath(__file__)))
+if rootDir not in sys.path:
+	sys.path.insert(0, rootDir)
+
+from pyglossary.entry_base import BaseEntry
+from pyglossary.glossary import Glossary
+
+# a few non-ascii letters, so that utf-8 encoding/decoding is exercised
+letters = "abcdefghijklmnopqrstuvwxyz" * 4 + "äéöüßçñøåæ" + "абвгде" + "سلام"
+
+
+def defaultParams() -> Dict[str, Any]:
+	return {
+		"entries": 10000,
+		"alt_ratio": 0.2,
+		"html_ratio": 0.5,
+		"resources": 0,
+		"resource_size": 2048,
+		"defi_words": 30,
+		"seed": 0,
+	}
+
+
+def _randomWord(rnd: random.Random, minLen: int = 2, maxLen: int = 12) -> str:
+	return "".join(
+		rnd.choice(letters)
+		for _ in range(rnd.randint(minLen, maxLen))
+	)
+
+
+def _randomText(rnd: random.Random, wordCount: int) -> str:
+	return " ".join(_randomWord(rnd) for _ in range(wordCount))
+
+
+def generateEntries(
+	glos: Glossary,
+	entries: int = 10000,
+	alt_ratio: float = 0.2,
+	html_ratio: float = 0.5,
+	resources: int = 0,
+	resource_size: int = 2048,
+	defi_words: int = 30,
+	seed: int = 0,
+) -> Iterator[BaseEntry]:
+	"""
+	yields `entries` entries (with unique headwords) created by
+	glos.newEntry, and then `resources` data entries created by
+	glos.newDataEntry
+
+	alt_ratio:	ratio of entries that have 1 to 3 alternates
+	html_ratio:	ratio of entries with html definitions,
+		the rest are plain text
+	"""
+	rnd = random.Random(seed)
+	seen = set()
+	for index in range(entries):
+		word = _randomWord(rnd, 3, 16)
+		while word in seen:
+			word = _randomWord(rnd, 3, 16)
+		seen.add(word)
+		words = [word]
+		if rnd.random() < alt_ratio:
+			words += [
+				_randomWord(rnd, 3, 16)
+				for _ in range(rnd.randint(1, 3))
+			]
+
+		defiWords = max(1, int(rnd.gauss(defi_words, defi_words / 3)))
+		if rnd.random() < html_ratio:
+			parts = [
+				f"<b>{word}</b>",
+				f"<i>{_randomWord(rnd)}</i>",
+				_randomText(rnd, defiWords // 2),
+				"<br>",
+				_randomText(rnd, defiWords - defiWords // 2),
+			]
+			if resources:
+				parts.append(
+					f'<img src="res_{rnd.randrange(resources)}.png">'
+				)
+			yield glos.newEntry(words, " ".join(parts), defiFormat="h")
+		else:
+			defi = _randomText(rnd, defiWords)
+			if rnd.random() < 0.3:
+				defi += "\n" + _randomText(rnd, defiWords // 2 + 1)
+			yield glos.newEntry(words, defi, defiFormat="m")
+
+	for index in range(resources):
+		data = rnd.getrandbits(resource_size * 8).to_bytes(
+			resource_size,
+			"little",
+		)
+		yield glos.newDataEntry(f"res_{index}.png", data)
+
+
+def generateGlossary(**params) -> Glossary:
+	"""
+	returns a new Glossary (in indirect mode) with synthetic entries
+	see generateEntries for params
+	"""
+	glos = Glossary(info={
+		"name": "Synthetic Glossary",
+		"description": "generated by benchmarks/synthetic.py",
+		"author": "PyGlossary benchmarks",
+		"sourceLang": "English",
+		"targetLang": "English",
+	})
+	for entry in generateEntries(glos, **params):
+		glos.addEntryObj(entry)
+	return glos
+
+
+def main() -> None:
+	import argparse
+	parser = argparse.ArgumentParser(
+		description="generate a synthetic glossary",
+	)
+	parser.add_argument("outputFilename", metavar="OUTPUT_FILE")
+	parser.add_argument("--format", dest="outputFormat", default="")
+	params = defaultParams()
+	for key, value in params.items():
+		parser.add_argument(
+			"--" + key.replace("_", "-"),
+			dest=key,
+			type=type(value),
+			default=value,
+		)
+	args = parser.parse_args()
+
+	Glossary.init()
+	outputArgs = Glossary.detectOutputFormat(
+		filename=args.outputFilename,
+		format=args.outputFormat,
+	)
+	if not outputArgs:
+		sys.exit(1)
+	outputFilename, outputFormat, _ = outputArgs
+	glos = generateGlossary(**{key: getattr(args, key) for key in params})
+	if not glos.write(outputFilename, format=outputFormat):
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
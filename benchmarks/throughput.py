@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+read/write throughput benchmark, for every format that supports both
+reading and writing
+
+a synthetic glossary (see benchmarks/synthetic.py) is written in each
+format and then read back (in direct mode), and wall time, entries/sec
+and bytes/sec of each is recorded into a json file.
+the best (lowest) time of --repeat runs is used
+
+usage:
+	python3 benchmarks/throughput.py [-o RESULT.json] [--formats F1,F2,...]
+		[--repeat N] [--entries N] [--alt-ratio R] [--html-ratio R]
+		[--resources N] [--seed N]
+
+	python3 benchmarks/throughput.py --compare OLD.json NEW.json
+		[--threshold 0.1]
+
+--compare prints the change of entries/sec for each format and operation,
+and exits with status 1 if any of them has dropped more than threshold
+(0.1 means 10%)
+"""
+
+from os.path import join, dirname, abspath, getsize
+import os
+import sys
+import json
+import platform
+import shutil
+import tempfile
+from time import perf_counter as now
+from typing import (
+	Dict,
+	List,
+	Tuple,
+	Any,
+)
+
+rootDir = dirname(dirname(abspath(__file__)))
+if rootDir not in sys.path:
+	sys.path.insert(0, rootDir)
+
+from pyglossary.core import VERSION
+from pyglossary.glossary import Glossary
+
+from benchmarks.synthetic import defaultParams, generateGlossary
+
+import logging
+log = logging.getLogger("root")
+
+# not real glossary formats
+skipFormats = ("Info",)
+
+# write options that must be changed for benchmarks
+formatsWriteOptions = {
+	"DictOrg": {"install": False},
+}
+
+
+def _dependsInstalled(depends: Dict[str, str]) -> bool:
+	import importlib.util
+	for moduleName in depends:
+		if importlib.util.find_spec(moduleName) is None:
+			return False
+	return True
+
+
+def benchFormats() -> List[str]:
+	"""
+	formats that support both reading and writing, and their
+	dependencies are installed
+	"""
+	formats = []
+	for format in Glossary.readFormats:
+		if format in skipFormats:
+			continue
+		if format not in Glossary.writeFormats:
+			continue
+		if not _dependsInstalled(Glossary.readerClasses[format].depends):
+			continue
+		if not _dependsInstalled(Glossary.writerClasses[format].depends):
+			continue
+		formats.append(format)
+	return formats
+
+
+def _dirSize(dirPath: str) -> int:
+	size = 0
+	for root, _, files in os.walk(dirPath):
+		for fname in files:
+			size += getsize(join(root, fname))
+	return size
+
+
+def _defaultSortKey(b_word: bytes) -> bytes:
+	return b_word
+
+
+def _rates(wall: float, entryCount: int, byteCount: int) -> Dict[str, Any]:
+	return {
+		"wall": wall,
+		"entries": entryCount,
+		"bytes": byteCount,
+		"entriesPerSec": entryCount / wall if wall else 0,
+		"bytesPerSec": byteCount / wall if wall else 0,
+	}
+
+
+def benchFormat(
+	format: str,
+	params: Dict[str, Any],
+	repeat: int,
+	tmpDir: str,
+) -> Dict[str, Any]:
+	"""
+	returns {"write": {...}, "read": {...}}, or {"error": "..."}
+	every write (and read) is done into (from) a new directory
+	"""
+	ext = Glossary.plugins[format].ext
+	writeTimes = []
+	readTimes = []
+	byteCount = 0
+	entryCount = 0
+	for runIndex in range(repeat):
+		runDir = join(tmpDir, f"{format}_{runIndex}")
+		os.makedirs(runDir)
+		filename = join(runDir, "bench" + ext)
+
+		glos = generateGlossary(**params)
+		t0 = now()
+		if not glos.write(
+			filename,
+			format=format,
+			defaultSortKey=_defaultSortKey,
+			**formatsWriteOptions.get(format, {})
+		):
+			return {"error": "write failed"}
+		writeTimes.append(now() - t0)
+		byteCount = _dirSize(runDir)
+
+		glos = Glossary()
+		t0 = now()
+		if not glos.read(filename, format=format, direct=True, progressbar=False):
+			return {"error": "read failed"}
+		entryCount = 0
+		for entry in glos:
+			if entry is None or entry.isData():
+				continue
+			entryCount += 1
+		readTimes.append(now() - t0)
+		glos.clear()
+
+		shutil.rmtree(runDir)
+
+	write = _rates(min(writeTimes), params["entries"], byteCount)
+	write["times"] = writeTimes
+	read = _rates(min(readTimes), entryCount, byteCount)
+	read["times"] = readTimes
+	return {
+		"write": write,
+		"read": read,
+	}
+
+
+def runBenchmarks(
+	formats: List[str],
+	params: Dict[str, Any],
+	repeat: int,
+) -> Dict[str, Any]:
+	results = {}
+	tmpDir = tempfile.mkdtemp(prefix="pyglossary-bench-")
+	try:
+		for format in formats:
+			log.warning(f"Benchmarking {format}")
+			try:
+				results[format] = benchFormat(format, params, repeat, tmpDir)
+			except Exception as e:
+				log.exception(f"error while benchmarking {format}")
+				results[format] = {"error": str(e)}
+	finally:
+		shutil.rmtree(tmpDir, ignore_errors=True)
+	return {
+		"version": VERSION,
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"params": params,
+		"repeat": repeat,
+		"formats": results,
+	}
+
+
+def compareResults(
+	old: Dict[str, Any],
+	new: Dict[str, Any],
+	threshold: float,
+) -> Tuple[List[str], List[str]]:
+	"""
+	compares entries/sec of each format and operation
+	returns (lines, regressions)
+	"""
+	lines = []
+	regressions = []
+	if old.get("params") != new.get("params"):
+		lines.append("WARNING: benchmark params are different")
+	for format, newRes in new["formats"].items():
+		oldRes = old["formats"].get(format)
+		if not oldRes:
+			continue
+		for op in ("read", "write"):
+			if op not in oldRes or op not in newRes:
+				continue
+			oldRate = oldRes[op]["entriesPerSec"]
+			newRate = newRes[op]["entriesPerSec"]
+			if not oldRate:
+				continue
+			change = newRate / oldRate - 1
+			line = (
+				f"{format:20s} {op:6s} {oldRate:12.0f} -> {newRate:12.0f}"
+				f" entries/sec  {change:+7.1%}"
+			)
+			if change < -threshold:
+				line += "  REGRESSION"
+				regressions.append(f"{format} {op}")
+			lines.append(line)
+	return lines, regressions
+
+
+def main() -> None:
+	import argparse
+	parser = argparse.ArgumentParser(
+		description="read/write throughput benchmark of glossary formats",
+	)
+	parser.add_argument(
+		"-o",
+		"--output",
+		dest="outputJson",
+		default="",
+		help="save results into this json file",
+	)
+	parser.add_argument(
+		"--formats",
+		default="",
+		help="comma-separated format names (default: all)",
+	)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument(
+		"--compare",
+		nargs=2,
+		metavar=("OLD_JSON", "NEW_JSON"),
+	)
+	parser.add_argument("--threshold", type=float, default=0.1)
+	params = defaultParams()
+	for key, value in params.items():
+		parser.add_argument(
+			"--" + key.replace("_", "-"),
+			dest=key,
+			type=type(value),
+			default=value,
+		)
+	args = parser.parse_args()
+
+	log.setLevel(logging.WARNING)
+
+	if args.compare:
+		with open(args.compare[0], encoding="utf-8") as _file:
+			old = json.load(_file)
+		with open(args.compare[1], encoding="utf-8") as _file:
+			new = json.load(_file)
+		lines, regressions = compareResults(old, new, args.threshold)
+		print("\n".join(lines))
+		if regressions:
+			print(f"Regressions: {', '.join(regressions)}")
+			sys.exit(1)
+		return
+
+	Glossary.init()
+	if args.formats:
+		formats = args.formats.split(",")
+		for format in formats:
+			if format not in Glossary.plugins:
+				log.error(f"invalid format {format!r}")
+				sys.exit(1)
+	else:
+		formats = benchFormats()
+
+	params = {key: getattr(args, key) for key in params}
+	result = runBenchmarks(formats, params, args.repeat)
+
+	for format, res in result["formats"].items():
+		if "error" in res:
+			print(f"{format:20s} ERROR: {res['error']}")
+			continue
+		for op in ("read", "write"):
+			opRes = res[op]
+			print(
+				f"{format:20s} {op:6s} {opRes['wall']:8.3f} s"
+				f" {opRes['entriesPerSec']:12.0f} entries/sec"
+				f" {opRes['bytesPerSec'] / 1024 / 1024:8.2f} MiB/sec"
+			)
+
+	if args.outputJson:
+		with open(args.outputJson, "w", encoding="utf-8") as _file:
+			json.dump(result, _file, indent="\t")
+
+
+if __name__ == "__main__":
+	main()
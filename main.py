@@ -115,6 +115,17 @@ parser.add_argument(
 	dest="outputFormat",
 	action="store",
 )
+parser.add_argument(
+	"--also-write",
+	dest="extraOutputs",
+	action="append",
+	default=[],
+	metavar="[FORMAT:]FILENAME",
+	help=(
+		"also write into this file, in the same conversion"
+		" (reading input file only once), can be given multiple times"
+	),
+)
 
 parser.add_argument(
 	"--direct",
@@ -171,6 +182,10 @@ parser.add_argument(
 	dest="sortCacheSize",
 	type=int,
 	default=None,
+	help=(
+		"maximum number of entries kept in memory while sorting"
+		" in direct mode, the rest is spilled to cache directory"
+	),
 )
 
 parser.add_argument(
@@ -180,6 +195,16 @@ parser.add_argument(
 	default=None,
 	help="skip resources (images, audio, etc)",
 )
+parser.add_argument(
+	"--link-resources",
+	dest="link_resources",
+	action="store_true",
+	default=None,
+	help=(
+		"hard-link resource files of input into output directory"
+		" (when possible) instead of copying them"
+	),
+)
 parser.add_argument(
 	"--utf8-check",
 	dest="utf8Check",
@@ -224,6 +249,150 @@ parser.add_argument(
 	help="lowercase and normalize html tags in definitions",
 )
 
+parser.add_argument(
+	"--filter-workers",
+	dest="filter_workers",
+	type=int,
+	default=None,
+	help=(
+		"number of processes to run entry filters in"
+		", 0 to run them in the main process (default)"
+	),
+)
+parser.add_argument(
+	"--filter-batch-size",
+	dest="filter_batch_size",
+	type=int,
+	default=None,
+	help="number of entries sent to an entry filter process at once",
+)
+parser.add_argument(
+	"--batch-size",
+	dest="batch_size",
+	type=int,
+	default=None,
+	help=(
+		"number of entries passed from reader to entry filters and writer"
+		" at once, 0 to pass them one by one"
+	),
+)
+
+parser.add_argument(
+	"--pipeline-threads",
+	dest="pipeline_threads",
+	action="store_true",
+	default=None,
+	help=(
+		"run reader and entry filters in separate threads, so reading"
+		" and writing files (and compressing them) can overlap"
+	),
+)
+parser.add_argument(
+	"--pipeline-queue-size",
+	dest="pipeline_queue_size",
+	type=int,
+	default=None,
+	help="number of batches of entries kept between threads, with --pipeline-threads",
+)
+
+parser.add_argument(
+	"--memory-limit",
+	dest="memory_limit",
+	type=float,
+	default=None,
+	help=(
+		"target memory ceiling in MiB, used to decide on loading entries"
+		" into memory, compressing them, and spilling sorted runs to disk"
+	),
+)
+parser.add_argument(
+	"--entry-compress",
+	dest="entry_compress",
+	action="store_true",
+	default=None,
+	help="compress entries that are loaded into memory (indirect mode)",
+)
+parser.add_argument(
+	"--entry-compress-level",
+	dest="entry_compress_level",
+	type=int,
+	default=None,
+	help="zlib level (1 to 9) for compressing loaded entries",
+)
+parser.add_argument(
+	"--entry-block-size",
+	dest="entry_block_size",
+	type=int,
+	default=None,
+	help=(
+		"number of loaded entries that are compressed together"
+		", larger is smaller but slower for sorting"
+	),
+)
+parser.add_argument(
+	"--gzip-threads",
+	dest="gzip_threads",
+	type=int,
+	default=None,
+	help=(
+		"number of threads for compressing .gz output files"
+		", in independent chunks like pigz (default: 0, single thread)"
+	),
+)
+
+parser.add_argument(
+	"--profile",
+	dest="profile",
+	action="store_true",
+	default=None,
+	help="show time spent in each stage of conversion (reader, filters, ...)",
+)
+parser.add_argument(
+	"--profile-json",
+	dest="profileJson",
+	default=None,
+	help="save time spent in each stage of conversion as json file",
+)
+
+parser.add_argument(
+	"--cache",
+	dest="cache",
+	action="store_true",
+	default=None,
+	help=(
+		"use output files from cache if input files and options have not"
+		" changed since the last conversion, and add them to cache otherwise"
+	),
+)
+parser.add_argument(
+	"--cache-hash",
+	dest="cacheHash",
+	action="store_true",
+	default=None,
+	help=(
+		"same as --cache, but detect changes of input files by their content"
+		" instead of size and modification time"
+	),
+)
+
+parser.add_argument(
+	"--resumable",
+	dest="resumable",
+	action="store_true",
+	default=None,
+	help=(
+		"save checkpoints while converting, and continue an interrupted"
+		" conversion of the same files from its last checkpoint"
+	),
+)
+parser.add_argument(
+	"--checkpoint-interval",
+	dest="checkpoint_interval",
+	type=int,
+	default=None,
+	help="number of entries between checkpoints, with --resumable",
+)
+
 # _______________________________
 
 parser.add_argument(
@@ -323,11 +492,23 @@ prefOptionsKeys = (
 	"utf8Check",
 	"lower",
 	"skipResources",
+	"link_resources",
 	"enable_alts",
 	"remove_html",
 	"remove_html_all",
 	"normalize_html",
 	"save_info_json",
+	"filter_workers",
+	"filter_batch_size",
+	"batch_size",
+	"checkpoint_interval",
+	"memory_limit",
+	"entry_compress",
+	"entry_compress_level",
+	"entry_block_size",
+	"gzip_threads",
+	"pipeline_threads",
+	"pipeline_queue_size",
 )
 
 convertOptionsKeys = (
@@ -335,6 +516,11 @@ convertOptionsKeys = (
 	"progressbar",
 	"sort",
 	"sortCacheSize",
+	"profile",
+	"profileJson",
+	"cache",
+	"cacheHash",
+	"resumable",
 	# "sortKey",  # TODO
 )
 
@@ -405,6 +591,19 @@ if args.outputFilename and writeOptions:
 		writeOptions[optName] = optValueNew
 
 
+# list of (filename, format) tuples
+extraOutputs = []
+for extraOutput in args.extraOutputs:
+	outputFormat, sep, filename = extraOutput.partition(":")
+	if not sep or outputFormat not in Glossary.writeFormats:
+		outputFormat, filename = "", extraOutput
+	extraOutputs.append((filename, outputFormat))
+
+if extraOutputs and args.reverse:
+	log.error("--also-write does not work with --reverse")
+	sys.exit(1)
+
+
 if prefOptions:
 	log.debug("prefOptions = %s", prefOptions)
 if convertOptions:
@@ -438,13 +637,14 @@ if ui_type == "none":
 		log.error("--reverse does not work with --ui=none")
 		sys.exit(1)
 	glos = Glossary()
-	glos.convert(
+	glos.convertMulti(
 		args.inputFilename,
+		[(args.outputFilename, args.outputFormat, writeOptions)] + [
+			(filename, outputFormat, None)
+			for filename, outputFormat in extraOutputs
+		],
 		inputFormat=args.inputFormat,
-		outputFilename=args.outputFilename,
-		outputFormat=args.outputFormat,
 		readOptions=readOptions,
-		writeOptions=writeOptions,
 		**convertOptions
 	)
 	sys.exit(0)
@@ -460,6 +660,7 @@ elif ui_type == "cmd":
 		readOptions=readOptions,
 		writeOptions=writeOptions,
 		convertOptions=convertOptions,
+		extraOutputs=extraOutputs,
 	) else 1)
 if ui_type == "auto":
 	ui_module = None
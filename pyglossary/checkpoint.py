@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+checkpoint protocol, for resuming an interrupted (direct mode, unsorted)
+conversion, see Glossary.writeMulti
+
+a Reader can (optionally) have these methods:
+	tell() -> Any
+		returns a json-serializable position right after the last entry
+		that was yielded, or None if there is no stable position now
+	seek(position: Any) -> None
+		called after open() and before iterating, with a position that
+		was returned by tell(), so that iterating starts from there
+	seekable() -> bool
+		called after open(), returns False if tell() can not return
+		a position for the opened input (for example a compressed file)
+
+a Writer can (optionally) have these methods:
+	checkpoint() -> Any
+		called between entries, flushes everything that is written so far
+		and returns a json-serializable state of the writer
+	resume(filename: str, state: Any) -> None
+		called instead of open(filename), with a state that was returned
+		by checkpoint(), write() is then called as usual, and must
+		continue writing after the entries that were sent before
+		that checkpoint
+
+a checkpoint file is a json file that is replaced atomically every
+`checkpoint_interval` entries, and removed when the conversion is done
+"""
+
+import os
+import json
+from typing import (
+	Dict,
+	Any,
+	Optional,
+)
+
+import logging
+log = logging.getLogger("root")
+
+
+def isResumableReader(reader: Any) -> bool:
+	return hasattr(reader, "tell") and hasattr(reader, "seek")
+
+
+def isSeekableReader(reader: Any) -> bool:
+	"""
+	reader must be resumable (see isResumableReader) and opened
+	"""
+	if not hasattr(reader, "seekable"):
+		return True
+	return reader.seekable()
+
+
+def isResumableWriter(writer: Any) -> bool:
+	return hasattr(writer, "checkpoint") and hasattr(writer, "resume")
+
+
+def loadCheckpoint(filename: str) -> Optional[Dict[str, Any]]:
+	try:
+		with open(filename, encoding="utf-8") as _file:
+			return json.load(_file)
+	except FileNotFoundError:
+		return
+	except Exception as e:
+		log.warning(f"ignoring invalid checkpoint file {filename!r}: {e}")
+		return
+
+
+def saveCheckpoint(filename: str, state: Dict[str, Any]) -> None:
+	os.makedirs(os.path.dirname(filename), exist_ok=True)
+	tmpFilename = f"{filename}.{os.getpid()}"
+	with open(tmpFilename, "w", encoding="utf-8") as _file:
+		json.dump(state, _file)
+	os.replace(tmpFilename, filename)
+
+
+def removeCheckpoint(filename: str) -> None:
+	try:
+		os.remove(filename)
+	except FileNotFoundError:
+		pass
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath
+import os
+import sys
+import gzip
+import logging
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary import glossary as glossary_module
+from pyglossary.glossary import Glossary
+
+
+class MockUI(object):
+	def __init__(self, pref):
+		self.pref = pref
+
+
+def readFile(path: str) -> str:
+	with open(path, encoding="utf-8") as _file:
+		return _file.read()
+
+
+class ResumableConvertTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+		self._cacheDir = glossary_module.cacheDir
+		glossary_module.cacheDir = join(self.dir, "cache")
+		self.checkpointDir = join(self.dir, "cache", "checkpoints")
+		self.pref = {"checkpoint_interval": 10}
+		self.inputPath = join(self.dir, "in.txt")
+		with open(self.inputPath, "w", encoding="utf-8") as _file:
+			_file.write("##name\tTest\n")
+			for index in range(100):
+				_file.write(f"word{index}\tdefinition {index}\n")
+		logging.getLogger("root").disabled = True
+
+	def tearDown(self):
+		logging.getLogger("root").disabled = False
+		glossary_module.cacheDir = self._cacheDir
+		self.tmpDir.cleanup()
+
+	def newGlossary(self, crashAfter: int = 0) -> Glossary:
+		glos = Glossary(ui=MockUI(self.pref))
+		self.writtenCount = 0
+
+		def writeTabfile(*args, **kwargs):
+			gen = Glossary.writeTabfile(glos, *args, **kwargs)
+			next(gen)
+			while True:
+				entry = yield
+				if entry is not None:
+					self.writtenCount += 1
+				if crashAfter and self.writtenCount > crashAfter:
+					raise RuntimeError("crash")
+				try:
+					gen.send(entry)
+				except StopIteration:
+					return
+
+		glos.writeTabfile = writeTabfile
+		return glos
+
+	def convert(self, glos, inputPath, outputPath):
+		return glos.convert(
+			inputFilename=inputPath,
+			outputFilename=outputPath,
+			outputFormat="Tabfile",
+			progressbar=False,
+			resumable=True,
+		)
+
+	def expectedOutput(self, inputPath):
+		outputPath = join(self.dir, "expected.txt")
+		self.assertTrue(Glossary().convert(
+			inputFilename=inputPath,
+			outputFilename=outputPath,
+			outputFormat="Tabfile",
+			progressbar=False,
+		))
+		return readFile(outputPath)
+
+	def resumeCase(self, inputPath):
+		outputPath = join(self.dir, "out.txt")
+		self.assertIsNone(self.convert(
+			self.newGlossary(crashAfter=35),
+			inputPath,
+			outputPath,
+		))
+		self.assertEqual(len(os.listdir(self.checkpointDir)), 1)
+		self.assertEqual(
+			self.convert(self.newGlossary(), inputPath, outputPath),
+			outputPath,
+		)
+		# checkpoint was saved after 30 entries
+		self.assertEqual(self.writtenCount, 70)
+		self.assertEqual(readFile(outputPath), self.expectedOutput(inputPath))
+		self.assertEqual(os.listdir(self.checkpointDir), [])
+
+	def test_tabfile(self):
+		self.resumeCase(self.inputPath)
+
+	def test_stardict(self):
+		inputPath = join(self.dir, "in.ifo")
+		self.assertTrue(Glossary().convert(
+			inputFilename=self.inputPath,
+			outputFilename=inputPath,
+			progressbar=False,
+		))
+		self.resumeCase(inputPath)
+
+	def test_compressedInput(self):
+		inputPath = self.inputPath + ".gz"
+		with open(self.inputPath, "rb") as _file:
+			data = _file.read()
+		with gzip.open(inputPath, "wb") as _file:
+			_file.write(data)
+		outputPath = join(self.dir, "out.txt")
+		logging.getLogger("root").disabled = False
+		with self.assertLogs("root", level="WARNING") as logs:
+			self.assertIsNone(self.convert(
+				self.newGlossary(crashAfter=35),
+				inputPath,
+				outputPath,
+			))
+		self.assertIn(
+			"Conversion is not resumable: Tabfile reader does not support it"
+			" for this input",
+			"\n".join(logs.output),
+		)
+		self.assertFalse(os.path.isdir(self.checkpointDir))
+
+	def test_changedInput(self):
+		outputPath = join(self.dir, "out.txt")
+		self.convert(self.newGlossary(crashAfter=35), self.inputPath, outputPath)
+		with open(self.inputPath, "a", encoding="utf-8") as _file:
+			_file.write("newword\tnew definition\n")
+		self.assertEqual(
+			self.convert(self.newGlossary(), self.inputPath, outputPath),
+			outputPath,
+		)
+		self.assertEqual(self.writtenCount, 101)
+		self.assertEqual(
+			readFile(outputPath),
+			self.expectedOutput(self.inputPath),
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+in-process compression of output files, for output filenames with a
+compression extension (like mydic.txt.gz), and decompression of input
+files (see detectCompression)
+
+writers that accept `fileObj` in their `open` method write into a
+compressing file object (see openCompressed), other outputs are
+compressed after they are written (see compressFile)
+
+with `gzip_threads` pref, gzip output is compressed in independent chunks
+by several threads (like pigz), and chunks are written as concatenated
+gzip members, which is a valid gzip file (zlib releases the GIL while
+compressing, so threads run in parallel)
+
+compressed input files are detected by magic bytes, and readers that
+accept `fileObj` in their `open` method read from a streaming
+decompressing file object (see openDecompressed), other readers read
+a temporary decompressed file (see decompressFile)
+"""
+
+import os
+from os.path import isdir, isfile, join, split, splitext, relpath
+import io
+import shutil
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+	Optional,
+	Any,
+)
+
+import logging
+log = logging.getLogger("root")
+
+compressionExts = ("gz", "bz2", "xz", "zip")
+# dz is dictzip, a gzip file with random access (like mydic.dsl.dz)
+# lzma is the legacy .lzma format, that has no magic bytes
+inputCompressionExts = ("gz", "dz", "bz2", "xz", "lzma", "zip")
+
+# magic bytes => compression
+compressionMagic = (
+	(b"\x1f\x8b", "gz"),
+	(b"BZh", "bz2"),
+	(b"\xfd7zXZ\x00", "xz"),
+	(b"PK\x03\x04", "zip"),
+)
+
+# compression levels of gzip, bzip2 and zip commands (used before)
+gzipLevel = 6
+bz2Level = 9
+zipLevel = 6
+
+
+class ParallelGzipFile(io.BufferedIOBase):
+	def __init__(
+		self,
+		fileObj: "io.BufferedIOBase",
+		threads: int,
+		level: int = gzipLevel,
+		chunkSize: int = 1024 * 1024,
+	) -> None:
+		"""
+		fileObj: binary file object to write gzip members into, it's closed
+			by close()
+		threads: number of compressing threads
+		chunkSize: size of uncompressed data in each gzip member
+		"""
+		self._file = fileObj
+		self._level = level
+		self._chunkSize = chunkSize
+		self._buffer = bytearray()
+		self._executor = ThreadPoolExecutor(
+			max_workers=threads,
+			thread_name_prefix="pyglossary-gzip",
+		)
+		# at most 2 chunks per thread are kept in memory
+		self._maxPending = threads * 2
+		self._pending = deque()
+		self._memberCount = 0
+
+	def _compress(self, chunk: bytes) -> bytes:
+		compressor = zlib.compressobj(self._level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+		return compressor.compress(chunk) + compressor.flush()
+
+	def _writeDone(self, block: bool) -> None:
+		pending = self._pending
+		while pending and (block or pending[0].done()):
+			self._file.write(pending.popleft().result())
+
+	def _submit(self, chunk: bytes) -> None:
+		while len(self._pending) >= self._maxPending:
+			self._file.write(self._pending.popleft().result())
+		self._pending.append(self._executor.submit(self._compress, chunk))
+		self._memberCount += 1
+		self._writeDone(False)
+
+	def writable(self) -> bool:
+		return True
+
+	def write(self, data: bytes) -> int:
+		if self.closed:
+			raise ValueError("write to closed file")
+		buf = self._buffer
+		buf += data
+		chunkSize = self._chunkSize
+		if len(buf) >= chunkSize:
+			pos = 0
+			while len(buf) - pos >= chunkSize:
+				self._submit(bytes(buf[pos:pos + chunkSize]))
+				pos += chunkSize
+			del buf[:pos]
+		return len(data)
+
+	def flush(self) -> None:
+		"""
+		writes the chunks that are compressed, without compressing the
+		buffered data into a small gzip member
+		"""
+		if self.closed:
+			return
+		self._writeDone(False)
+		self._file.flush()
+
+	def close(self) -> None:
+		if self.closed:
+			return
+		try:
+			if self._buffer or not self._memberCount:
+				# an empty input is written as one empty member
+				self._submit(bytes(self._buffer))
+				self._buffer = bytearray()
+			self._writeDone(True)
+		finally:
+			self._executor.shutdown()
+			super().close()
+			self._file.close()
+
+
+class _ZipMemberFile(io.BufferedIOBase):
+	"""
+	file object for writing a single member of a new zip file,
+	that closes the zip file when it's closed
+	"""
+	def __init__(self, zipFilename: str, name: str) -> None:
+		import zipfile
+		self._zipFile = zipfile.ZipFile(
+			zipFilename,
+			mode="w",
+			compression=zipfile.ZIP_DEFLATED,
+			compresslevel=zipLevel,
+		)
+		self._member = self._zipFile.open(name, mode="w", force_zip64=True)
+
+	def writable(self) -> bool:
+		return True
+
+	def write(self, data: bytes) -> int:
+		return self._member.write(data)
+
+	def close(self) -> None:
+		if self.closed:
+			return
+		try:
+			self._member.close()
+			self._zipFile.close()
+		finally:
+			super().close()
+
+
+def openCompressed(
+	filename: str,
+	compression: str,
+	threads: int = 0,
+) -> "io.BufferedIOBase":
+	"""
+	opens `filename.compression` for writing, and returns a binary file
+	object that compresses data written into it
+	for zip, the archive has one member named basename of `filename`
+
+	threads: number of threads for gzip (see ParallelGzipFile), 0 or 1
+		for compressing in the calling thread
+	"""
+	compressedFilename = f"{filename}.{compression}"
+	if compression == "gz":
+		if threads > 1:
+			return ParallelGzipFile(open(compressedFilename, "wb"), threads)
+		import gzip
+		return gzip.open(compressedFilename, mode="wb", compresslevel=gzipLevel)
+	if compression == "bz2":
+		import bz2
+		return bz2.open(compressedFilename, mode="wb", compresslevel=bz2Level)
+	if compression == "xz":
+		import lzma
+		return lzma.open(compressedFilename, mode="wb")
+	if compression == "zip":
+		return _ZipMemberFile(compressedFilename, split(filename)[1])
+	raise ValueError(f"invalid compression {compression!r}")
+
+
+def _zipDir(dirPath: str, zipFilename: str) -> None:
+	import zipfile
+	with zipfile.ZipFile(
+		zipFilename,
+		mode="w",
+		compression=zipfile.ZIP_DEFLATED,
+		compresslevel=zipLevel,
+	) as zipFile:
+		for root, _, files in os.walk(dirPath):
+			for fname in sorted(files):
+				fpath = join(root, fname)
+				zipFile.write(fpath, relpath(fpath, dirPath))
+
+
+def compressFile(
+	filename: str,
+	compression: str,
+	threads: int = 0,
+) -> Optional[str]:
+	"""
+	compresses existing file (or directory, only for zip) `filename` into
+	`filename.compression` and removes `filename`, like gzip/bzip2
+	commands (and `zip -m`) do
+	returns the path of compressed file, or None if failed
+	"""
+	compressedFilename = f"{filename}.{compression}"
+	try:
+		if isdir(filename):
+			if compression != "zip":
+				log.error(f"Can not compress directory {filename!r} with {compression}")
+				return
+			_zipDir(filename, compressedFilename)
+			shutil.rmtree(filename)
+			return compressedFilename
+		with open(filename, "rb") as inFile:
+			with openCompressed(filename, compression, threads=threads) as outFile:
+				shutil.copyfileobj(inFile, outFile, 1024 * 1024)
+		os.remove(filename)
+	except Exception:
+		log.exception(f"Failed to compress file {filename!r}")
+		try:
+			os.remove(compressedFilename)
+		except OSError:
+			pass
+		return
+	return compressedFilename
+
+
+def detectCompression(filename: str) -> str:
+	"""
+	returns compression of input file `filename` ("gz", "bz2", "xz",
+	"lzma" or "zip") by its magic bytes, or "" if it's not compressed
+	only files with a compression extension (see inputCompressionExts)
+	are checked, so formats that are zip or gzip files themselves
+	(like epub or dictzip .dict.dz files of a StarDict) are not affected
+	"""
+	ext = splitext(filename)[1].lower()[1:]
+	if ext not in inputCompressionExts or not isfile(filename):
+		return ""
+	with open(filename, "rb") as _file:
+		head = _file.read(6)
+	for magic, compression in compressionMagic:
+		if head.startswith(magic):
+			return compression
+	if ext == "lzma":
+		return "lzma"
+	return ""
+
+
+def _zipMemberName(zipFile: Any, filename: str) -> str:
+	"""
+	zipFile: opened zipfile.ZipFile
+	filename: path of zip file without .zip
+	returns name of the member that has the same name as `filename`,
+	or the only file in zip archive
+	"""
+	names = [
+		info.filename for info in zipFile.infolist()
+		if not info.is_dir()
+	]
+	baseName = split(filename)[1]
+	for name in names:
+		if name.split("/")[-1] == baseName:
+			return name
+	if len(names) == 1:
+		return names[0]
+	raise ValueError(
+		f"zip file has {len(names)} files, and none of them is {baseName!r}"
+	)
+
+
+class DecompressedFile(io.BufferedIOBase):
+	"""
+	readable (and not seekable) binary file object of decompressed data
+	of compressed file `filename`, that is decompressed while it's read
+	for zip, the member that has the same name as `filename` without .zip
+	(or the only member) is read
+
+	compressedSize and compressedTell() are size of compressed file and
+	number of compressed bytes that are read, for progress of readers
+	"""
+	def __init__(self, filename: str, compression: str) -> None:
+		self._raw = open(filename, "rb")
+		self.compressedSize = os.fstat(self._raw.fileno()).st_size
+		self._zipFile = None
+		# read by peek(), but not read by read()
+		self._peeked = b""
+		try:
+			self._file = self._openDecompressor(filename, compression)
+		except Exception:
+			self._raw.close()
+			raise
+
+	def _openDecompressor(self, filename: str, compression: str) -> "io.IOBase":
+		if compression == "gz":
+			import gzip
+			return gzip.GzipFile(fileobj=self._raw, mode="rb")
+		if compression == "bz2":
+			import bz2
+			return bz2.BZ2File(self._raw, mode="rb")
+		if compression == "xz":
+			import lzma
+			return lzma.LZMAFile(self._raw, mode="rb")
+		if compression == "lzma":
+			import lzma
+			return lzma.LZMAFile(self._raw, mode="rb", format=lzma.FORMAT_ALONE)
+		if compression == "zip":
+			import zipfile
+			self._zipFile = zipfile.ZipFile(self._raw)
+			name = _zipMemberName(self._zipFile, splitext(filename)[0])
+			return self._zipFile.open(name)
+		raise ValueError(f"invalid compression {compression!r}")
+
+	def readable(self) -> bool:
+		return True
+
+	def compressedTell(self) -> int:
+		return self._raw.tell()
+
+	def peek(self, size: int = 1) -> bytes:
+		"""
+		returns the next `size` bytes (or less, at the end of file)
+		without consuming them
+		"""
+		if len(self._peeked) < size:
+			self._peeked += self._file.read(size - len(self._peeked))
+		return self._peeked[:size]
+
+	def read(self, size: Optional[int] = -1) -> bytes:
+		peeked = self._peeked
+		if not peeked:
+			return self._file.read(size)
+		if size is not None and 0 <= size <= len(peeked):
+			self._peeked = peeked[size:]
+			return peeked[:size]
+		self._peeked = b""
+		if size is None or size < 0:
+			return peeked + self._file.read()
+		return peeked + self._file.read(size - len(peeked))
+
+	def read1(self, size: int = -1) -> bytes:
+		if self._peeked:
+			if size < 0:
+				size = len(self._peeked)
+			return self.read(min(size, len(self._peeked)))
+		return self._file.read1(size)
+
+	def readinto(self, buf: "bytearray") -> int:
+		data = self.read(len(buf))
+		buf[:len(data)] = data
+		return len(data)
+
+	def close(self) -> None:
+		if self.closed:
+			return
+		try:
+			self._file.close()
+			if self._zipFile is not None:
+				self._zipFile.close()
+		finally:
+			self._raw.close()
+			super().close()
+
+
+def openDecompressed(filename: str, compression: str) -> DecompressedFile:
+	"""
+	compression: returned by detectCompression(filename)
+	"""
+	return DecompressedFile(filename, compression)
+
+
+def decompressFile(
+	filename: str,
+	compression: str,
+	outputFilename: str,
+) -> None:
+	"""
+	decompresses `filename` into a new file `outputFilename`, for
+	readers that need to seek (or open other files next to it)
+	"""
+	with openDecompressed(filename, compression) as inFile:
+		with open(outputFilename, "wb") as outFile:
+			shutil.copyfileobj(inFile, outFile, 1024 * 1024)
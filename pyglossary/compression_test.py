@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath, isfile, isdir
+import os
+import sys
+import gzip
+import bz2
+import lzma
+import zipfile
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+from pyglossary.compression import (
+	ParallelGzipFile,
+	openCompressed,
+	compressFile,
+	detectCompression,
+	openDecompressed,
+)
+
+
+class MockUI(object):
+	def __init__(self, pref):
+		self.pref = pref
+
+	def progressInit(self, title):
+		pass
+
+	def progress(self, rat, text=""):
+		pass
+
+	def progressEnd(self):
+		pass
+
+
+def decompressFile(path):
+	if path.endswith(".gz"):
+		with gzip.open(path) as _file:
+			return _file.read()
+	if path.endswith(".bz2"):
+		with bz2.open(path) as _file:
+			return _file.read()
+	if path.endswith(".xz"):
+		with lzma.open(path) as _file:
+			return _file.read()
+	if path.endswith(".zip"):
+		with zipfile.ZipFile(path) as zipFile:
+			names = zipFile.namelist()
+			assert len(names) == 1, names
+			return zipFile.read(names[0])
+	raise ValueError(path)
+
+
+class CompressionTest(unittest.TestCase):
+	def setUp(self):
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def test_parallel_gzip(self):
+		data = b"".join(
+			f"line {index} of some text\n".encode("ascii")
+			for index in range(5000)
+		)
+		path = join(self.dir, "a.gz")
+		with ParallelGzipFile(open(path, "wb"), 3, chunkSize=1000) as _file:
+			for pos in range(0, len(data), 777):
+				_file.write(data[pos:pos + 777])
+		self.assertEqual(decompressFile(path), data)
+		# each chunk is a gzip member
+		with open(path, "rb") as _file:
+			self.assertGreater(_file.read().count(b"\x1f\x8b\x08"), 100)
+
+	def test_parallel_gzip_empty(self):
+		path = join(self.dir, "a.gz")
+		ParallelGzipFile(open(path, "wb"), 2).close()
+		self.assertEqual(decompressFile(path), b"")
+
+	def test_open_compressed(self):
+		data = "سلام\n".encode("utf-8") * 1000
+		for compression in ("gz", "bz2", "xz", "zip"):
+			filename = join(self.dir, "a.txt")
+			with openCompressed(filename, compression) as _file:
+				_file.write(data)
+			path = f"{filename}.{compression}"
+			self.assertEqual(decompressFile(path), data, compression)
+			self.assertFalse(isfile(filename))
+
+	def test_compress_file(self):
+		filename = join(self.dir, "a.txt")
+		with open(filename, "wb") as _file:
+			_file.write(b"hello\n" * 1000)
+		path = compressFile(filename, "bz2")
+		self.assertEqual(path, filename + ".bz2")
+		self.assertFalse(isfile(filename))
+		self.assertEqual(decompressFile(path), b"hello\n" * 1000)
+
+	def test_compress_dir(self):
+		dirPath = join(self.dir, "out")
+		os.makedirs(join(dirPath, "res"))
+		with open(join(dirPath, "a.txt"), "wb") as _file:
+			_file.write(b"a")
+		with open(join(dirPath, "res", "b.png"), "wb") as _file:
+			_file.write(b"b")
+		self.assertIsNone(compressFile(dirPath, "gz"))
+		path = compressFile(dirPath, "zip")
+		self.assertEqual(path, dirPath + ".zip")
+		self.assertFalse(isdir(dirPath))
+		with zipfile.ZipFile(path) as zipFile:
+			self.assertEqual(sorted(zipFile.namelist()), ["a.txt", "res/b.png"])
+
+	def convert(self, inputFilename, outputFilename, pref):
+		glos = Glossary(ui=MockUI(pref))
+		return glos.convert(
+			inputFilename=inputFilename,
+			outputFilename=outputFilename,
+		)
+
+	def test_convert(self):
+		Glossary.init()
+		inputFilename = join(self.dir, "in.txt")
+		with open(inputFilename, "w", encoding="utf-8") as _file:
+			for index in range(1000):
+				_file.write(f"word{index}\tdefinition {index}\\nsecond line\n")
+		plainFilename = self.convert(
+			inputFilename,
+			join(self.dir, "plain.txt"),
+			{},
+		)
+		with open(plainFilename, "rb") as _file:
+			plainData = _file.read()
+		for outName, pref in (
+			("out1.txt.gz", {}),
+			("out2.txt.gz", {"gzip_threads": 2}),
+			("out3.txt.bz2", {}),
+			("out4.txt.xz", {}),
+			("out5.txt.zip", {}),
+		):
+			outputFilename = self.convert(
+				inputFilename,
+				join(self.dir, outName),
+				pref,
+			)
+			self.assertEqual(outputFilename, join(self.dir, outName))
+			self.assertEqual(decompressFile(outputFilename), plainData, outName)
+			# written into compressing file object, not compressed after
+			self.assertFalse(isfile(outputFilename[:outputFilename.rfind(".")]))
+
+	def test_convert_not_streamed(self):
+		Glossary.init()
+		self.assertFalse(Glossary.formatsWriteFileObj.get("Stardict"))
+		inputFilename = join(self.dir, "in.txt")
+		with open(inputFilename, "w", encoding="utf-8") as _file:
+			_file.write("hello\tworld\n")
+		outputFilename = self.convert(
+			inputFilename,
+			join(self.dir, "out.ifo.gz"),
+			{},
+		)
+		self.assertEqual(outputFilename, join(self.dir, "out.ifo.gz"))
+		self.assertIn(b"wordcount=1\n", decompressFile(outputFilename))
+		self.assertTrue(isfile(join(self.dir, "out.idx")))
+
+	def writeCompressed(self, name, data):
+		path = join(self.dir, name)
+		if name.endswith(".zip"):
+			with zipfile.ZipFile(path, "w") as zipFile:
+				zipFile.writestr("inner.txt", data)
+			return path
+		if name.endswith(".gz"):
+			data = gzip.compress(data)
+		elif name.endswith(".bz2"):
+			data = bz2.compress(data)
+		elif name.endswith(".xz"):
+			data = lzma.compress(data)
+		elif name.endswith(".lzma"):
+			data = lzma.compress(data, format=lzma.FORMAT_ALONE)
+		with open(path, "wb") as _file:
+			_file.write(data)
+		return path
+
+	def test_detect_compression(self):
+		for name, compression in (
+			("a.txt.gz", "gz"),
+			("a.txt.bz2", "bz2"),
+			("a.txt.xz", "xz"),
+			("a.txt.lzma", "lzma"),
+			("a.txt.zip", "zip"),
+		):
+			path = self.writeCompressed(name, b"hello\n")
+			self.assertEqual(detectCompression(path), compression, name)
+		# by magic bytes, not by extension
+		os.rename(join(self.dir, "a.txt.bz2"), join(self.dir, "b.txt.gz"))
+		self.assertEqual(detectCompression(join(self.dir, "b.txt.gz")), "bz2")
+		# not a compression extension
+		os.rename(join(self.dir, "a.txt.gz"), join(self.dir, "a.epub"))
+		self.assertEqual(detectCompression(join(self.dir, "a.epub")), "")
+		with open(join(self.dir, "c.txt.gz"), "wb") as _file:
+			_file.write(b"not compressed")
+		self.assertEqual(detectCompression(join(self.dir, "c.txt.gz")), "")
+
+	def test_open_decompressed(self):
+		data = "سلام\n".encode("utf-8") * 10000
+		for name in ("a.txt.gz", "a.txt.bz2", "a.txt.xz", "a.txt.zip"):
+			path = self.writeCompressed(name, data)
+			with openDecompressed(path, detectCompression(path)) as _file:
+				self.assertFalse(_file.seekable())
+				self.assertEqual(_file.peek(3), data[:3])
+				self.assertEqual(_file.read(5), data[:5])
+				self.assertEqual(_file.read(), data[5:])
+				if name.endswith(".zip"):
+					# central directory of zip is not read
+					continue
+				self.assertEqual(_file.compressedTell(), _file.compressedSize)
+
+	def test_convert_input(self):
+		Glossary.init()
+		self.assertTrue(Glossary.formatsReadFileObj.get("Tabfile"))
+		data = "".join(
+			f"word{index}\tdefinition {index}\\nsecond line\n"
+			for index in range(1000)
+		).encode("utf-8")
+		for name in (
+			"a.txt.gz",
+			"a.txt.bz2",
+			"a.txt.xz",
+			"a.txt.lzma",
+			"a.txt.zip",
+		):
+			inputFilename = self.writeCompressed(name, data)
+			outputFilename = self.convert(
+				inputFilename,
+				join(self.dir, "out.txt"),
+				{},
+			)
+			with open(outputFilename, "rb") as _file:
+				self.assertEqual(
+					_file.read(),
+					b"##name\ta.txt\n" + data,
+					name,
+				)
+
+	def test_convert_input_not_streamed(self):
+		Glossary.init()
+		self.assertFalse(Glossary.formatsReadFileObj.get("Csv"))
+		inputFilename = self.writeCompressed("a.csv.gz", b"hello,world\n")
+		outputFilename = self.convert(
+			inputFilename,
+			join(self.dir, "out.txt"),
+			{},
+		)
+		with open(outputFilename, "rb") as _file:
+			self.assertEqual(_file.read(), b"##name\ta.csv\nhello\tworld\n")
+
+	def test_read_next_file_compressed(self):
+		Glossary.init()
+		with open(join(self.dir, "a.txt"), "wb") as _file:
+			_file.write(b"##file_count\t2\nw1\td1\n")
+		self.writeCompressed("a.txt.1.gz", b"w2\td2\n")
+		glos = Glossary()
+		self.assertTrue(glos.read(join(self.dir, "a.txt")))
+		self.assertEqual(
+			[entry.s_word for entry in glos],
+			["w1", "w2"],
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+cache of conversion outputs, keyed by a fingerprint of the input files and
+everything else that affects the output (see Glossary.convertMulti)
+
+each cache entry is a directory named by the fingerprint, containing
+`meta.json` and the output files, hard-linked (or copied) from the output
+directories, and hard-linked (or copied) back on a cache hit.
+since hard-linked output files may be modified in place later, size and
+modification time of cached files are checked before using them
+"""
+
+import os
+from os.path import (
+	join,
+	abspath,
+	isdir,
+	isfile,
+	islink,
+	basename,
+	dirname,
+)
+import json
+import shutil
+import hashlib
+from time import time as now
+from typing import (
+	Dict,
+	List,
+	Tuple,
+	Any,
+	Optional,
+)
+
+import logging
+log = logging.getLogger("root")
+
+# top-level file/directory name => (mtime_ns, size) of it (or the latest
+# one of files inside it, and their count) to find files created by writers
+DirState = Dict[str, Tuple[int, int]]
+
+
+def relatedFilePaths(filename: str) -> List[str]:
+	"""
+	files that a reader may read for input `filename` (or a writer may
+	write for output `filename`): files in the same directory whose name
+	starts with the name of `filename` (without extension), like mydic.idx
+	and mydic.dict.dz for mydic.ifo, and all files inside `filename`
+	if it's a directory
+
+	it may include some unrelated files, which only makes the fingerprint
+	change more often than needed
+	"""
+	if isdir(filename):
+		paths = []
+		for root, _, files in os.walk(filename):
+			for fname in files:
+				paths.append(join(root, fname))
+		return sorted(paths)
+	directory = dirname(filename)
+	if directory and not isdir(directory):
+		return []
+	prefix = os.path.splitext(basename(filename))[0]
+	paths = []
+	for fname in os.listdir(directory or "."):
+		path = join(directory, fname)
+		if not fname.startswith(prefix):
+			continue
+		if isfile(path):
+			paths.append(path)
+		elif isdir(path):
+			paths += relatedFilePaths(path)
+	return sorted(paths)
+
+
+def breakHardLinks(outputFilename: str) -> None:
+	"""
+	replaces files of a previous output (see relatedFilePaths) that are
+	hard links (probably to files in cache) with copies of them,
+	so that writers that overwrite them do not change cached files
+	"""
+	for path in relatedFilePaths(outputFilename):
+		if os.stat(path).st_nlink < 2:
+			continue
+		tmpPath = f"{path}.tmp.{os.getpid()}"
+		shutil.copy2(path, tmpPath)
+		os.replace(tmpPath, path)
+
+
+def _hashFile(path: str) -> str:
+	_hash = hashlib.sha256()
+	with open(path, "rb") as _file:
+		while True:
+			block = _file.read(1024 * 1024)
+			if not block:
+				break
+			_hash.update(block)
+	return _hash.hexdigest()
+
+
+def fingerprint(
+	inputFilename: str,
+	params: Dict[str, Any],
+	hashInput: bool = False,
+	outputFilenames: Optional[List[str]] = None,
+) -> str:
+	"""
+	params: everything other than input files that affects the output,
+		values that are not json-serializable are replaced with their repr
+
+	hashInput: use sha256 of input files instead of their size and
+		modification time, slower, but survives copying/downloading them again
+
+	outputFilenames: files that may be written by the conversion (and
+		their related files) are not counted as input files, except
+		inputFilename itself (or files inside it, if it's a directory),
+		for example mydic.idx when converting mydic.txt into mydic.ifo
+		in the same directory
+	"""
+	excludePaths = set()
+	if isdir(inputFilename):
+		outputFilenames = []
+	for outputFilename in outputFilenames or []:
+		excludePaths.update(
+			abspath(path) for path in relatedFilePaths(outputFilename)
+		)
+	excludePaths.discard(abspath(inputFilename))
+	files = []
+	for path in relatedFilePaths(inputFilename):
+		if abspath(path) in excludePaths:
+			continue
+		relPath = os.path.relpath(path, dirname(inputFilename))
+		if hashInput:
+			files.append((relPath, _hashFile(path)))
+			continue
+		stat = os.stat(path)
+		files.append((relPath, stat.st_size, stat.st_mtime_ns))
+	data = json.dumps(
+		{
+			"files": files,
+			"params": params,
+		},
+		sort_keys=True,
+		default=repr,
+	)
+	return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _pathState(path: str) -> Tuple[int, int]:
+	stat = os.stat(path)
+	if not isdir(path):
+		return stat.st_mtime_ns, stat.st_size
+	mtime = stat.st_mtime_ns
+	count = 0
+	for root, _, files in os.walk(path):
+		for fname in files:
+			mtime = max(mtime, os.stat(join(root, fname)).st_mtime_ns)
+			count += 1
+	return mtime, count
+
+
+def dirState(directory: str) -> DirState:
+	return {
+		name: _pathState(join(directory, name))
+		for name in os.listdir(directory)
+	}
+
+
+def changedNames(before: DirState, after: DirState) -> List[str]:
+	return sorted(
+		name for name, state in after.items()
+		if before.get(name) != state
+	)
+
+
+def _linkOrCopy(src: str, dst: str, link: bool) -> None:
+	if os.path.lexists(dst):
+		os.remove(dst)
+	if link:
+		try:
+			os.link(src, dst)
+			return
+		except OSError:
+			pass
+	shutil.copy2(src, dst)
+
+
+def _copyTree(src: str, dst: str, link: bool) -> None:
+	if islink(src) or not isdir(src):
+		_linkOrCopy(src, dst, link)
+		return
+	os.makedirs(dst, exist_ok=True)
+	for name in os.listdir(src):
+		_copyTree(join(src, name), join(dst, name), link)
+
+
+def _treeFiles(path: str) -> Dict[str, Tuple[int, int]]:
+	"relative path => (size, mtime_ns) of files inside directory `path`"
+	result = {}
+	for root, _, files in os.walk(path):
+		for fname in files:
+			fpath = join(root, fname)
+			stat = os.stat(fpath)
+			result[os.path.relpath(fpath, path)] = (stat.st_size, stat.st_mtime_ns)
+	return result
+
+
+class ConversionCache(object):
+	def __init__(
+		self,
+		directory: str,
+		maxSize: int = 0,
+		maxAge: float = 0,
+		link: bool = True,
+	) -> None:
+		"""
+		maxSize: maximum total size of cache in bytes, 0 for no limit
+		maxAge: cache entries that are not used for more than maxAge
+			seconds are removed, 0 for no limit
+		link: use hard links instead of copying files, when possible
+		"""
+		self._dir = directory
+		self._maxSize = maxSize
+		self._maxAge = maxAge
+		self._link = link
+
+	def _metaPath(self, key: str) -> str:
+		return join(self._dir, key, "meta.json")
+
+	def _loadMeta(self, key: str) -> Optional[Dict[str, Any]]:
+		try:
+			with open(self._metaPath(key), encoding="utf-8") as _file:
+				return json.load(_file)
+		except FileNotFoundError:
+			return
+		except Exception as e:
+			log.warning(f"invalid conversion cache entry {key}: {e}")
+			return
+
+	def _saveMeta(self, key: str, meta: Dict[str, Any]) -> None:
+		tmpPath = self._metaPath(key) + f".{os.getpid()}"
+		with open(tmpPath, "w", encoding="utf-8") as _file:
+			json.dump(meta, _file)
+		os.replace(tmpPath, self._metaPath(key))
+
+	def remove(self, key: str) -> None:
+		shutil.rmtree(join(self._dir, key), ignore_errors=True)
+
+	def get(self, key: str, outputDirs: List[str]) -> Optional[Dict[str, Any]]:
+		"""
+		puts cached output files into outputDirs (in the same order that
+		were given to `put`), and returns `extra` that was given to `put`,
+		or None if they are not in cache
+		"""
+		meta = self._loadMeta(key)
+		if meta is None:
+			return
+		entryDir = join(self._dir, key)
+		filesDir = join(entryDir, "files")
+		# with hard links, output files may have been modified in place
+		if {
+			relPath: tuple(value)
+			for relPath, value in meta["files"].items()
+		} != _treeFiles(filesDir):
+			log.warning(f"conversion cache entry {key} is modified, removing")
+			self.remove(key)
+			return
+		if len(meta["dirs"]) != len(outputDirs):
+			return
+		for index, names in enumerate(meta["dirs"]):
+			for name in names:
+				_copyTree(
+					join(filesDir, str(index), name),
+					join(outputDirs[index], name),
+					self._link,
+				)
+		meta["lastUsed"] = now()
+		self._saveMeta(key, meta)
+		return meta["extra"]
+
+	def put(
+		self,
+		key: str,
+		outputDirs: List[str],
+		names: List[List[str]],
+		extra: Dict[str, Any],
+	) -> None:
+		"""
+		names: list of names of created files and directories,
+			for each of outputDirs
+		extra: json-serializable data, returned by `get`
+		"""
+		entryDir = join(self._dir, key)
+		tmpDir = f"{entryDir}.tmp.{os.getpid()}"
+		shutil.rmtree(tmpDir, ignore_errors=True)
+		filesDir = join(tmpDir, "files")
+		for index, outputDir in enumerate(outputDirs):
+			indexDir = join(filesDir, str(index))
+			os.makedirs(indexDir)
+			for name in names[index]:
+				_copyTree(join(outputDir, name), join(indexDir, name), self._link)
+		files = _treeFiles(filesDir)
+		meta = {
+			"created": now(),
+			"lastUsed": now(),
+			"size": sum(size for size, _ in files.values()),
+			"dirs": names,
+			"files": files,
+			"extra": extra,
+		}
+		with open(join(tmpDir, "meta.json"), "w", encoding="utf-8") as _file:
+			json.dump(meta, _file)
+		self.remove(key)
+		try:
+			os.rename(tmpDir, entryDir)
+		except OSError:
+			# added by another process at the same time
+			shutil.rmtree(tmpDir, ignore_errors=True)
+		self.evict()
+
+	def evict(self) -> None:
+		"""
+		removes entries that are not used for more than maxAge, and then
+		least recently used entries until total size is less than maxSize
+		"""
+		if not isdir(self._dir):
+			return
+		entries = []  # type: List[Tuple[float, int, str]]
+		for key in os.listdir(self._dir):
+			if not isdir(join(self._dir, key)) or ".tmp." in key:
+				continue
+			meta = self._loadMeta(key)
+			if meta is None:
+				continue
+			entries.append((meta["lastUsed"], meta["size"], key))
+		entries.sort()
+		totalSize = sum(size for _, size, _ in entries)
+		for lastUsed, size, key in entries:
+			if self._maxAge and now() - lastUsed > self._maxAge:
+				pass
+			elif self._maxSize and totalSize > self._maxSize:
+				pass
+			else:
+				continue
+			log.debug(f"removing conversion cache entry {key}")
+			self.remove(key)
+			totalSize -= size
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath
+import os
+import sys
+import tempfile
+import unittest
+from time import time as now
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary import glossary as glossary_module
+from pyglossary.glossary import Glossary
+from pyglossary.conversion_cache import (
+	ConversionCache,
+	fingerprint,
+	relatedFilePaths,
+	breakHardLinks,
+)
+
+
+def writeFile(path: str, data: str) -> None:
+	with open(path, "w", encoding="utf-8") as _file:
+		_file.write(data)
+
+
+def readFile(path: str) -> str:
+	with open(path, encoding="utf-8") as _file:
+		return _file.read()
+
+
+class ConversionCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+		self.cacheDir = join(self.dir, "cache")
+		self.outDir = join(self.dir, "out")
+		os.mkdir(self.outDir)
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def test_relatedFilePaths(self):
+		for fname in ("dic.ifo", "dic.idx", "dic.dict.dz", "other.ifo"):
+			writeFile(join(self.dir, fname), fname)
+		self.assertEqual(
+			[os.path.basename(path) for path in relatedFilePaths(join(self.dir, "dic.ifo"))],
+			["dic.dict.dz", "dic.idx", "dic.ifo"],
+		)
+
+	def test_fingerprint(self):
+		path = join(self.dir, "dic.txt")
+		writeFile(path, "a\tb\n")
+		key1 = fingerprint(path, {"a": 1})
+		self.assertEqual(fingerprint(path, {"a": 1}), key1)
+		self.assertNotEqual(fingerprint(path, {"a": 2}), key1)
+
+		hashKey = fingerprint(path, {"a": 1}, hashInput=True)
+		stat = os.stat(path)
+		os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+		self.assertNotEqual(fingerprint(path, {"a": 1}), key1)
+		self.assertEqual(fingerprint(path, {"a": 1}, hashInput=True), hashKey)
+
+		writeFile(join(self.dir, "dic.txt.1"), "c\td\n")
+		self.assertNotEqual(fingerprint(path, {"a": 1}, hashInput=True), hashKey)
+
+	def test_fingerprint_sameStemOutput(self):
+		path = join(self.dir, "dic.txt")
+		outputPath = join(self.dir, "dic.ifo")
+		writeFile(path, "a\tb\n")
+		key = fingerprint(path, {}, outputFilenames=[outputPath])
+		writeFile(outputPath, "ifo")
+		writeFile(join(self.dir, "dic.idx"), "idx")
+		self.assertEqual(fingerprint(path, {}, outputFilenames=[outputPath]), key)
+		writeFile(path, "a\tc\n")
+		self.assertNotEqual(fingerprint(path, {}, outputFilenames=[outputPath]), key)
+
+	def test_put_get(self):
+		cache = ConversionCache(self.cacheDir)
+		writeFile(join(self.outDir, "out.txt"), "output")
+		os.mkdir(join(self.outDir, "res"))
+		writeFile(join(self.outDir, "res", "a.png"), "png")
+		cache.put("key1", [self.outDir], [["out.txt", "res"]], {"x": 1})
+
+		outDir2 = join(self.dir, "out2")
+		os.mkdir(outDir2)
+		self.assertIsNone(cache.get("key2", [outDir2]))
+		self.assertEqual(cache.get("key1", [outDir2]), {"x": 1})
+		self.assertEqual(readFile(join(outDir2, "out.txt")), "output")
+		self.assertEqual(readFile(join(outDir2, "res", "a.png")), "png")
+
+		# modified in place, through a hard link
+		breakHardLinks(join(self.outDir, "out.txt"))
+		with open(join(outDir2, "out.txt"), "a") as _file:
+			_file.write("modified")
+		self.assertIsNone(cache.get("key1", [outDir2]))
+		self.assertFalse(os.path.exists(join(self.cacheDir, "key1")))
+
+	def test_breakHardLinks(self):
+		cache = ConversionCache(self.cacheDir)
+		path = join(self.outDir, "out.txt")
+		writeFile(path, "output")
+		cache.put("key1", [self.outDir], [["out.txt"]], {})
+		self.assertEqual(os.stat(path).st_nlink, 2)
+		breakHardLinks(path)
+		self.assertEqual(os.stat(path).st_nlink, 1)
+		writeFile(path, "new output")
+		self.assertEqual(cache.get("key1", [self.outDir]), {})
+		self.assertEqual(readFile(path), "output")
+
+	def test_evict(self):
+		cache = ConversionCache(self.cacheDir, link=False)
+		for index in range(4):
+			writeFile(join(self.outDir, f"out{index}.txt"), "x" * 100)
+			cache.put(f"key{index}", [self.outDir], [[f"out{index}.txt"]], {})
+		cache.get("key0", [self.outDir])
+
+		ConversionCache(self.cacheDir, maxSize=250).evict()
+		self.assertEqual(
+			sorted(os.listdir(self.cacheDir)),
+			["key0", "key3"],
+		)
+
+		meta = cache._loadMeta("key3")
+		meta["lastUsed"] = now() - 100
+		cache._saveMeta("key3", meta)
+		ConversionCache(self.cacheDir, maxAge=50).evict()
+		self.assertEqual(os.listdir(self.cacheDir), ["key0"])
+
+
+class GlossaryConvertCacheTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+		self._cacheDir = glossary_module.cacheDir
+		glossary_module.cacheDir = join(self.dir, "cache")
+
+	def tearDown(self):
+		glossary_module.cacheDir = self._cacheDir
+		self.tmpDir.cleanup()
+
+	def convert(self, inputFilename, outputFilename, **kwargs):
+		return Glossary().convert(
+			inputFilename=inputFilename,
+			outputFilename=outputFilename,
+			progressbar=False,
+			cache=True,
+			**kwargs
+		)
+
+	def test_convert(self):
+		inputPath = join(self.dir, "in.txt")
+		outputPath = join(self.dir, "out.csv")
+		writeFile(inputPath, "hello\tsalam\nbye\tkhodahafez\n")
+		self.assertEqual(self.convert(inputPath, outputPath), outputPath)
+		output = readFile(outputPath)
+		os.remove(outputPath)
+
+		self.assertEqual(self.convert(inputPath, outputPath), outputPath)
+		self.assertEqual(readFile(outputPath), output)
+		self.assertEqual(len(os.listdir(join(self.dir, "cache", "conversions"))), 1)
+
+		# a different write option makes a new cache entry
+		self.convert(inputPath, outputPath, writeOptions={"delimiter": ";"})
+		self.assertIn(";", readFile(outputPath))
+		self.assertEqual(len(os.listdir(join(self.dir, "cache", "conversions"))), 2)
+
+		self.assertEqual(self.convert(inputPath, outputPath), outputPath)
+		self.assertEqual(readFile(outputPath), output)
+
+		writeFile(inputPath, "hello\tsalam\n")
+		self.convert(inputPath, outputPath)
+		self.assertNotIn("bye", readFile(outputPath))
+		self.assertEqual(len(os.listdir(join(self.dir, "cache", "conversions"))), 3)
+
+	def test_convert_sameStem(self):
+		inputPath = join(self.dir, "dic.txt")
+		outputPath = join(self.dir, "dic.csv")
+		writeFile(inputPath, "hello\tsalam\n")
+		self.convert(inputPath, outputPath)
+		self.convert(inputPath, outputPath)
+		self.convert(inputPath, outputPath)
+		self.assertEqual(len(os.listdir(join(self.dir, "cache", "conversions"))), 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
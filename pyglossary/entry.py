@@ -10,6 +10,7 @@ from os.path import (
 	getsize,
 )
 from typing import (
+	Union,
 	Optional,
 	Tuple,
 	List,
@@ -20,8 +21,10 @@ from typing import (
 
 from .entry_base import BaseEntry, MultiStr, RawEntryType
 from .iter_utils import unique_everseen
+from .os_utils import copyFile
 
 from pickle import dumps, loads
+from hashlib import sha256
 from zlib import compress, decompress
 
 import logging
@@ -34,6 +37,9 @@ class DataEntry(BaseEntry):
 		"_fname",
 		"_data",
 		"_tmpPath",
+		"_srcPath",
+		"_link",
+		"_digest",
 	]
 
 	def isData(self) -> bool:
@@ -54,38 +60,84 @@ class DataEntry(BaseEntry):
 
 		self._fname = fname
 		self._data = data  # bytes instance
+		# temp file that belongs to this entry, moved by save()
 		self._tmpPath = tmpPath
+		# file of input (see fromSourceFile), copied by save()
+		self._srcPath = None
+		self._link = False
+		# sha256 of data (hex), see contentHash
+		self._digest = None
 
 	def getFileName(self) -> str:
 		return self._fname
 
 	@property
 	def data(self) -> bytes:
-		if self._tmpPath:
-			with open(self._tmpPath, "rb") as fromFile:
+		path = self._srcPath or self._tmpPath
+		if path:
+			with open(path, "rb") as fromFile:
 				return fromFile.read()
 		else:
 			return self._data
 
 	def size(self):
-		if self._tmpPath:
-			return getsize(self._tmpPath)
+		path = self._srcPath or self._tmpPath
+		if path:
+			return getsize(path)
 		else:
 			return len(self._data)
 
-	def save(self, directory: str) -> str:
+	def contentHash(self) -> Optional[str]:
+		"""
+		sha256 of data (hex), or None if it's not known without reading
+		a file (it's known for files of pyglossary/resource_store.py)
+		"""
+		if self._digest is None and not (self._srcPath or self._tmpPath):
+			self._digest = sha256(self._data).hexdigest()
+		return self._digest
+
+	def keepFile(self) -> None:
+		"""
+		makes save() copy the temp file of entry, instead of moving it
+		"""
+		if self._tmpPath:
+			self._srcPath = self._tmpPath
+			self._tmpPath = None
+
+	def save(
+		self,
+		directory: str,
+		dedup: Optional[Dict[str, str]] = None,
+	) -> str:
+		"""
+		dedup: content hash => path of saved file, of one output directory
+			a data entry with the same content hash as a saved one is
+			hard-linked to it (if possible) instead of being written again
+		"""
 		fname = self._fname
 		# fix filename depending on operating system? FIXME
 		fpath = join(directory, fname)
 		fdir = dirname(fpath)
 		if not exists(fdir):
 			os.makedirs(fdir)
-		if self._tmpPath:
+		digest = None
+		if dedup is not None:
+			digest = self.contentHash()
+			if digest in dedup:
+				copyFile(dedup[digest], fpath, link=True)
+				return fpath
+		if self._srcPath:
+			copyFile(self._srcPath, fpath, link=self._link)
+		elif self._tmpPath:
 			shutil.move(self._tmpPath, fpath)
-			self._tmpPath = fpath
+			# copy it if entry is saved again (into another output)
+			self._tmpPath = None
+			self._srcPath = fpath
 		else:
 			with open(fpath, "wb") as toFile:
 				toFile.write(self._data)
+		if digest is not None:
+			dedup[digest] = fpath
 		return fpath
 
 	@property
@@ -150,14 +202,22 @@ class DataEntry(BaseEntry):
 		pass
 
 	def getRaw(self, glos: "GlossaryType") -> RawEntryType:
-		b_fpath = b""
-		if glos.tmpDataDir:
-			b_fpath = self.save(glos.tmpDataDir).encode("utf-8")
-		tpl = (
-			self._fname.encode("utf-8"),
-			b_fpath,
-			"b",
-		)
+		if self._srcPath:
+			# "B": file is not moved by save()
+			tpl = (
+				self._fname.encode("utf-8"),
+				self._srcPath.encode("utf-8"),
+				"B",
+			)
+		else:
+			b_fpath = b""
+			if glos.tmpDataDir:
+				b_fpath = self.save(glos.tmpDataDir).encode("utf-8")
+			tpl = (
+				self._fname.encode("utf-8"),
+				b_fpath,
+				"b",
+			)
 		if glos._rawEntryCompress:
 			return compress(dumps(tpl), level=9)
 		return tpl
@@ -168,6 +228,28 @@ class DataEntry(BaseEntry):
 		entry._tmpPath = fpath
 		return entry
 
+	@classmethod
+	def fromSourceFile(
+		cls,
+		fname: str,
+		fpath: str,
+		link: bool = False,
+		digest: Optional[str] = None,
+	) -> "DataEntry":
+		"""
+		data entry that refers to file `fpath` (of input), without
+		reading it into memory, save() copies it (see os_utils.copyFile)
+
+		link: save() makes a hard link if possible, so input and output
+			share the same file
+		digest: content hash, if it's known (see contentHash)
+		"""
+		entry = DataEntry(fname, b"")
+		entry._srcPath = fpath
+		entry._link = link
+		entry._digest = digest
+		return entry
+
 
 class Entry(BaseEntry):
 	sep = "|"
@@ -463,20 +545,205 @@ class Entry(BaseEntry):
 		"""
 		if isinstance(rawEntry, bytes):
 			rawEntry = loads(decompress(rawEntry))
-		word = rawEntry[0].decode("utf-8")
-		defi = rawEntry[1].decode("utf-8")
+		b_word = rawEntry[0]
+		b_defi = rawEntry[1]
 		if len(rawEntry) > 2:
 			defiFormat = rawEntry[2]
 			if defiFormat == "b":
-				return DataEntry.fromFile(glos, word, defi)
+				return DataEntry.fromFile(
+					glos,
+					b_word.decode("utf-8"),
+					b_defi.decode("utf-8"),
+				)
+			if defiFormat == "B":
+				return glos.newDataEntryFromFile(
+					b_word.decode("utf-8"),
+					b_defi.decode("utf-8"),
+				)
 		else:
 			defiFormat = defaultDefiFormat
 
 		if glos.getPref("enable_alts", True):
-			word = word.split(cls.sep)
+			b_word = b_word.split(b"|")
 
-		return cls(
-			word,
-			defi,
+		# words and definition are decoded only if they are accessed
+		return BytesEntry(
+			b_word,
+			b_defi,
 			defiFormat=defiFormat,
 		)
+
+
+class BytesEntry(Entry):
+	"""
+		an Entry that is created from utf-8 encoded word(s) and definition,
+		and decodes them only when they are accessed (as str)
+
+		b_word, lb_word and b_defi return the original bytes (without
+		decoding and encoding again), unless they are modified
+	"""
+
+	__slots__ = [
+		"_lb_word",
+		"_b_defi",
+	]
+
+	def __init__(
+		self,
+		b_word: "Union[bytes, List[bytes]]",
+		b_defi: bytes,
+		defiFormat: str = "m",
+		byteProgress: Optional[Tuple[int, int]] = None,
+	) -> None:
+		"""
+			b_word: bytes or a list of bytes (including alternate words)
+			b_defi: bytes
+			defiFormat (optional): definition format:
+				"m": plain text
+				"h": html
+				"x": xdxf
+		"""
+		if isinstance(b_word, bytes):
+			b_word = [b_word]
+		elif not isinstance(b_word, list):
+			raise TypeError(f"invalid b_word type {type(b_word)}")
+
+		if not isinstance(b_defi, bytes):
+			raise TypeError(f"invalid b_defi type {type(b_defi)}")
+
+		if defiFormat not in ("m", "h", "x"):
+			raise ValueError(f"invalid defiFormat {defiFormat!r}")
+
+		self._lb_word = b_word  # None after words are modified
+		self._b_defi = b_defi  # None after definition is modified
+		self._word = None  # None until words are decoded
+		self._defi = None  # None until definition is decoded
+		self._defiFormat = defiFormat
+		self._byteProgress = byteProgress
+
+	def _decodeWord(self) -> None:
+		lb_word = self._lb_word
+		if len(lb_word) == 1:
+			self._word = lb_word[0].decode("utf-8")
+		else:
+			self._word = [b_word.decode("utf-8") for b_word in lb_word]
+
+	@property
+	def s_word(self) -> str:
+		word = self._word
+		if word is None:
+			self._decodeWord()
+			word = self._word
+		if isinstance(word, str):
+			return word
+		return self._join(word)
+
+	@property
+	def l_word(self) -> List[str]:
+		word = self._word
+		if word is None:
+			self._decodeWord()
+			word = self._word
+		if isinstance(word, str):
+			return [word]
+		return word
+
+	@property
+	def defi(self) -> str:
+		if self._defi is None:
+			self._defi = self._b_defi.decode("utf-8")
+		return self._defi
+
+	@property
+	def b_word(self) -> bytes:
+		lb_word = self._lb_word
+		if lb_word is None:
+			return self.s_word.encode("utf-8")
+		if len(lb_word) == 1:
+			return lb_word[0]
+		return b"|".join([
+			b_word.replace(b"|", b"\\|")
+			for b_word in lb_word
+		])
+
+	@property
+	def lb_word(self) -> List[bytes]:
+		if self._lb_word is None:
+			return [word.encode("utf-8") for word in self.l_word]
+		return self._lb_word
+
+	@property
+	def b_defi(self) -> bytes:
+		if self._b_defi is None:
+			return self.defi.encode("utf-8")
+		return self._b_defi
+
+	def _editWord(self, method: Callable, *args) -> None:
+		"""
+			calls Entry.method(self, *args) that modifies the word(s)
+			original bytes are dropped only if words are changed
+		"""
+		if self._word is None:
+			self._decodeWord()
+		word = self._word
+		method(self, *args)
+		if self._lb_word is None:
+			return
+		newWord = self._word
+		if newWord is word:
+			return
+		if isinstance(word, str):
+			if newWord != word:
+				self._lb_word = None
+		elif list(newWord) != list(word):
+			self._lb_word = None
+
+	def _editDefi(self, method: Callable, *args) -> None:
+		"""
+			calls Entry.method(self, *args) that modifies the definition
+			original bytes are dropped only if definition is changed
+		"""
+		if self._defi is None:
+			self._defi = self._b_defi.decode("utf-8")
+		defi = self._defi
+		method(self, *args)
+		if self._b_defi is not None and self._defi != defi:
+			self._b_defi = None
+
+	def addAlt(self, alt: str) -> None:
+		# Entry.addAlt may modify the list of words in place
+		self._editWord(Entry.addAlt, alt)
+		self._lb_word = None
+
+	def editFuncWord(self, func: Callable[[str], str]) -> None:
+		word = self._word
+		if word is None:
+			self._decodeWord()
+			word = self._word
+		if isinstance(word, str):
+			newWord = func(word)
+			if newWord != word:
+				self._lb_word = None
+		else:
+			newWord = tuple(func(st) for st in word)
+			if list(newWord) != list(word):
+				self._lb_word = None
+		self._word = newWord
+
+	def editFuncDefi(self, func: Callable[[str], str]) -> None:
+		defi = self._defi
+		if defi is None:
+			defi = self._b_defi.decode("utf-8")
+		newDefi = func(defi)
+		if newDefi != defi:
+			self._b_defi = None
+		self._defi = newDefi
+
+	def replaceInWord(self, source: str, target: str) -> None:
+		self._editWord(Entry.replaceInWord, source, target)
+
+	def replaceInDefi(self, source: str, target: str) -> None:
+		self._editDefi(Entry.replaceInDefi, source, target)
+
+	def removeEmptyAndDuplicateAltWords(self):
+		self._editWord(Entry.removeEmptyAndDuplicateAltWords)
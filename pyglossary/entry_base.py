@@ -55,6 +55,13 @@ class BaseEntry(object):
 		"""
 		return self.s_word.encode("utf-8")
 
+	@property
+	def lb_word(self) -> List[bytes]:
+		"""
+			returns list of bytes of the word and all the alternate words
+		"""
+		return [word.encode("utf-8") for word in self.l_word]
+
 	@property
 	def b_defi(self):
 		"""
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+batch protocol, for passing entries between readers, entry filters
+and writers in lists, instead of one entry at a time
+
+a Reader can (optionally) have a method:
+	readBatches(batchSize: int) -> Iterator[List[BaseEntry]]
+which yields the same entries as iterating over the reader, in lists of
+(about) batchSize entries, without None items
+
+a Writer can (optionally) have a method:
+	writeBatch() -> Generator[None, Optional[List[BaseEntry]], None]
+which works like Writer.write(), except that lists of entries are sent to
+the generator instead of single entries, and None is sent at the end
+"""
+
+from typing import (
+	Iterable,
+	Iterator,
+	List,
+	Generator,
+	Optional,
+)
+
+from .entry_base import BaseEntry
+
+
+def iterBatches(
+	entries: Iterable[Optional[BaseEntry]],
+	batchSize: int,
+) -> Iterator[List[BaseEntry]]:
+	"""
+		fallback for readers (or entry generators) that do not support
+		the batch protocol, skips None items
+	"""
+	batch = []
+	for entry in entries:
+		if entry is None:
+			continue
+		batch.append(entry)
+		if len(batch) >= batchSize:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+def entryWriterFromBatchWriter(
+	batchGen: Generator[None, Optional[List[BaseEntry]], None],
+) -> Generator[None, Optional[BaseEntry], None]:
+	"""
+		makes a Writer.write() generator out of a Writer.writeBatch() generator
+		so a writer only needs to implement writeBatch
+	"""
+	batchGen.send(None)
+	while True:
+		entry = yield
+		if entry is None:
+			break
+		batchGen.send([entry])
+	try:
+		batchGen.send(None)
+	except StopIteration:
+		pass
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import dirname, abspath
+import sys
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+from pyglossary.entry import Entry
+from pyglossary.entry_batch import iterBatches, entryWriterFromBatchWriter
+from pyglossary.text_reader import TextGlossaryReader
+
+
+class LineReader(TextGlossaryReader):
+	def isInfoWord(self, word):
+		return word.startswith("#")
+
+	def fixInfoWord(self, word):
+		return word.lstrip("#")
+
+	def nextPair(self):
+		if not self._file:
+			raise StopIteration
+		line = self._file.readline()
+		if not line:
+			raise StopIteration
+		line = line.rstrip("\n")
+		if not line:
+			return
+		word, _, defi = line.partition("\t")
+		return word, defi
+
+
+class EntryBatchTest(unittest.TestCase):
+	def test_iterBatches(self):
+		items = [Entry(str(i), "") for i in range(7)]
+		batches = list(iterBatches(items[:3] + [None] + items[3:], 3))
+		self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+		self.assertEqual(sum(batches, []), items)
+		self.assertEqual(list(iterBatches([], 3)), [])
+
+	def test_entryWriterFromBatchWriter(self):
+		received = []
+
+		def writeBatch():
+			while True:
+				entries = yield
+				if entries is None:
+					break
+				received.extend(entries)
+			received.append("finished")
+
+		gen = entryWriterFromBatchWriter(writeBatch())
+		gen.send(None)
+		gen.send("a")
+		gen.send("b")
+		with self.assertRaises(StopIteration):
+			gen.send(None)
+		self.assertEqual(received, ["a", "b", "finished"])
+
+	def test_readBatches(self):
+		lines = ["#name\ttest", "", "a\t1"] + [
+			f"w{i}\td{i}" for i in range(20)
+		]
+		with tempfile.NamedTemporaryFile(
+			"w",
+			suffix=".txt",
+			encoding="utf-8",
+		) as tmpFile:
+			tmpFile.write("\n".join(lines) + "\n")
+			tmpFile.flush()
+
+			glos = Glossary()
+			reader = LineReader(glos)
+			reader.open(tmpFile.name)
+			expected = [
+				(entry.s_word, entry.defi)
+				for entry in reader
+				if entry is not None
+			]
+			reader.close()
+
+			reader = LineReader(glos)
+			reader.open(tmpFile.name)
+			batches = list(reader.readBatches(8))
+			reader.close()
+
+		self.assertEqual(len(expected), 21)
+		self.assertEqual(glos.getInfo("name"), "test")
+		self.assertEqual([len(batch) for batch in batches], [8, 8, 5])
+		self.assertEqual(
+			[(entry.s_word, entry.defi) for batch in batches for entry in batch],
+			expected,
+		)
+		for batch in batches[:-1]:
+			self.assertIsNotNone(batch[-1].byteProgress())
+
+
+if __name__ == "__main__":
+	unittest.main()
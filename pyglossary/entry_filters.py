@@ -6,6 +6,8 @@ import logging
 from typing import (
 	Optional,
 	List,
+	Tuple,
+	Callable,
 )
 
 from .text_utils import (
@@ -18,6 +20,8 @@ from .glossary import Glossary
 
 log = logging.getLogger("root")
 
+StrFunc = Optional[Callable[[str], str]]
+
 
 class EntryFilter(object):
 	name = ""
@@ -26,12 +30,28 @@ class EntryFilter(object):
 	def __init__(self, glos: Glossary):
 		self.glos = glos
 
+	def __getstate__(self) -> dict:
+		"""
+			for sending (prepared) entry filters to worker processes
+			glossary is not sent, `run` method must not use `self.glos`
+		"""
+		state = self.__dict__.copy()
+		state.pop("glos", None)
+		return state
+
 	def prepare(self) -> None:
 		"""
 			run this after glossary info is set and ready
 		"""
 		pass
 
+	def cacheKey(self) -> str:
+		"""
+			identifies the filter and its arguments, used in fingerprint
+			of conversions (see pyglossary/conversion_cache.py)
+		"""
+		return self.name
+
 	def run(self, entry: BaseEntry) -> Optional[BaseEntry]:
 		"""
 			returns an Entry object, or None to skip
@@ -41,6 +61,19 @@ class EntryFilter(object):
 		"""
 		return entry
 
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		"""
+			for filters that only edit words and/or definition of non-data
+			entries (and never skip an entry), returns a tuple of
+			(wordFunc, defiFunc), that are used instead of `run` method,
+			each one is a function that takes and returns a string,
+			or None if the filter does not change words / definition
+			run this after prepare()
+
+			returns None for other filters
+		"""
+		return None
+
 
 class StripEntryFilter(EntryFilter):
 	name = "strip"
@@ -51,6 +84,18 @@ class StripEntryFilter(EntryFilter):
 		entry.replace("\r", "")
 		return entry
 
+	def _fixWord(self, st: str) -> str:
+		return st.strip().replace("\r", "")
+
+	def _fixDefi(self, st: str) -> str:
+		st = st.strip()
+		while st.endswith('<BR>') or st.endswith('<br>'):
+			st = st[:-4]
+		return st.replace("\r", "")
+
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		return self._fixWord, self._fixDefi
+
 
 class NonEmptyWordFilter(EntryFilter):
 	name = "non_empty_word"
@@ -93,11 +138,42 @@ class FixUnicodeFilter(EntryFilter):
 	name = "fix_unicode"
 	desc = "Fix Unicode"
 
+	def __init__(self, glos: Glossary):
+		EntryFilter.__init__(self, glos)
+		self._func = fixUtf8
+
+	def prepare(self) -> None:
+		# for a str that can be encoded to utf-8 (has no lone surrogates),
+		# fixUtf8 only removes null characters.
+		# entries loaded into memory (indirect mode) are already encoded
+		# to utf-8, and readers with validUtf8 = True decode their input
+		# as strict utf-8
+		if all(
+			getattr(reader, "validUtf8", False)
+			for reader in self.glos._readers
+		):
+			self._func = self._removeNull
+		else:
+			self._func = self._fixStr
+
+	def _removeNull(self, st: str) -> str:
+		if "\x00" in st:
+			return st.replace("\x00", "")
+		return st
+
+	def _fixStr(self, st: str) -> str:
+		if st.isascii():
+			return self._removeNull(st)
+		return fixUtf8(st)
+
 	def run(self, entry: BaseEntry) -> Optional[BaseEntry]:
-		entry.editFuncWord(fixUtf8)
-		entry.editFuncDefi(fixUtf8)
+		entry.editFuncWord(self._func)
+		entry.editFuncDefi(self._func)
 		return entry
 
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		return self._func, self._func
+
 
 class LowerWordFilter(EntryFilter):
 	name = "lower_word"
@@ -107,6 +183,9 @@ class LowerWordFilter(EntryFilter):
 		entry.editFuncWord(str.lower)
 		return entry
 
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		return str.lower, None
+
 
 class RemoveHtmlTagsAll(EntryFilter):
 	name = "remove_html_all"
@@ -121,19 +200,21 @@ class RemoveHtmlTagsAll(EntryFilter):
 			re.IGNORECASE,
 		)
 
-	def run(self, entry: BaseEntry) -> Optional[BaseEntry]:
+	def _fixDefi(self, st: str) -> str:
 		from bs4 import BeautifulSoup
+		st = self._p_pattern.sub("\\2\n", st)
+		# if there is </p> left without opening, replace with <br>
+		st = st.replace("</p>", "\n")
+		st = self._br_pattern.sub("\n", st)
+		return BeautifulSoup(st, "lxml").text
 
-		def fixStr(st: str) -> str:
-			st = self._p_pattern.sub("\\2\n", st)
-			# if there is </p> left without opening, replace with <br>
-			st = st.replace("</p>", "\n")
-			st = self._br_pattern.sub("\n", st)
-			return BeautifulSoup(st, "lxml").text
-
-		entry.editFuncDefi(fixStr)
+	def run(self, entry: BaseEntry) -> Optional[BaseEntry]:
+		entry.editFuncDefi(self._fixDefi)
 		return entry
 
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		return None, self._fixDefi
+
 
 class RemoveHtmlTags(EntryFilter):
 	name = "remove_html"
@@ -142,6 +223,9 @@ class RemoveHtmlTags(EntryFilter):
 		self.glos = glos
 		self.tags = tags
 
+	def cacheKey(self) -> str:
+		return self.name + ":" + ",".join(self.tags)
+
 	def run(self, entry: BaseEntry) -> Optional[BaseEntry]:
 		import re
 
@@ -189,6 +273,9 @@ class NormalizeHtml(EntryFilter):
 		entry.editFuncDefi(self._fixDefi)
 		return entry
 
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		return None, self._fixDefi
+
 
 class SkipDataEntryFilter(EntryFilter):
 	name = "skip_resources"
@@ -232,6 +319,12 @@ class LangEntryFilter(EntryFilter):
 			entry = self._run_func(entry)
 		return entry
 
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		if self._run_func == self.run_fa:
+			from pyglossary.persian_utils import faEditStr
+			return faEditStr, faEditStr
+		return None, None
+
 
 class CleanEntryFilter(EntryFilter):  # FIXME
 	name = "clean"
@@ -273,3 +366,102 @@ class CleanEntryFilter(EntryFilter):  # FIXME
 	def run(self, entry: BaseEntry) -> Optional[BaseEntry]:
 		entry.editFuncDefi(self.cleanDefi)
 		return entry
+
+	def editFuncs(self) -> Optional[Tuple[StrFunc, StrFunc]]:
+		return None, self.cleanDefi
+
+
+def _joinStrFuncs(funcs: List[Callable[[str], str]]) -> Callable[[str], str]:
+	if len(funcs) == 1:
+		return funcs[0]
+
+	def func(st: str) -> str:
+		for f in funcs:
+			st = f(st)
+		return st
+
+	return func
+
+
+def _editEntryFunc(
+	wordFuncs: List[Callable[[str], str]],
+	defiFuncs: List[Callable[[str], str]],
+) -> Callable[[BaseEntry], Optional[BaseEntry]]:
+	wordFunc = _joinStrFuncs(wordFuncs) if wordFuncs else None
+	defiFunc = _joinStrFuncs(defiFuncs) if defiFuncs else None
+
+	def editEntry(entry: BaseEntry) -> Optional[BaseEntry]:
+		if entry.isData():
+			return entry
+		if wordFunc is not None:
+			entry.editFuncWord(wordFunc)
+		if defiFunc is not None:
+			entry.editFuncDefi(defiFunc)
+		return entry
+
+	return editEntry
+
+
+def fuseEntryFilters(
+	entryFilters: List[EntryFilter],
+) -> Callable[[BaseEntry], Optional[BaseEntry]]:
+	"""
+		returns one function that runs all of `entryFilters` on an entry,
+		and returns the entry, or None to skip it
+		adjacent filters that only edit words / definition (see
+		EntryFilter.editFuncs) are merged into one step that edits each
+		word and the definition once, and filters that do not change
+		anything are left out
+		run this after calling prepare() on all entry filters
+	"""
+	steps = []  # type: List[Callable[[BaseEntry], Optional[BaseEntry]]]
+	wordFuncs = []  # type: List[Callable[[str], str]]
+	defiFuncs = []  # type: List[Callable[[str], str]]
+	for entryFilter in entryFilters:
+		funcs = entryFilter.editFuncs()
+		if funcs is None:
+			if wordFuncs or defiFuncs:
+				steps.append(_editEntryFunc(wordFuncs, defiFuncs))
+				wordFuncs, defiFuncs = [], []
+			steps.append(entryFilter.run)
+			continue
+		wordFunc, defiFunc = funcs
+		if wordFunc is not None:
+			wordFuncs.append(wordFunc)
+		if defiFunc is not None:
+			defiFuncs.append(defiFunc)
+	if wordFuncs or defiFuncs:
+		steps.append(_editEntryFunc(wordFuncs, defiFuncs))
+
+	def run(entry: BaseEntry) -> Optional[BaseEntry]:
+		for step in steps:
+			entry = step(entry)
+			if not entry:
+				return None
+		return entry
+
+	return run
+
+
+# fused entry filters of worker process, used by Glossary when entry
+# filters are running in parallel (filter_workers > 0)
+_workerEntryFiltersFunc = None  # type: Callable[[BaseEntry], Optional[BaseEntry]]
+
+
+def initFiltersWorker(entryFilters: List[EntryFilter]) -> None:
+	global _workerEntryFiltersFunc
+	_workerEntryFiltersFunc = fuseEntryFilters(entryFilters)
+
+
+def runFiltersBatch(
+	entries: List[Optional[BaseEntry]],
+) -> List[Optional[BaseEntry]]:
+	"""
+		runs in worker process
+		returns a list of the same size, with None for skipped entries
+	"""
+	run = _workerEntryFiltersFunc
+	return [
+		None if entry is None else (run(entry) or None)
+		for entry in entries
+	]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import dirname, abspath
+import sys
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+from pyglossary.entry import Entry, DataEntry
+from pyglossary.entry_filters import fuseEntryFilters
+
+
+class MockUI(object):
+	def __init__(self, pref):
+		self.pref = pref
+
+
+class FuseEntryFiltersTest(unittest.TestCase):
+	def newEntries(self):
+		return [
+			Entry(" Hello \r", "  a <b>greeting</b>\r\n<br>"),
+			Entry(["Foo\x00", " bar", ""], "foo\n \n bar ,"),
+			Entry("  ", "empty word"),
+			Entry("empty defi", " <BR>"),
+			Entry("يك", "ي ك ♦  x"),
+			DataEntry("image.png", b"data"),
+		]
+
+	def runSerial(self, glos, entry):
+		for entryFilter in glos._entryFilters:
+			entry = entryFilter.run(entry)
+			if not entry:
+				return None
+		return entry
+
+	def toTuple(self, entry):
+		if entry is None:
+			return None
+		return (entry.l_word, entry.defi, entry.defiFormat)
+
+	def case(self, pref, info=None):
+		glos = Glossary(info=info, ui=MockUI(pref))
+		glos.updateEntryFilters()
+		glos.prepareEntryFilters()
+		run = fuseEntryFilters(glos._entryFilters)
+		for entry1, entry2 in zip(self.newEntries(), self.newEntries()):
+			self.assertEqual(
+				self.toTuple(run(entry1)),
+				self.toTuple(self.runSerial(glos, entry2)),
+			)
+
+	def test_default(self):
+		self.case({})
+
+	def test_no_lower(self):
+		self.case({"lower": False, "utf8Check": False})
+
+	def test_normalize_html(self):
+		self.case({"normalize_html": True, "skipResources": True})
+
+	def test_persian(self):
+		self.case({}, info={"sourceLang": "Persian"})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+from array import array
+from collections import OrderedDict
+from pickle import loads
+from zlib import (
+	compressobj,
+	decompress,
+	decompressobj,
+	DEFLATED,
+	MAX_WBITS,
+)
+
+from typing import (
+	Any,
+	Callable,
+	Iterator,
+	Optional,
+	Tuple,
+)
+
+from .entry_base import RawEntryType
+
+import logging
+log = logging.getLogger("root")
+
+# zlib memLevel for compressing blocks, blocks are small, and the default (8)
+# makes creating (or copying) a compressor several times slower
+_memLevel = 4
+
+
+class EntryList(object):
+	"""
+		compact in-memory list of raw entries, used in indirect mode
+
+		words and definitions of all entries are packed into one bytearray
+		(arena), and for each entry we only keep its offset, word length,
+		definition length and defiFormat in arrays (columns)
+		so there is no Python object per entry
+
+		sort() does not move the data, it only keeps an index permutation
+		sort keys are computed from words in arena (without decoding entries)
+		and only kept while sorting
+
+		after startCompression() is called (by Glossary.loadReader, with
+		entry_compress pref or when memory usage is high, see MemoryBudget),
+		entries that are added are compressed in blocks of `blockSize`
+		entries, with a preset dictionary (zlib zdict) taken from the last
+		`zdictSize` bytes of entries that were added before (a sample),
+		so even small blocks are compressed well
+		entries are added to an open block in the arena, and the block is
+		compressed (and removed from arena) when it's full
+		a few decompressed blocks (`cacheSize`) are kept for reading
+		entries, which works well for iterating and computing sort keys
+		(in order of adding), but in sorted order most entries need
+		decompressing a block, so a smaller blockSize is faster for sorted
+		glossaries, and a larger one compresses better
+	"""
+
+	zdictSize = 32 * 1024
+
+	def __init__(
+		self,
+		blockSize: int = 4,
+		level: int = 1,
+		cacheSize: int = 8,
+	) -> None:
+		"""
+			blockSize: number of entries in each compressed block
+			level: zlib compression level, 1 (fastest) to 9 (smallest)
+			cacheSize: number of decompressed blocks to keep
+		"""
+		self.blockSize = blockSize
+		self.level = level
+		self.cacheSize = cacheSize
+		self.clear()
+
+	def clear(self) -> None:
+		self._arena = bytearray()
+		# offset in arena, or in decompressed block for compressed entries
+		self._offsets = array("Q")
+		self._wordLens = array("I")
+		self._defiLens = array("I")
+		# one byte per entry: ord(defiFormat), or 0 for default defiFormat
+		self._formats = bytearray()
+		self._order = None  # type: Optional[array]
+
+		self._compress = False
+		# index of first compressed entry, None until sample is large enough
+		self._blockFirst = None  # type: Optional[int]
+		# offset of open (not compressed yet) block in arena
+		self._openOffset = 0
+		self._zdict = b""
+		self._compressor = None
+		# compressed blocks, packed like entries
+		self._blockArena = bytearray()
+		self._blockOffsets = array("Q")
+		# block index => decompressed block, least recently used first
+		self._blockCache = OrderedDict()  # type: OrderedDict[int, bytes]
+
+	@property
+	def compress(self) -> bool:
+		return self._compress
+
+	def startCompression(self) -> None:
+		"""
+			entries that are added after this are compressed
+			(after a sample of `zdictSize` bytes if there is not one yet)
+		"""
+		if self._compress:
+			return
+		self._compress = True
+		self._startBlocks()
+
+	def _startBlocks(self) -> None:
+		if len(self._arena) < self.zdictSize:
+			return
+		self._zdict = bytes(self._arena[-self.zdictSize:])
+		self._blockFirst = len(self._offsets)
+		self._openOffset = len(self._arena)
+
+	def _closeBlock(self) -> None:
+		# copying a compressor that has loaded zdict is much faster than
+		# creating a new one, specially with a smaller memLevel (hash table)
+		if self._compressor is None:
+			self._compressor = compressobj(
+				self.level,
+				DEFLATED,
+				-MAX_WBITS,
+				_memLevel,
+				zdict=self._zdict,
+			)
+		compressor = self._compressor.copy()
+		self._blockOffsets.append(len(self._blockArena))
+		self._blockArena += compressor.compress(self._arena[self._openOffset:])
+		self._blockArena += compressor.flush()
+		del self._arena[self._openOffset:]
+
+	def _getBlock(self, blockIndex: int) -> bytes:
+		cache = self._blockCache
+		block = cache.get(blockIndex)
+		if block is not None:
+			cache.move_to_end(blockIndex)
+			return block
+		start = self._blockOffsets[blockIndex]
+		if blockIndex + 1 < len(self._blockOffsets):
+			end = self._blockOffsets[blockIndex + 1]
+		else:
+			end = len(self._blockArena)
+		block = decompressobj(-MAX_WBITS, zdict=self._zdict).decompress(
+			self._blockArena[start:end],
+		)
+		cache[blockIndex] = block
+		if len(cache) > self.cacheSize:
+			cache.popitem(last=False)
+		return block
+
+	def compressedSize(self) -> Tuple[int, int]:
+		"""
+			returns (number of compressed entries, size of compressed blocks)
+		"""
+		if self._blockFirst is None:
+			return 0, 0
+		count = min(
+			len(self._offsets) - self._blockFirst,
+			len(self._blockOffsets) * self.blockSize,
+		)
+		return count, len(self._blockArena)
+
+	def __len__(self) -> int:
+		return len(self._offsets)
+
+	def append(self, rawEntry: RawEntryType) -> None:
+		"""
+			rawEntry can be (b_word, b_defi) or (b_word, b_defi, defiFormat)
+			or compressed (bytes)
+		"""
+		if isinstance(rawEntry, bytes):
+			rawEntry = loads(decompress(rawEntry))
+		b_word = rawEntry[0]
+		b_defi = rawEntry[1]
+		formatCode = 0
+		if len(rawEntry) > 2:
+			formatCode = ord(rawEntry[2])
+		self._formats.append(formatCode)
+		self._offsets.append(len(self._arena) - self._openOffset)
+		self._wordLens.append(len(b_word))
+		self._defiLens.append(len(b_defi))
+		self._arena += b_word
+		self._arena += b_defi
+		if self._order is not None:
+			self._order.append(len(self._offsets) - 1)
+		if not self._compress:
+			return
+		if self._blockFirst is None:
+			self._startBlocks()
+		elif (len(self._offsets) - self._blockFirst) % self.blockSize == 0:
+			self._closeBlock()
+
+	def _locate(self, index: int) -> Tuple[bytes, int]:
+		"""
+			returns (buffer, offset) of entry
+		"""
+		blockFirst = self._blockFirst
+		if blockFirst is None or index < blockFirst:
+			return self._arena, self._offsets[index]
+		blockIndex = (index - blockFirst) // self.blockSize
+		if blockIndex < len(self._blockOffsets):
+			return self._getBlock(blockIndex), self._offsets[index]
+		return self._arena, self._openOffset + self._offsets[index]
+
+	def _getWord(self, index: int) -> bytes:
+		buf, offset = self._locate(index)
+		return bytes(buf[offset:offset + self._wordLens[index]])
+
+	def _getRaw(self, index: int) -> RawEntryType:
+		buf, offset = self._locate(index)
+		defiOffset = offset + self._wordLens[index]
+		b_word = bytes(buf[offset:defiOffset])
+		b_defi = bytes(buf[defiOffset:defiOffset + self._defiLens[index]])
+		formatCode = self._formats[index]
+		if formatCode:
+			return (b_word, b_defi, chr(formatCode))
+		return (b_word, b_defi)
+
+	def __iter__(self) -> Iterator[RawEntryType]:
+		"""
+			yields raw entries as tuples: (b_word, b_defi)
+				or (b_word, b_defi, defiFormat)
+		"""
+		order = self._order
+		if order is None:
+			order = range(len(self._offsets))
+		for index in order:
+			yield self._getRaw(index)
+
+	def sort(self, key: Callable[[bytes], Any]) -> None:
+		"""
+			key: sort key function, takes word (bytes, including alternates)
+			the sort is Stable, like `list.sort`
+		"""
+		order = self._order
+		if order is None:
+			order = range(len(self._offsets))
+		getWord = self._getWord
+
+		def sortKey(index: int) -> Any:
+			return key(getWord(index))
+
+		self._order = array("L", sorted(order, key=sortKey))
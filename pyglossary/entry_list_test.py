@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import dirname, abspath
+import sys
+import unittest
+from pickle import dumps
+from zlib import compress
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.entry_list import EntryList
+
+
+class EntryListTest(unittest.TestCase):
+	def test_append_iter(self):
+		raws = [
+			(b"hello", b"a greeting"),
+			(b"html", b"<b>bold</b>", "h"),
+			("سلام".encode("utf-8"), b""),
+			(b"", b"empty word"),
+		]
+		lst = EntryList()
+		for raw in raws:
+			lst.append(raw)
+		self.assertEqual(len(lst), len(raws))
+		self.assertEqual(list(lst), raws)
+
+	def test_compressed(self):
+		lst = EntryList()
+		lst.append(compress(dumps((b"a", b"b", "x"))))
+		self.assertEqual(list(lst), [(b"a", b"b", "x")])
+
+	def rawEntries(self, count):
+		return [
+			(
+				f"word{index}".encode("ascii"),
+				f"definition of word{index}, number {index * 7}".encode("ascii"),
+				"h" if index % 3 else "m",
+			)
+			for index in range(count)
+		]
+
+	def test_compress_blocks(self):
+		lst = EntryList(blockSize=4, cacheSize=2)
+		lst.zdictSize = 100
+		raws = self.rawEntries(50)
+		# sample for zdict
+		for raw in raws[:5]:
+			lst.append(raw)
+		lst.startCompression()
+		self.assertEqual(lst._blockFirst, 5)
+		for raw in raws[5:]:
+			lst.append(raw)
+		self.assertEqual(lst.compressedSize()[0], 44)
+		# 1 open block with 1 entry, after the sample
+		self.assertEqual(len(lst._blockOffsets), 11)
+		self.assertEqual(list(lst), raws)
+		self.assertEqual(lst._getRaw(3), raws[3])
+		self.assertEqual(lst._getRaw(49), raws[49])
+		self.assertLessEqual(len(lst._blockCache), 2)
+		lst.sort(lambda b_word: b_word[::-1])
+		self.assertEqual(
+			list(lst),
+			sorted(raws, key=lambda raw: raw[0][::-1]),
+		)
+
+	def test_compress_small_sample(self):
+		lst = EntryList(blockSize=1, level=9)
+		lst.zdictSize = 200
+		lst.startCompression()
+		raws = self.rawEntries(30)
+		for index, raw in enumerate(raws):
+			lst.append(raw)
+			self.assertEqual(lst._getRaw(index), raw)
+		self.assertIsNotNone(lst._blockFirst)
+		self.assertEqual(len(lst._zdict), 200)
+		count, size = lst.compressedSize()
+		self.assertEqual(count, 30 - lst._blockFirst)
+		plainSize = sum(len(raw[0]) + len(raw[1]) for raw in raws[lst._blockFirst:])
+		self.assertLess(size, plainSize / 2)
+		self.assertEqual(list(lst), raws)
+
+	def test_sort(self):
+		lst = EntryList()
+		words = [b"c", b"B", b"a", b"b", b"A", b"c"]
+		for index, word in enumerate(words):
+			lst.append((word, str(index).encode("ascii")))
+		lst.sort(lambda b_word: b_word.lower())
+		self.assertEqual(list(lst), sorted(
+			[(word, str(index).encode("ascii")) for index, word in enumerate(words)],
+			key=lambda raw: raw[0].lower(),
+		))
+		# append after sort, then sort again by another key
+		lst.append((b"0", b"6"))
+		self.assertEqual(list(lst)[-1], (b"0", b"6"))
+		lst.sort(lambda b_word: b_word)
+		self.assertEqual(
+			[raw[0] for raw in lst],
+			[b"0", b"A", b"B", b"a", b"b", b"c", b"c"],
+		)
+
+	def test_sort_key_once_per_entry(self):
+		calls = []
+
+		def key(b_word):
+			calls.append(b_word)
+			return b_word.lower()
+
+		lst = EntryList()
+		for word in (b"b", b"C", b"a"):
+			lst.append((word, b""))
+		lst.sort(key)
+		self.assertEqual(sorted(calls), [b"C", b"a", b"b"])
+		lst.append((b"B", b""))
+		lst.sort(key)
+		self.assertEqual(len(calls), 7)
+		self.assertEqual([raw[0] for raw in lst], [b"a", b"b", b"B", b"C"])
+
+
+if __name__ == "__main__":
+	unittest.main()
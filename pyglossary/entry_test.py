@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath, isfile
+import os
+import sys
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+from pyglossary.entry import Entry, BytesEntry, DataEntry
+
+
+class BytesEntryTest(unittest.TestCase):
+	def test_lazy(self):
+		b_word = "سلام".encode("utf-8")
+		b_defi = b"<b>hello</b>"
+		entry = BytesEntry(b_word, b_defi, defiFormat="h")
+		self.assertIsNone(entry._word)
+		self.assertIsNone(entry._defi)
+		self.assertIs(entry.b_word, b_word)
+		self.assertIs(entry.b_defi, b_defi)
+		self.assertEqual(entry.lb_word, [b_word])
+		self.assertIsNone(entry._word)
+		self.assertIsNone(entry._defi)
+
+		self.assertEqual(entry.s_word, "سلام")
+		self.assertEqual(entry.l_word, ["سلام"])
+		self.assertEqual(entry.defi, "<b>hello</b>")
+		self.assertEqual(entry.defiFormat, "h")
+		# decoding does not drop original bytes
+		self.assertIs(entry.b_word, b_word)
+		self.assertIs(entry.b_defi, b_defi)
+
+	def test_alts(self):
+		entry = BytesEntry([b"a", b"b|c", b"d"], b"defi")
+		self.assertEqual(entry.l_word, ["a", "b|c", "d"])
+		self.assertEqual(entry.lb_word, [b"a", b"b|c", b"d"])
+		self.assertEqual(
+			entry.b_word,
+			Entry(["a", "b|c", "d"], "defi").b_word,
+		)
+
+	def test_edit_unchanged(self):
+		b_defi = b"defi"
+		entry = BytesEntry([b"a", b"b"], b_defi)
+		entry.strip()
+		entry.replace("x", "y")
+		entry.removeEmptyAndDuplicateAltWords()
+		self.assertIs(entry.b_defi, b_defi)
+		self.assertEqual(entry.lb_word, [b"a", b"b"])
+		self.assertIsNotNone(entry._lb_word)
+
+	def test_edit_changed(self):
+		entry = BytesEntry([b" a", b"b"], b" Defi<br>")
+		entry.strip()
+		self.assertEqual(list(entry.l_word), ["a", "b"])
+		self.assertEqual(entry.lb_word, [b"a", b"b"])
+		self.assertEqual(entry.b_word, b"a|b")
+		self.assertEqual(entry.b_defi, b"Defi")
+
+		entry.editFuncDefi(str.lower)
+		self.assertEqual(entry.b_defi, b"defi")
+
+		entry = BytesEntry(b"a", b"defi")
+		entry.addAlt("b")
+		self.assertEqual(entry.l_word, ["a", "b"])
+		self.assertEqual(entry.b_word, b"a|b")
+
+	def test_fromRaw(self):
+		glos = Glossary()
+		entry = Entry.fromRaw(glos, (b"a|b", b"defi", "h"))
+		self.assertIsInstance(entry, BytesEntry)
+		self.assertEqual(entry.l_word, ["a", "b"])
+		self.assertEqual(entry.defi, "defi")
+		self.assertEqual(entry.defiFormat, "h")
+		self.assertEqual(entry.getRaw(glos), (b"a|b", b"defi", "h"))
+
+
+class MockUI(object):
+	def __init__(self, pref):
+		self.pref = pref
+
+
+class DataEntrySourceFileTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def readFile(self, path):
+		with open(path, "rb") as _file:
+			return _file.read()
+
+	def writeFile(self, path, data):
+		with open(path, "wb") as _file:
+			_file.write(data)
+
+	def test_save(self):
+		srcPath = join(self.dir, "src.png")
+		data = os.urandom(100000)
+		self.writeFile(srcPath, data)
+		entry = DataEntry.fromSourceFile("a/b.png", srcPath)
+		self.assertEqual(entry.size(), len(data))
+		self.assertEqual(entry.data, data)
+		for outDir in ("out1", "out2"):
+			fpath = entry.save(join(self.dir, outDir))
+			self.assertEqual(fpath, join(self.dir, outDir, "a", "b.png"))
+			self.assertEqual(self.readFile(fpath), data)
+			self.assertFalse(os.path.samefile(fpath, srcPath))
+		# source file is not moved, and saving into itself keeps it
+		entry = DataEntry.fromSourceFile("src.png", srcPath)
+		entry.save(self.dir)
+		self.assertEqual(self.readFile(srcPath), data)
+
+	def test_save_link(self):
+		srcPath = join(self.dir, "src.png")
+		self.writeFile(srcPath, b"data")
+		entry = DataEntry.fromSourceFile("b.png", srcPath, link=True)
+		fpath = entry.save(join(self.dir, "out"))
+		self.assertTrue(os.path.samefile(fpath, srcPath))
+
+	def test_save_tmp_twice(self):
+		entry = DataEntry("b.png", b"data", inTmp=True)
+		fpath1 = entry.save(join(self.dir, "out1"))
+		fpath2 = entry.save(join(self.dir, "out2"))
+		self.assertEqual(self.readFile(fpath1), b"data")
+		self.assertEqual(self.readFile(fpath2), b"data")
+
+	def test_raw(self):
+		srcPath = join(self.dir, "src.png")
+		self.writeFile(srcPath, b"data")
+		glos = Glossary(ui=MockUI({"link_resources": True}))
+		entry = DataEntry.fromSourceFile("b.png", srcPath)
+		rawEntry = entry.getRaw(glos)
+		self.assertEqual(rawEntry, (b"b.png", srcPath.encode("utf-8"), "B"))
+		entry = Entry.fromRaw(glos, rawEntry)
+		self.assertTrue(entry.isData())
+		self.assertEqual(entry.data, b"data")
+		entry.save(join(self.dir, "out"))
+		self.assertTrue(isfile(srcPath))
+		self.assertTrue(os.path.samefile(join(self.dir, "out", "b.png"), srcPath))
+
+	def test_convert_stardict(self):
+		inputDir = join(self.dir, "in")
+		os.makedirs(join(inputDir, "res"))
+		resources = {
+			f"{index}.png": os.urandom(1000 * index)
+			for index in range(1, 4)
+		}
+		for fname, data in resources.items():
+			self.writeFile(join(inputDir, "res", fname), data)
+		txtPath = join(inputDir, "dic.txt")
+		with open(txtPath, "w", encoding="utf-8") as _file:
+			for index in range(20):
+				_file.write(f"word{19 - index}\tdefinition {index}\n")
+		glos = Glossary()
+		self.assertTrue(glos.convert(
+			inputFilename=txtPath,
+			outputFilename=join(inputDir, "dic.ifo"),
+		))
+		for direct in (True, False):
+			outputDir = join(self.dir, f"out-{direct}")
+			for subDir in ("a", "b", "c"):
+				os.makedirs(join(outputDir, subDir))
+			glos = Glossary()
+			self.assertTrue(glos.convertMulti(
+				inputFilename=join(inputDir, "dic.ifo"),
+				outputs=[
+					(join(outputDir, "a", "dic.ifo"), "", None),
+					(join(outputDir, "b", "dic.csv"), "", None),
+					(join(outputDir, "c", "dic.txt"), "", None),
+				],
+				direct=direct,
+			))
+			for resDir in ("a/res", "b/dic.csv_res", "c/dic.txt_res"):
+				for fname, data in resources.items():
+					fpath = join(outputDir, resDir, fname)
+					self.assertEqual(self.readFile(fpath), data, fpath)
+		for fname, data in resources.items():
+			self.assertEqual(self.readFile(join(inputDir, "res", fname)), data)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -5,9 +5,18 @@ from itertools import (
 
 from typing import (
 	AnyStr,
-	Iterator
+	Iterator,
+	Optional,
 )
-from io import IOBase
+from io import (
+	IOBase,
+	RawIOBase,
+	BufferedIOBase,
+	TextIOBase,
+	TextIOWrapper,
+)
+import os
+import re
 
 
 def toBytes(s: AnyStr) -> bytes:
@@ -25,6 +34,48 @@ def fileCountLines(filename: str, newline: str = "\n"):
 	)
 
 
+def fileEstimateCount(
+	filename: str,
+	pattern: "re.Pattern",
+	encoding: str = "utf-8",
+	sampleSize: int = 1024 * 1024,
+) -> int:
+	"""
+	estimates number of matches of (str) `pattern` in a text file
+	by counting them in the first `sampleSize` bytes
+	"""
+	fileSize = os.path.getsize(filename)
+	with open(filename, "rb") as _file:
+		sample = _file.read(sampleSize)
+	if not sample:
+		return 0
+	count = sum(
+		1 for _ in pattern.finditer(sample.decode(encoding, errors="ignore"))
+	)
+	if len(sample) >= fileSize:
+		return count
+	return int(count * fileSize / len(sample))
+
+
+def openTextWrite(
+	filename: str,
+	fileObj: Optional[IOBase] = None,
+	encoding: str = "utf-8",
+	newline: Optional[str] = None,
+) -> TextIOBase:
+	"""
+	returns a text file object for writing into `fileObj`, which is
+	wrapped if it's a binary file object (like a compressing one, see
+	pyglossary/compression.py), or into a new file `filename`
+	if fileObj is None
+	"""
+	if fileObj is None:
+		return open(filename, "w", encoding=encoding, newline=newline)
+	if isinstance(fileObj, (RawIOBase, BufferedIOBase)):
+		return TextIOWrapper(fileObj, encoding=encoding, newline=newline)
+	return fileObj
+
+
 # TODO: make it sub-class of IOBase
 class FileLineWrapper(object):
 	def __init__(self, f: IOBase):
@@ -32,24 +32,26 @@ from os.path import (
 	dirname,
 	basename,
 	abspath,
+	getsize,
 )
 
 from time import time as now
-import subprocess
 import re
 
 import pkgutil
+import shutil
+import tempfile
 from collections import OrderedDict as odict
 
 import io
-import gc
 
-import gzip
+from hashlib import sha256
 
 from typing import (
 	Dict,
 	Tuple,
 	List,
+	Union,
 	Any,
 	Optional,
 	ClassVar,
@@ -62,16 +64,48 @@ from .flags import *
 from . import core
 from .core import VERSION, userPluginsDir, cacheDir
 from .entry_base import BaseEntry
-from .entry import Entry, DataEntry
-from .plugin_prop import PluginProp
+from .entry import Entry, BytesEntry, DataEntry
+from .entry_list import EntryList
+from .plugin_prop import PluginProp, PluginClassDict
 from .langs import LangDict, Lang
-from .sort_stream import hsortStreamList
+from .sort_stream import sortStreamExternal
+from .profiler import StageProfiler
+from .memory_budget import MemoryBudget
+from .pipeline import ThreadedPipeline
+from .peek_reader import PeekReader
+from .size_hint import SizeHint, readerSizeHint
+from .resource_store import ResourceStore
+from .compression import (
+	openCompressed,
+	compressFile,
+	inputCompressionExts,
+	detectCompression,
+	openDecompressed,
+	decompressFile,
+)
+from .entry_batch import iterBatches
+from .checkpoint import (
+	isResumableReader,
+	isSeekableReader,
+	isResumableWriter,
+	loadCheckpoint,
+	saveCheckpoint,
+	removeCheckpoint,
+)
+from .conversion_cache import (
+	ConversionCache,
+	fingerprint,
+	dirState,
+	changedNames,
+	breakHardLinks,
+	relatedFilePaths,
+)
 
 from .text_utils import (
 	fixUtf8,
 	replaceStringTable,
 )
-from .os_utils import indir
+from .file_utils import openTextWrite
 
 from .glossary_type import GlossaryType
 
@@ -83,6 +117,11 @@ langDict = LangDict()
 file = io.BufferedReader
 
 
+# default for sortCacheSize: maximum number of entries kept in memory
+# while sorting in direct mode, before spilling them to cacheDir
+defaultSortCacheSize = 50000
+
+
 def get_ext(path: str) -> str:
 	return splitext(path)[1].lower()
 
@@ -135,8 +174,8 @@ class Glossary(GlossaryType):
 	pluginByDesc = {}  # description => PluginProp
 	pluginByExt = {}  # extension => PluginProp
 
-	readerClasses = {}
-	writerClasses = {}
+	readerClasses = PluginClassDict(plugins, "readerClass")
+	writerClasses = PluginClassDict(plugins, "writerClass")
 	formatsReadOptions = {}
 	formatsWriteOptions = {}
 	formatsReadFileObj = {}  # type: Dict[str, bool]
@@ -149,21 +188,124 @@ class Glossary(GlossaryType):
 	readDesc = []
 	writeDesc = []
 
+	# metadata of plugins, so that we don't have to import them on startup
+	pluginIndexFile = join(cacheDir, "plugin_index.json")
+
 	@classmethod
 	def loadPlugins(cls: ClassVar, directory: str) -> None:
 		"""
 		executed on startup.  as name implies, loads plugins from directory
+
+		a plugin module is only imported if it's not in the plugin index,
+		or it has been modified since it was added to the index.
+		otherwise it's imported on first access to its Reader/Writer class
 		"""
 		# log.debug(f"Loading plugins from directory: {directory!r}")
 		if not isdir(directory):
 			log.error(f"Invalid plugin directory: {directory!r}")
 			return
 
+		index = cls._loadPluginIndex()
+		oldDirIndex = index["directories"].get(directory, {})
+		dirIndex = {}
+		changed = False
+
 		sys.path.append(directory)
-		for _, pluginName, _ in pkgutil.iter_modules([directory]):
-			cls.loadPlugin(pluginName)
+		for _, pluginName, isPkg in pkgutil.iter_modules([directory]):
+			mtime = cls._getPluginMtime(directory, pluginName, isPkg)
+			item = oldDirIndex.get(pluginName)
+			if mtime is not None and item and item["mtime"] == mtime:
+				dirIndex[pluginName] = item
+				if item["plugin"] is not None:
+					cls._addPlugin(
+						PluginProp.fromIndex(pluginName, directory, item["plugin"]),
+						item["plugin"],
+					)
+				continue
+			changed = True
+			plugin = cls._importPlugin(pluginName)
+			if plugin is None:
+				continue
+			pluginIndex = cls._loadPluginModule(plugin)
+			if mtime is not None:
+				dirIndex[pluginName] = {
+					"mtime": mtime,
+					"plugin": pluginIndex,
+				}
 		sys.path.pop()
 
+		if changed or len(dirIndex) != len(oldDirIndex):
+			index["directories"][directory] = dirIndex
+			cls._savePluginIndex(index)
+
+	@classmethod
+	def _getPluginMtime(
+		cls,
+		directory: str,
+		pluginName: str,
+		isPkg: bool,
+	) -> Optional[float]:
+		"""
+		returns modification time of plugin module, or the latest one among
+		python files of plugin package, or None if it can not be cached
+		"""
+		if not isPkg:
+			path = join(directory, pluginName + ".py")
+			if not isfile(path):
+				return None
+			return os.path.getmtime(path)
+		mtime = 0.0
+		for root, _, files in os.walk(join(directory, pluginName)):
+			for fname in files:
+				if fname.endswith(".py"):
+					mtime = max(mtime, os.path.getmtime(join(root, fname)))
+		return mtime
+
+	@classmethod
+	def _newPluginIndex(cls) -> Dict[str, Any]:
+		return {
+			"version": VERSION,
+			"python": "%d.%d" % sys.version_info[:2],
+			# increased when plugin index has new (or changed) values
+			"indexVersion": 3,
+			"directories": {},
+		}
+
+	@classmethod
+	def _loadPluginIndex(cls) -> Dict[str, Any]:
+		import json
+		newIndex = cls._newPluginIndex()
+		if not isfile(cls.pluginIndexFile):
+			return newIndex
+		try:
+			with open(cls.pluginIndexFile, encoding="utf-8") as _file:
+				index = json.load(_file)
+		except Exception as e:
+			log.warning(f"failed to load plugin index: {e}")
+			return newIndex
+		for key in ("version", "python", "indexVersion"):
+			if index.get(key) != newIndex[key]:
+				return newIndex
+		return index
+
+	@classmethod
+	def _savePluginIndex(cls, index: Dict[str, Any]) -> None:
+		import json
+		indexDir = dirname(cls.pluginIndexFile)
+		try:
+			os.makedirs(indexDir, exist_ok=True)
+			# other processes may be reading it, replace it atomically
+			fd, tmpPath = tempfile.mkstemp(
+				dir=indexDir,
+				prefix="plugin_index_",
+				suffix=".tmp",
+			)
+			with open(fd, "w", encoding="utf-8") as _file:
+				json.dump(index, _file, indent="\t")
+			os.replace(tmpPath, cls.pluginIndexFile)
+		except Exception as e:
+			log.warning(f"failed to save plugin index: {e}")
+
 	@classmethod
 	def getExtraOptions(cls, func, format):
 		import inspect
@@ -208,18 +350,30 @@ class Glossary(GlossaryType):
 
 
 	@classmethod
-	def loadPlugin(cls: ClassVar, pluginName: str) -> None:
+	def _importPlugin(cls: ClassVar, pluginName: str) -> Optional[Any]:
 		try:
-			plugin = __import__(pluginName)
+			return __import__(pluginName)
 		except ModuleNotFoundError as e:
 			log.warning(f"Module {e.name!r} not found, skipping plugin {pluginName!r}")
-			return
 		except Exception as e:
 			log.exception(f"Error while importing plugin {pluginName}")
+
+	@classmethod
+	def loadPlugin(cls: ClassVar, pluginName: str) -> Optional[Any]:
+		plugin = cls._importPlugin(pluginName)
+		if plugin is None:
 			return
+		cls._loadPluginModule(plugin)
+		return plugin
 
+	@classmethod
+	def _loadPluginModule(cls: ClassVar, plugin: Any) -> Optional[Dict[str, Any]]:
+		"""
+		adds an imported plugin module
+		returns its entry for plugin index, or None if it's not an enabled plugin
+		"""
 		if (not hasattr(plugin, "enable")) or (not plugin.enable):
-			# log.debug(f"Plugin disabled or not a plugin: {pluginName}")
+			# log.debug(f"Plugin disabled or not a plugin: {plugin.__name__}")
 			return
 
 		format = plugin.format
@@ -239,30 +393,37 @@ class Glossary(GlossaryType):
 			desc = f"{format} ({extensions[0]})"
 
 		prop = PluginProp(plugin)
+		singleFile = getattr(plugin, "singleFile", False)
 
+		# getOptionsFromClass needs it
 		cls.plugins[format] = prop
-		cls.pluginByDesc[desc] = prop
 
-		for ext in extensions:
-			cls.pluginByExt[ext.lstrip(".")] = prop
-			cls.pluginByExt[ext] = prop
+		pluginIndex = {
+			"name": format,
+			"description": desc,
+			"extensions": list(extensions),
+			"singleFile": singleFile,
+			"sortOnWrite": prop.sortOnWrite,
+			"optionsProp": {
+				name: opt.toDict()
+				for name, opt in prop.optionsProp.items()
+			},
+			"canRead": False,
+			"canWrite": False,
+			"readOptions": None,
+			"writeOptions": None,
+			"readFileObj": False,
+			"writeFileObj": False,
+		}
 
 		Reader = prop.readerClass
 		if Reader is not None:
-			cls.readerClasses[format] = Reader
-
-			options = cls.getOptionsFromClass(Reader, format)
+			pluginIndex["canRead"] = True
+			pluginIndex["readOptions"] = cls.getOptionsFromClass(Reader, format)
 			extraOptions = cls.getExtraOptions(Reader.open, format)
-
-			cls.formatsReadOptions[format] = options
-			cls.readFormats.append(format)
-			cls.readExt.append(extensions)
-			cls.readDesc.append(desc)
-
-			Reader.formatName = format
 			if "fileObj" in extraOptions:
-				if plugin.singleFile:
-					cls.formatsReadFileObj[format] = True
+				if singleFile:
+					pluginIndex["readFileObj"] = True
 				else:
 					log.error(
 						f"plugin {format}: fileObj= argument "
@@ -271,22 +432,16 @@ class Glossary(GlossaryType):
 
 		Writer = prop.writerClass
 		if Writer is not None:
-			cls.writerClasses[format] = Writer
-
-			options = cls.getOptionsFromClass(Writer, format)
-			extraOptions = cls.getExtraOptions(Writer.write, format)
-
-			cls.formatsWriteOptions[format] = options
-			cls.writeFormats.append(format)
-			cls.writeExt.append(extensions)
-			cls.writeDesc.append(desc)
+			pluginIndex["canWrite"] = True
+			pluginIndex["writeOptions"] = cls.getOptionsFromClass(Writer, format)
+			extraOptions = cls.getExtraOptions(Writer.open, format)
 			if "fileObj" in extraOptions:
-				if plugin.singleFile:
-					cls.formatsWriteFileObj[format] = True
+				if singleFile:
+					pluginIndex["writeFileObj"] = True
 				else:
 					log.error(
 						f"plugin {format}: fileObj= argument "
-						"in write, without singleFile=True"
+						"in Writer.open, without singleFile=True"
 					)
 
 		if not (Reader or Writer):
@@ -298,7 +453,41 @@ class Glossary(GlossaryType):
 				f"must migrate to Writer class"
 			)
 
-		return plugin
+		cls._addPlugin(prop, pluginIndex)
+		return pluginIndex
+
+	@classmethod
+	def _addPlugin(
+		cls: ClassVar,
+		prop: PluginProp,
+		pluginIndex: Dict[str, Any],
+	) -> None:
+		format = pluginIndex["name"]
+		desc = pluginIndex["description"]
+		extensions = tuple(pluginIndex["extensions"])
+
+		cls.plugins[format] = prop
+		cls.pluginByDesc[desc] = prop
+
+		for ext in extensions:
+			cls.pluginByExt[ext.lstrip(".")] = prop
+			cls.pluginByExt[ext] = prop
+
+		if pluginIndex["canRead"]:
+			cls.formatsReadOptions[format] = pluginIndex["readOptions"]
+			cls.readFormats.append(format)
+			cls.readExt.append(extensions)
+			cls.readDesc.append(desc)
+			if pluginIndex["readFileObj"]:
+				cls.formatsReadFileObj[format] = True
+
+		if pluginIndex["canWrite"]:
+			cls.formatsWriteOptions[format] = pluginIndex["writeOptions"]
+			cls.writeFormats.append(format)
+			cls.writeExt.append(extensions)
+			cls.writeDesc.append(desc)
+			if pluginIndex["writeFileObj"]:
+				cls.formatsWriteFileObj[format] = True
 
 	@classmethod
 	def detectInputFormat(
@@ -314,14 +503,17 @@ class Glossary(GlossaryType):
 
 		if format:
 			plugin = cls.plugins[format]
-			if plugin.readerClass:
+			if plugin.canRead:
 				return plugin.name
 			return error(f"plugin {plugin.name} does not support reading")
 
 		ext = get_ext(filename)
+		if ext[1:] in inputCompressionExts and ext not in cls.pluginByExt:
+			# compressed input file, like mydic.txt.gz, see Glossary.read
+			ext = get_ext(filename[:-len(ext)])
 		plugin = cls.pluginByExt.get(ext)
 		if plugin:
-			if plugin.readerClass:
+			if plugin.canRead:
 				return plugin.name
 			return error(f"plugin {plugin.name} does not support reading")
 		log.debug(f"{sorted(cls.pluginByExt.keys())}")
@@ -331,7 +523,7 @@ class Glossary(GlossaryType):
 	def clear(self) -> None:
 		self._info = odict()
 
-		self._data = []  # type: List[RawEntryType]
+		self._data = EntryList()
 
 		readers = getattr(self, "_readers", [])
 		for reader in readers:
@@ -342,17 +534,41 @@ class Glossary(GlossaryType):
 		self._readers = []
 		self._readersOpenArgs = {}
 
+		for tmpDir in getattr(self, "_decompressDirs", []):
+			shutil.rmtree(tmpDir, ignore_errors=True)
+		# temp directories of decompressed input files, see _openReader
+		self._decompressDirs = []  # type: List[str]
+
+		pipeline = getattr(self, "_pipeline", None)
+		if pipeline is not None:
+			pipeline.close()
+		resourceStore = getattr(self, "_resourceStore", None)
+		if resourceStore is not None:
+			resourceStore.close()
+		# content-addressed store of data entries in indirect mode
+		self._resourceStore = None  # type: Optional[ResourceStore]
+		# set by _updateIter, if pipeline_threads pref is enabled
+		self._pipeline = None  # type: Optional[ThreadedPipeline]
+
 		self._iter = None
+		# iterator of lists of entries, see pyglossary/entry_batch.py
+		self._batchIter = None
 		self._entryFilters = []
 		self._entryFiltersName = set()
+		self._entryFiltersFunc = None
 		self._sort = False
 		self._sortKey = None
 		self._sortCacheSize = 0
+		# created by _getMemoryBudget
+		self._memoryBudget = None  # type: Optional[MemoryBudget]
 
 		self._filename = ""
 		self._defaultDefiFormat = "m"
 		self._progressbar = True
-		self._rawEntryCompress = True
+		# set by progressInit, for showing throughput
+		self._progressStartTime = now()
+		# raw entries are stored uncompressed in EntryList
+		self._rawEntryCompress = False
 		self.tmpDataDir = ""
 
 	def __init__(
@@ -376,6 +592,8 @@ class Glossary(GlossaryType):
 				self.setInfo(key, value)
 
 		self.ui = ui
+		# set by convert(profile=True), see StageProfiler
+		self._profiler = None  # type: Optional[StageProfiler]
 
 	# def setRawEntryCompress(self, enable: bool) -> bool:
 	# 	self._rawEntryCompress = enable
@@ -422,15 +640,23 @@ class Glossary(GlossaryType):
 			call .prepare() method on all _entryFilters
 			run this after glossary info is set and ready
 			for most entry filters, it won't do anything
+			then fuses all entry filters into one function
 		"""
 		for ef in self._entryFilters:
 			ef.prepare()
+		self._fuseEntryFilters()
+
+	def _fuseEntryFilters(self) -> None:
+		from .entry_filters import fuseEntryFilters
+		self._entryFiltersFunc = fuseEntryFilters(self._entryFilters)
 
 	def removeHtmlTagsAll(self) -> None:
 		from . import entry_filters as ef
 		if ef.RemoveHtmlTagsAll.name in self._entryFiltersName:
 			return
 		self._entryFilters.append(ef.RemoveHtmlTagsAll(self))
+		self._entryFiltersName.add(ef.RemoveHtmlTagsAll.name)
+		self._fuseEntryFilters()
 
 	def __str__(self) -> str:
 		return "glossary.Glossary"
@@ -445,9 +671,9 @@ class Glossary(GlossaryType):
 		progressbar = self.ui and self._progressbar
 		if progressbar:
 			self.progressInit("Writing")
+		budget = self._getMemoryBudget()
 		for index, rawEntry in enumerate(self._data):
-			if index & 0x7f == 0:  # 0x3f, 0x7f, 0xff
-				gc.collect()
+			budget.collect(index)
 			yield Entry.fromRaw(
 				self,
 				rawEntry,
@@ -460,53 +686,275 @@ class Glossary(GlossaryType):
 
 	def _readersEntryGen(self) -> Iterator[BaseEntry]:
 		for reader in self._readers:
-			wordCount = 0
-			progressbar = False
-			if self.ui and self._progressbar:
-				try:
-					wordCount = len(reader)
-				except Exception:
-					log.exception("")
-				if wordCount >= 0:
-					progressbar = True
-			if progressbar:
-				self.progressInit("Converting")
-			threshold = self._calcProgressThreshold(wordCount)
-			lastPos = 0
-			try:
-				for index, entry in enumerate(reader):
-					if entry is not None:
-						yield entry
-					if progressbar:
-						if wordCount > 0:
-							if index % threshold == 0:
-								self.progress(index, wordCount)
-							continue
-						if entry is None:
-							continue
-						bp = entry.byteProgress()
-						if bp and bp[0] > lastPos + 10000:
-							self.progress(bp[0], bp[1], unit="bytes")
-							lastPos = bp[0]
-			finally:
-				reader.close()
-			if progressbar:
-				self.progressEnd()
+			yield from self._readerEntryGen(reader)
+
+	def _readerProgressGen(
+		self,
+		reader: Any,
+		items: Iterator[Any],
+		itemSize: Callable[[Any], int],
+		lastEntry: Callable[[Any], Optional[BaseEntry]],
+	) -> Iterator[Any]:
+		"""
+			yields items (entries, or lists of entries) of `reader` that are
+			not None, shows progress by number of entries (or by bytes of
+			input, if number of entries is not known), and closes the reader
+			itemSize: number of entries in item
+			lastEntry: last entry in item (for byte progress), or None
+		"""
+		sizeHint = SizeHint()
+		progressbar = False
+		if self.ui and self._progressbar:
+			sizeHint = readerSizeHint(reader)
+			progressbar = True
+		if progressbar:
+			self.progressInit("Converting")
+		wordCount = sizeHint.progressTotal()
+		estimated = not sizeHint.exact
+		threshold = self._calcProgressThreshold(wordCount)
+		index = 0
+		lastPos = 0
+		try:
+			for item in items:
+				if item is not None:
+					yield item
+				if not progressbar:
+					continue
+				if wordCount > 0:
+					index += itemSize(item)
+					if index >= lastPos + threshold:
+						self.progress(index, wordCount, estimated=estimated)
+						lastPos = index
+					continue
+				entry = lastEntry(item)
+				if entry is None:
+					continue
+				bp = entry.byteProgress()
+				if bp and bp[0] > lastPos + 10000:
+					self.progress(bp[0], bp[1], unit="bytes")
+					lastPos = bp[0]
+		finally:
+			reader.close()
+		if progressbar:
+			self.progressEnd()
+
+	def _readerEntryGen(self, reader: Any) -> Iterator[BaseEntry]:
+		readerGen = reader
+		if self._profiler:
+			readerGen = self._profiler.wrapGen(
+				f"read:{reader.formatName}",
+				reader,
+				countBytes=True,
+			)
+		yield from self._readerProgressGen(
+			reader,
+			readerGen,
+			lambda entry: 1,
+			lambda entry: entry,
+		)
+
+	def _readersBatchGen(self, batchSize: int) -> Iterator[List[BaseEntry]]:
+		"""
+			same as _readersEntryGen, but yields lists of entries
+			uses reader.readBatches if reader supports the batch protocol
+		"""
+		for reader in self._readers:
+			readBatches = getattr(reader, "readBatches", None)
+			if readBatches is None:
+				batchGen = iterBatches(reader, batchSize)
+			else:
+				batchGen = readBatches(batchSize)
+			yield from self._readerProgressGen(
+				reader,
+				batchGen,
+				len,
+				lambda batch: batch[-1],
+			)
+
+	def _sortStreamArgs(self) -> Tuple[int, Optional[Callable[[int], bool]]]:
+		"""
+		returns (runSize, memoryCheck) arguments of sortStreamExternal
+		with memory_limit pref, sorted runs are spilled to disk based on
+		memory usage (up to sortCacheSize entries, if it's given)
+		"""
+		cacheSize = self._sortCacheSize
+		budget = self._getMemoryBudget()
+		if budget.limit:
+			if cacheSize <= 0:
+				cacheSize = sys.maxsize
+			return cacheSize, budget.shouldSpill
+		if cacheSize <= 0:
+			cacheSize = defaultSortCacheSize
+		return cacheSize, None
+
+	def _sortedReadersEntryGen(self) -> Iterator[BaseEntry]:
+		"""
+			external merge sort of readers' entries, in bounded memory
+			sorted runs of raw entries are spilled to files in cacheDir
+		"""
+		sortKey = self._sortKey
+		if sortKey is None:
+			sortKey = Entry.defaultSortKey
+		cacheSize, memoryCheck = self._sortStreamArgs()
+		log.info(f"Stream sorting enabled, cache size: {cacheSize}")
+		wordCount = 0
+
+		def pairsGen():
+			nonlocal wordCount
+			# same sort key as in indirect mode (Entry.getRawEntrySortKey)
+			# only sort by main word, or list of words + alternates? FIXME
+			for entry in self._readersEntryGen():
+				yield sortKey(entry.b_word), entry.getRaw(self)
+				wordCount += 1
+
+		progressbar = False
+		threshold = 1
+		sortedGen = sortStreamExternal(
+			pairsGen(),
+			cacheSize,
+			cacheDir,
+			memoryCheck=memoryCheck,
+		)
+		if self._profiler:
+			sortedGen = self._profiler.wrapGen("sort", sortedGen)
+		for index, rawEntry in enumerate(sortedGen):
+			if index == 0:
+				# the whole stream is consumed before the first item
+				progressbar = self.ui and self._progressbar
+				if progressbar:
+					self.progressInit("Writing")
+				threshold = self._calcProgressThreshold(wordCount)
+			yield Entry.fromRaw(
+				self,
+				rawEntry,
+				defaultDefiFormat=self._defaultDefiFormat
+			)
+			if progressbar and index % threshold == 0:
+				self.progress(index, wordCount)
+		if progressbar:
+			self.progressEnd()
 
 	def _applyEntryFiltersGen(
 		self,
 		gen: Iterator[BaseEntry],
 	) -> Iterator[BaseEntry]:
+		if self._entryFiltersFunc is None:
+			self._fuseEntryFilters()
+		entryFiltersFunc = self._entryFiltersFunc
 		for entry in gen:
 			if not entry:
 				continue
-			for entryFilter in self._entryFilters:
+			entry = entryFiltersFunc(entry)
+			if entry:
+				yield entry
+
+	def _applyEntryFiltersBatchGen(
+		self,
+		batchGen: Iterator[List[BaseEntry]],
+	) -> Iterator[List[BaseEntry]]:
+		"""
+			same as _applyEntryFiltersGen, for lists of entries
+		"""
+		if self._entryFiltersFunc is None:
+			self._fuseEntryFilters()
+		entryFiltersFunc = self._entryFiltersFunc
+		for batch in batchGen:
+			batch = [
+				entry for entry in map(entryFiltersFunc, batch)
+				if entry
+			]
+			if batch:
+				yield batch
+
+	def _applyEntryFiltersProfileGen(
+		self,
+		gen: Iterator[BaseEntry],
+	) -> Iterator[BaseEntry]:
+		"""
+			same as _applyEntryFiltersGen, but entry filters are not fused,
+			and time of each one is counted by self._profiler
+		"""
+		profiler = self._profiler
+		stageNames = [
+			f"filter:{entryFilter.name}"
+			for entryFilter in self._entryFilters
+		]
+		for entry in gen:
+			if not entry:
+				continue
+			for entryFilter, stageName in zip(self._entryFilters, stageNames):
+				profiler.enter(stageName)
 				entry = entryFilter.run(entry)
+				profiler.exit(1)
 				if not entry:
 					break
 			else:
 				yield entry
 
+	def _applyEntryFiltersParallelGen(
+		self,
+		gen: Iterator[BaseEntry],
+		workers: int,
+		batchSize: int,
+	) -> Iterator[BaseEntry]:
+		"""
+			same as _applyEntryFiltersGen, but entries are sent to a pool of
+			`workers` processes in batches of `batchSize` entries
+			resources (data entries) are not sent, they are filtered here
+			order of entries is preserved
+		"""
+		from collections import deque
+		from multiprocessing import Pool
+		from .entry_filters import initFiltersWorker, runFiltersBatch
+
+		if self._entryFiltersFunc is None:
+			self._fuseEntryFilters()
+		entryFilters = self._entryFilters
+		entryFiltersFunc = self._entryFiltersFunc
+
+		def submit(batch):
+			return batch, pool.apply_async(runFiltersBatch, ([
+				None if entry.isData() else entry
+				for entry in batch
+			],))
+
+		def batchResultGen(batch, asyncResult):
+			for entry, newEntry in zip(batch, asyncResult.get()):
+				if entry.isData():
+					newEntry = entryFiltersFunc(entry)
+				if newEntry:
+					yield newEntry
+
+		log.info(
+			f"Running entry filters in {workers} processes"
+			f", batch size: {batchSize}"
+		)
+		pool = Pool(
+			workers,
+			initializer=initFiltersWorker,
+			initargs=(entryFilters,),
+		)
+		pending = deque()
+		try:
+			batch = []
+			for entry in gen:
+				if not entry:
+					continue
+				batch.append(entry)
+				if len(batch) < batchSize:
+					continue
+				pending.append(submit(batch))
+				batch = []
+				# limit the number of batches in memory
+				if len(pending) > 2 * workers:
+					yield from batchResultGen(*pending.popleft())
+			if batch:
+				pending.append(submit(batch))
+			while pending:
+				yield from batchResultGen(*pending.popleft())
+		finally:
+			pool.terminate()
+
 	def __iter__(self) -> Iterator[BaseEntry]:
 		if self._iter is None:
 			log.error(
@@ -528,12 +976,37 @@ class Glossary(GlossaryType):
 	def getDefaultDefiFormat(self) -> str:
 		return self._defaultDefiFormat
 
-	# TODO
-	#def _reopenReader(self, reader):
-	#	log.info(f"re-opening {reader.__class__}")
-	#	filename, options = self._readersOpenArgs[reader]
-	#	reader.close()
-	#	reader.open(filename, **options)
+	def peekEntries(self, maxCount: int) -> List[BaseEntry]:
+		"""
+			returns (up to) `maxCount` first entries of glossary, before
+			applying entry filters, without consuming them, so writers can
+			look at them in open()
+			in direct mode, they are read ahead from readers and kept in
+			a buffer (see pyglossary/peek_reader.py)
+			returned entries must not be modified
+		"""
+		entries = []
+		if not self._readers:
+			for rawEntry in self._data:
+				if len(entries) >= maxCount:
+					break
+				entries.append(Entry.fromRaw(
+					self,
+					rawEntry,
+					defaultDefiFormat=self._defaultDefiFormat,
+				))
+			return entries
+
+		batchSize = max(self.getPref("batch_size", 256), 1)
+		for index, reader in enumerate(self._readers):
+			if len(entries) >= maxCount:
+				break
+			if not isinstance(reader, PeekReader):
+				reader = PeekReader(reader, batchSize)
+				self._readers[index] = reader
+			entries += reader.peek(maxCount - len(entries))
+		self._updateIter()
+		return entries
 
 	def collectDefiFormat(
 		self,
@@ -544,21 +1017,16 @@ class Glossary(GlossaryType):
 				[("h", 0.91), ("m", 0.09)]
 		"""
 		from collections import Counter
-		readers = self._readers
-		if readers:
-			log.error("collectDefiFormat: not supported in direct mode")
-			return None
-
 		counter = Counter()
 		count = 0
-		for entry in self:
+		for entry in self.peekEntries(maxCount):
 			if entry.isData():
 				continue
-			entry.detectDefiFormat()
-			counter[entry.defiFormat] += 1
+			defiFormat = entry.defiFormat
+			if defiFormat == "m" and Entry.htmlPattern.match(entry.defi):
+				defiFormat = "h"
+			counter[defiFormat] += 1
 			count += 1
-			if count >= maxCount:
-				break
 
 		result = {
 			defiFormat: itemCount / count
@@ -568,13 +1036,6 @@ class Glossary(GlossaryType):
 			if not defiFormat in result:
 				result[defiFormat] = 0
 
-		# TODO
-		# for reader in readers:
-		# 	self._reopenReader(reader)
-		# self._readers = readers
-
-		self._updateIter()
-
 		return result
 
 	def __len__(self) -> int:
@@ -718,6 +1179,13 @@ class Glossary(GlossaryType):
 		else:
 			return default
 
+	def _getMemoryBudget(self) -> MemoryBudget:
+		if self._memoryBudget is None:
+			self._memoryBudget = MemoryBudget(
+				limit=int(self.getPref("memory_limit", 0) * 1024 * 1024),
+			)
+		return self._memoryBudget
+
 	def addEntryObj(self, entry: Entry) -> None:
 		self._data.append(entry.getRaw(self))
 
@@ -745,9 +1213,68 @@ class Glossary(GlossaryType):
 			byteProgress=byteProgress,
 		)
 
+	def newBytesEntry(
+		self,
+		b_word: Union[bytes, List[bytes]],
+		b_defi: bytes,
+		defiFormat: str = "",
+		byteProgress: Optional[Tuple[int, int]] = None,
+	) -> BytesEntry:
+		"""
+		same as newEntry, but takes utf-8 encoded word(s) and definition
+		which are decoded only if they are accessed as str, see BytesEntry
+		"""
+		if not defiFormat:
+			defiFormat = self._defaultDefiFormat
+
+		return BytesEntry(
+			b_word, b_defi,
+			defiFormat=defiFormat,
+			byteProgress=byteProgress,
+		)
+
+	def _getResourceStore(self) -> ResourceStore:
+		if self._resourceStore is None:
+			self._resourceStore = ResourceStore(
+				cacheDir,
+				prefix=split(self.tmpDataDir)[1] or "res",
+			)
+		return self._resourceStore
+
 	def newDataEntry(self, fname: str, data: bytes) -> DataEntry:
-		inTmp = not self._readers
-		return DataEntry(fname, data, inTmp)
+		"""
+		in indirect mode, data is written into the resource store (each
+		unique content only once), otherwise it's kept in memory
+		"""
+		if self._readers:
+			return DataEntry(fname, data)
+		digest, fpath = self._getResourceStore().add(data)
+		return self.newDataEntryFromFile(fname, fpath)
+
+	def newDataEntryFromFile(self, fname: str, fpath: str) -> DataEntry:
+		"""
+		creates a data entry for file `fpath` of input, that is not read
+		into memory, and is copied into output directory without reading
+		it in Python (or hard-linked, with link_resources pref)
+
+		files of resource store are always hard-linked (if possible),
+		since the store is removed after writing
+		"""
+		store = self._resourceStore
+		if store is not None:
+			digest = store.contentHash(fpath)
+			if digest is not None:
+				return DataEntry.fromSourceFile(
+					fname,
+					fpath,
+					link=True,
+					digest=digest,
+				)
+		return DataEntry.fromSourceFile(
+			fname,
+			fpath,
+			link=self.getPref("link_resources", False),
+		)
 
 	# ________________________________________________________________________#
 
@@ -812,8 +1339,8 @@ class Glossary(GlossaryType):
 
 		# good thing about cacheDir is that we don't have to clean it up after
 		# conversion is finished.
-		# specially since dataEntry.save(...) will move the file from cacheDir
-		# to the new directory (associated with output glossary path)
+		# specially since resource files of data entries are kept in a
+		# resource store in cacheDir, which is removed by clear()
 		# And we don't have to check for write access to cacheDir because it's
 		# inside user's home dir. But input glossary might be in a directory
 		# that we don't have write access to.
@@ -832,10 +1359,19 @@ class Glossary(GlossaryType):
 			)
 
 		###
+		compressedFilename = filename
+		compression = detectCompression(filename)
+		if compression:
+			filename = splitext(filename)[0]
+
 		format = self.detectInputFormat(filename, format=format)
 		if not format:
 			return False
 
+		if format not in self.readerClasses:
+			log.error(f"No Reader class found for plugin {format}")
+			return False
+
 		validOptionKeys = self.formatsReadOptions[format]
 		for key in list(options.keys()):
 			if key not in validOptionKeys:
@@ -858,15 +1394,23 @@ class Glossary(GlossaryType):
 
 		reader = self._createReader(format, options)
 		try:
-			reader.open(filename)
+			if compression:
+				filename = self._openCompressedReader(
+					reader,
+					format,
+					compressedFilename,
+					compression,
+				)
+			else:
+				reader.open(filename)
 		except Exception:
 			log.exception("")
 			return False
 		self._readersOpenArgs[reader] = (filename, options)
-		self.prepareEntryFilters()
 		if direct:
 			self._readers.append(reader)
-		else:
+		self.prepareEntryFilters()
+		if not direct:
 			self.loadReader(reader)
 
 		self._updateIter()
@@ -874,40 +1418,97 @@ class Glossary(GlossaryType):
 
 		return True
 
+	def _openCompressedReader(
+		self,
+		reader: Any,
+		format: str,
+		compressedFilename: str,
+		compression: str,
+	) -> str:
+		"""
+		opens `reader` with decompressed data of `compressedFilename`,
+		streaming if the reader accepts fileObj (so nothing is written
+		to disk and progress follows compressed bytes that are read),
+		or from a temporary decompressed file otherwise
+		returns the filename that is given to reader.open
+		"""
+		filename = splitext(compressedFilename)[0]
+		if self.formatsReadFileObj.get(format):
+			log.info(f"Reading {compression} compressed file {compressedFilename}")
+			fileObj = openDecompressed(compressedFilename, compression)
+			try:
+				reader.open(filename, fileObj=fileObj)
+			except Exception:
+				fileObj.close()
+				raise
+			return filename
+		os.makedirs(cacheDir, mode=0o700, exist_ok=True)
+		tmpDir = tempfile.mkdtemp(prefix="decompress_", dir=cacheDir)
+		self._decompressDirs.append(tmpDir)
+		tmpFilename = join(tmpDir, split(filename)[1])
+		log.info(f"Decompressing {compressedFilename} to {tmpFilename}")
+		if self._profiler:
+			self._profiler.enter("decompress")
+		decompressFile(compressedFilename, compression, tmpFilename)
+		if self._profiler:
+			self._profiler.exit()
+		reader.open(tmpFilename)
+		return tmpFilename
+
 	def loadReader(self, reader: Any) -> bool:
 		"""
 		iterates over `reader` object and loads the whole data into self._data
 		must call `reader.open(filename)` before calling this function
 		"""
-		wordCount = 0
+		sizeHint = SizeHint()
 		progressbar = False
 		if self.ui and self._progressbar:
-			try:
-				wordCount = len(reader)
-			except Exception:
-				log.exception("")
+			sizeHint = readerSizeHint(reader)
 			progressbar = True
 		if progressbar:
 			self.progressInit("Reading")
+		wordCount = sizeHint.progressTotal()
+		estimated = not sizeHint.exact
 		threshold = self._calcProgressThreshold(wordCount)
 		lastPos = 0
+		profiler = self._profiler
+		readerGen = reader
+		if profiler:
+			readerGen = profiler.wrapGen(
+				f"read:{reader.formatName}",
+				reader,
+				countBytes=True,
+			)
+		budget = self._getMemoryBudget()
+		data = self._data
+		if not data.compress:
+			data.blockSize = self.getPref("entry_block_size", 4)
+			data.level = self.getPref("entry_compress_level", 1)
+			if self.getPref("entry_compress", False):
+				data.startCompression()
 		try:
-			for index, entry in enumerate(reader):
-				if index & 0x7f == 0:  # 0x3f, 0x7f, 0xff
-					gc.collect()
-				if entry:
-					self.addEntryObj(entry)
-				if progressbar:
-					if wordCount > 0:
-						if index % threshold == 0:
-							self.progress(index, wordCount)
-						continue
-					if entry is None:
-						continue
-					bp = entry.byteProgress()
-					if bp and bp[0] > lastPos + 20000:
-						self.progress(bp[0], bp[1], unit="bytes")
-						lastPos = bp[0]
+			with budget.frozenGC():
+				for index, entry in enumerate(readerGen):
+					budget.collect(index)
+					if not data.compress and budget.shouldCompress(index):
+						data.startCompression()
+					if entry and profiler:
+						profiler.enter("load")
+						self.addEntryObj(entry)
+						profiler.exit(1)
+					elif entry:
+						self.addEntryObj(entry)
+					if progressbar:
+						if wordCount > 0:
+							if index % threshold == 0:
+								self.progress(index, wordCount, estimated=estimated)
+							continue
+						if entry is None:
+							continue
+						bp = entry.byteProgress()
+						if bp and bp[0] > lastPos + 20000:
+							self.progress(bp[0], bp[1], unit="bytes")
+							lastPos = bp[0]
 		finally:
 			reader.close()
 		if progressbar:
@@ -933,24 +1534,95 @@ class Glossary(GlossaryType):
 				or Off (self._readers empty)
 			2- Wheather sort is True, and if it is,
 				checks for self._sortKey and self._sortCacheSize
+		and self._batchIter, which is used by `write` if it's not None
 		"""
+		self._batchIter = None
+		if self._pipeline is not None:
+			self._pipeline.close()
+			self._pipeline = None
 		if self._readers:  # direct mode
 			if self._sort:
-				sortKey = self._sortKey
-				cacheSize = self._sortCacheSize
-				log.info(f"Stream sorting enabled, cache size: {cacheSize}")
-				# only sort by main word, or list of words + alternates? FIXME
-				gen = hsortStreamList(
-					self._readers,
-					cacheSize,
-					key=Entry.getEntrySortKey(sortKey),
-				)
+				gen = self._sortedReadersEntryGen()
 			else:
 				gen = self._readersEntryGen()
 		else:
 			gen = self._loadedEntryGen()
 
-		self._iter = self._applyEntryFiltersGen(gen)
+		workers = self.getPref("filter_workers", 0)
+		if workers > 0:
+			self._iter = self._applyEntryFiltersParallelGen(
+				gen,
+				workers,
+				self.getPref("filter_batch_size", 256),
+			)
+			if self._profiler:
+				self._iter = self._profiler.wrapGen(
+					"filters (parallel)",
+					self._iter,
+				)
+		elif self._profiler:
+			self._iter = self._applyEntryFiltersProfileGen(gen)
+		elif self.getPref("pipeline_threads", False):
+			batchSize = max(self.getPref("batch_size", 256), 1)
+			if self._readers and not self._sort:
+				batchGen = self._readersBatchGen(batchSize)
+			else:
+				batchGen = iterBatches(gen, batchSize)
+			pipeline = ThreadedPipeline(
+				queueSize=self.getPref("pipeline_queue_size", 16),
+			)
+			self._pipeline = pipeline
+			batchGen = pipeline.stage(batchGen, "read")
+			batchGen = pipeline.stage(
+				self._applyEntryFiltersBatchGen(batchGen),
+				"filter",
+			)
+			self._batchIter = self._pipelineBatchGen(batchGen)
+			self._iter = (
+				entry
+				for batch in self._batchIter
+				for entry in batch
+			)
+		else:
+			# _iter and _batchIter are the same chain of generators, so only
+			# one of them reads entries from readers
+			batchSize = self.getPref("batch_size", 256)
+			if batchSize > 0 and self._readers and not self._sort:
+				self._batchIter = self._applyEntryFiltersBatchGen(
+					self._readersBatchGen(batchSize),
+				)
+				self._iter = (
+					entry
+					for batch in self._batchIter
+					for entry in batch
+				)
+			else:
+				self._iter = self._applyEntryFiltersGen(gen)
+				if batchSize > 0:
+					self._batchIter = iterBatches(self._iter, batchSize)
+
+	def _pipelineBatchGen(
+		self,
+		batchGen: Iterator[List[BaseEntry]],
+	) -> Iterator[List[BaseEntry]]:
+		"""
+		does the UI calls of pipeline stage threads, between batches
+		"""
+		pipeline = self._pipeline
+		for batch in batchGen:
+			pipeline.flushUI(self)
+			yield batch
+		pipeline.flushUI(self)
+
+	def _useBatches(self) -> bool:
+		"""
+		returns True if `_updateIter` sets self._batchIter
+		"""
+		if self._profiler:
+			return False
+		if self.getPref("filter_workers", 0) > 0:
+			return False
+		return self.getPref("batch_size", 256) > 0
 
 	def sortWords(
 		self,
@@ -965,9 +1637,7 @@ class Glossary(GlossaryType):
 				self._sortCacheSize = cacheSize  # FIXME
 		else:
 			t0 = now()
-			self._data.sort(
-				key=Entry.getRawEntrySortKey(self, key),
-			)
+			self._data.sort(key if key else Entry.defaultSortKey)
 			log.info(f"Sorting took {now() - t0:.1f} seconds")
 		self._sort = True
 		self._updateIter()
@@ -1000,7 +1670,7 @@ class Glossary(GlossaryType):
 		if not ext and len(filenameNoExt) < 5:
 			filenameNoExt, ext = "", filenameNoExt
 
-		if ext in (".gz", ".bz2", ".zip"):
+		if ext in (".gz", ".bz2", ".xz", ".zip"):
 			compression = ext[1:]
 			filename = filenameNoExt
 			filenameNoExt, ext = splitext(filename)
@@ -1103,8 +1773,32 @@ class Glossary(GlossaryType):
 
 		returns absolute path of output file, or None if failed
 		"""
-		filename = abspath(filename)
+		filenames = self.writeMulti(
+			[(filename, format, options)],
+			sort=sort,
+			sortKey=sortKey,
+			defaultSortKey=defaultSortKey,
+			sortCacheSize=sortCacheSize,
+		)
+		if not filenames:
+			return
+		return filenames[0]
 
+	def _prepareWriter(
+		self,
+		filename: str,
+		format: str,
+		sort: Optional[bool],
+		sortKey: Optional[Callable[[bytes], Any]],
+		defaultSortKey: Optional[Callable[[bytes], Any]],
+		options: Dict[str, Any],
+	) -> Optional[Tuple[Any, bool, Optional[Callable[[bytes], Any]]]]:
+		"""
+		creates the writer for `format`, and decides whether and how
+		entries must be sorted for it
+
+		returns (writer, sort, sortKey), or None if failed
+		"""
 		validOptionKeys = self.formatsWriteOptions.get(format)
 		if validOptionKeys is None:
 			log.critical(f"No write support for {format!r} format")
@@ -1125,15 +1819,7 @@ class Glossary(GlossaryType):
 					f"Writing {format} requires sorting"
 					f", ignoring user sort=False option"
 				)
-			if self._readers:
-				log.warning(
-					f"Writing to {format} format requires full sort"
-					f", falling back to indirect mode"
-				)
-				self._inactivateDirectMode()
-				log.info(f"\nLoaded {len(self._data)} entries")
 			sort = True
-			sortCacheSize = 0
 		elif sortOnWrite == DEFAULT_YES:
 			if sort is None:
 				sort = True
@@ -1148,7 +1834,6 @@ class Glossary(GlossaryType):
 				)
 			sort = False
 
-		writer = None
 		if format not in self.writerClasses:
 			log.error(f"No Writer class found for plugin {format}")
 			return
@@ -1157,150 +1842,526 @@ class Glossary(GlossaryType):
 
 		writer = self._createWriter(format, options)
 
-		self._sort = sort
-
-		if sort:
-			writerSortKey = getattr(writer, "sortKey", None)
-			if sortOnWrite == ALWAYS:
-				if writerSortKey:
-					if sortKey:
-						log.warning(
-							f"Ignoring user-defined sort order, and "
-							f"using sortKey function from {format} plugin"
-						)
-					sortKey = writerSortKey
-				else:
-					log.error(f"No sortKey was found in plugin")
-
-			if sortKey is None:
-				if writerSortKey:
-					log.info(f"Using sortKey from {format} plugin")
-					sortKey = writerSortKey
-				elif defaultSortKey:
-					log.info(f"Using default sortKey")
-					sortKey = defaultSortKey
-				else:
-					log.critical(f"No sortKey was found")
-					return
+		if not sort:
+			return writer, False, None
 
-			if self._readers:
-				self._sortKey = sortKey
-				if cacheSize > 0:
-					self._sortCacheSize = cacheSize  # FIXME
+		writerSortKey = getattr(writer, "sortKey", None)
+		if sortOnWrite == ALWAYS:
+			if writerSortKey:
+				if sortKey:
+					log.warning(
+						f"Ignoring user-defined sort order, and "
+						f"using sortKey function from {format} plugin"
+					)
+				sortKey = writerSortKey
+			else:
+				log.error(f"No sortKey was found in plugin")
+
+		if sortKey is None:
+			if writerSortKey:
+				log.info(f"Using sortKey from {format} plugin")
+				sortKey = writerSortKey
+			elif defaultSortKey:
+				log.info(f"Using default sortKey")
+				sortKey = defaultSortKey
 			else:
-				t0 = now()
-				self._data.sort(key=Entry.getRawEntrySortKey(self, sortKey))
-				log.info(f"Sorting took {now() - t0:.1f} seconds")
+				log.critical(f"No sortKey was found")
+				return
 
-		self._updateIter()
-		try:
-			writer.open(filename)
-		except Exception:
-			log.exception("")
-			return False
+		return writer, True, sortKey
 
-		for reader in self._readers:
-			log.info(
-				f"Using Reader class from {reader.formatName} plugin"
-				f" for direct conversion without loading into memory"
-			)
+	@staticmethod
+	def _sameSortKey(
+		key1: Callable[[bytes], Any],
+		key2: Callable[[bytes], Any],
+	) -> bool:
+		if key1 == key2:
+			return True
+		# sortKey methods of two writers of the same plugin
+		func1 = getattr(key1, "__func__", None)
+		return func1 is not None and func1 is getattr(key2, "__func__", None)
 
-		writerList = [writer]
-		try:
-			genList = []
-			gen = writer.write()
-			if gen is None:
-				log.error(f"\n{format} write function is not a generator")
+	def _createWriterGens(
+		self,
+		writer: Any,
+		filename: str,
+		format: str,
+		useBatch: bool,
+		writerList: List[Any],
+	) -> List[Tuple[Generator, str, bool]]:
+		"""
+		returns a list of (generator, stageName, isBatch) tuples
+		for `writer` (and Info writer, if save_info_json pref is enabled)
+		when isBatch is True, lists of entries must be sent to generator
+		"""
+		genList = []
+
+		def add(writer: Any, name: str) -> None:
+			if useBatch and hasattr(writer, "writeBatch"):
+				gen = writer.writeBatch()
+				isBatch = True
 			else:
-				genList.append(gen)
+				gen = writer.write()
+				isBatch = False
+			if gen is None:
+				log.error(f"\n{name} write function is not a generator")
+				return
+			genList.append((gen, f"write:{name}", isBatch))
 
-			if self.getPref("save_info_json", False):
-				infoWriter = self._createWriter("Info", {})
-				filenameNoExt, _, _, _ = Glossary.splitFilenameExt(filename)
-				infoWriter.open(f"{filenameNoExt}.info")
-				genList.append(infoWriter.write())
-				writerList.append(infoWriter)
+		add(writer, format)
 
-			for gen in genList:
-				gen.send(None)
-			for entry in self:
-				for gen in genList:
-					gen.send(entry)
-			for gen in genList:
+		if self.getPref("save_info_json", False):
+			infoWriter = self._createWriter("Info", {})
+			filenameNoExt, _, _, _ = Glossary.splitFilenameExt(filename)
+			infoWriter.open(f"{filenameNoExt}.info")
+			writerList.append(infoWriter)
+			add(infoWriter, "Info")
+
+		return genList
+
+	def writeMulti(
+		self,
+		outputs: List[Tuple[str, str, Dict[str, Any]]],
+		sort: Optional[bool] = None,
+		sortKey: Optional[Callable[[bytes], Any]] = None,
+		defaultSortKey: Optional[Callable[[bytes], Any]] = None,
+		sortCacheSize: int = 0,
+		checkpointFile: str = "",
+		compressions: Optional[List[str]] = None,
+	) -> Optional[List[str]]:
+		"""
+		writes the glossary into multiple files (and formats), while
+		reading the input only once
+
+		outputs: list of (filename, format, options) tuples
+			where options is a dict of write options for that format
+
+		compressions: compression (file extension without dot, like "gz")
+			or empty string, for each output
+			writers that accept fileObj in open() write into a compressing
+			file object, other outputs are compressed after writing
+
+		sort, sortKey, defaultSortKey: same as in `write`, for all outputs
+		entries are sorted once for all outputs that use the same sortKey
+
+		checkpointFile: save a checkpoint into this file every
+			`checkpoint_interval` entries, and if it already exists, resume
+			writing from it (see pyglossary/checkpoint.py)
+			only for direct mode without sorting, and if all readers and
+			writers support the checkpoint protocol
+
+		returns list of absolute paths of output files, or None if failed
+		"""
+		if not outputs:
+			raise ValueError("writeMulti: no outputs are given")
+		targets = []  # type: List[Tuple[str, Any, bool, Optional[Callable]]]
+		for filename, format, options in outputs:
+			filename = abspath(filename)
+			prepared = self._prepareWriter(
+				filename,
+				format,
+				sort,
+				sortKey,
+				defaultSortKey,
+				dict(options),
+			)
+			if prepared is None:
+				return
+			writer, writerSort, writerSortKey = prepared
+			targets.append((filename, format, writer, writerSort, writerSortKey))
+
+		if sortCacheSize > 0:
+			self._sortCacheSize = sortCacheSize
+
+		# list of [sort, sortKey, targets], unsorted outputs come first
+		groups = []  # type: List[List[Any]]
+		for target in targets:
+			targetSort, targetSortKey = target[3:]
+			for group in groups:
+				if group[0] != targetSort:
+					continue
+				if targetSort and not self._sameSortKey(group[1], targetSortKey):
+					continue
+				group[2].append(target)
+				break
+			else:
+				groups.append([targetSort, targetSortKey, [target]])
+		groups.sort(key=lambda group: group[0])
+
+		multiSort = len(groups) > 1 and bool(self._readers)
+		useBatch = self._useBatches() and not multiSort
+
+		checkpoint = None  # type: Optional[Dict[str, Any]]
+		if checkpointFile:
+			reason = self._notResumableReason(groups, targets)
+			if reason:
+				log.warning(f"Conversion is not resumable: {reason}")
+				checkpointFile = ""
+			else:
+				useBatch = False
+				checkpoint = loadCheckpoint(checkpointFile)
+			if checkpoint and checkpoint.get("outputs") != [
+				target[0] for target in targets
+			]:
+				log.warning(f"Ignoring checkpoint of other output files")
+				checkpoint = None
+			if checkpoint:
+				log.info(
+					f"Resuming conversion after {checkpoint['entries']} entries"
+				)
+				readerIndex = checkpoint["reader"]
+				for reader in self._readers[:readerIndex]:
+					reader.close()
+				self._readers = self._readers[readerIndex:]
+				self._readers[0].seek(checkpoint["position"])
+
+		if not compressions:
+			compressions = [""] * len(targets)
+		gzipThreads = self.getPref("gzip_threads", 0)
+		# file objects of outputs that are compressed while writing
+		compressedFiles = {}  # type: Dict[int, Any]
+		writerList = []
+		try:
+			if not multiSort:
+				# writers may iterate over entries in open()
+				# (see peekEntries), so sort before opening them
+				self._setSort(groups[0][0], groups[0][1])
+			self._updateIter()
+
+			for index, (filename, format, writer, _, _) in enumerate(targets):
+				compression = compressions[index]
 				try:
+					if checkpoint:
+						writer.resume(filename, checkpoint["writers"][index])
+					elif (
+						compression and
+						not checkpointFile and
+						self.formatsWriteFileObj.get(format)
+					):
+						compressedFiles[index] = fileObj = openCompressed(
+							filename,
+							compression,
+							threads=gzipThreads,
+						)
+						writer.open(filename, fileObj=fileObj)
+					else:
+						writer.open(filename)
+				except Exception:
+					log.exception("")
+					if checkpoint:
+						log.error(
+							f"Removing checkpoint file {checkpointFile!r}"
+							f", conversion will start from the beginning next time"
+						)
+						removeCheckpoint(checkpointFile)
+					return
+				writerList.append(writer)
+
+			for reader in self._readers:
+				log.info(
+					f"Using Reader class from {reader.formatName} plugin"
+					f" for direct conversion without loading into memory"
+				)
+
+			groupGens = []
+			for groupSort, groupSortKey, groupTargets in groups:
+				gens = []
+				for filename, format, writer, _, _ in groupTargets:
+					gens += self._createWriterGens(
+						writer,
+						filename,
+						format,
+						useBatch,
+						writerList,
+					)
+				groupGens.append((groupSort, groupSortKey, gens))
+
+			for _, _, gens in groupGens:
+				for gen, _, _ in gens:
 					gen.send(None)
-				except StopIteration:
-					pass
+
+			with self._getMemoryBudget().frozenGC():
+				if multiSort:
+					self._sendEntriesMultiSort(groupGens)
+				elif checkpointFile:
+					self._sendEntriesCheckpoint(
+						groupGens[0][2],
+						targets,
+						checkpointFile,
+						checkpoint,
+					)
+				else:
+					for index, (groupSort, groupSortKey, gens) in enumerate(groupGens):
+						if index > 0:
+							self._setSort(groupSort, groupSortKey)
+						self._updateIter()
+						self._sendEntries(gens)
+
+			for _, _, gens in groupGens:
+				for gen, _, _ in gens:
+					try:
+						gen.send(None)
+					except StopIteration:
+						pass
+			if checkpointFile:
+				removeCheckpoint(checkpointFile)
 		except Exception:
 			log.exception("Exception while calling plugin\'s write function")
 			return
 		finally:
 			for writer in writerList:
 				writer.finish()
+			for fileObj in compressedFiles.values():
+				fileObj.close()
 			self.clear()
 
-		return filename
-
-	def zipOutDir(self, filename: str):
-		if isdir(filename):
-			dirn, name = split(filename)
-			with indir(filename):
-				output, error = subprocess.Popen(
-					["zip", "-r", f"../{name}.zip", ".", "-m"],
-					stdout=subprocess.PIPE,
-				).communicate()
-				return error
-
-		dirn, name = split(filename)
-		with indir(dirn):
-			output, error = subprocess.Popen(
-				["zip", f"{filename}.zip", name, "-m"],
-				stdout=subprocess.PIPE,
-			).communicate()
-			return error
+		outputFilenames = []
+		for index, target in enumerate(targets):
+			filename = target[0]
+			compression = compressions[index]
+			if not compression:
+				outputFilenames.append(filename)
+				continue
+			if index in compressedFiles:
+				outputFilenames.append(f"{filename}.{compression}")
+				continue
+			if self._profiler:
+				self._profiler.enter("compress")
+			outputFilenames.append(
+				compressFile(filename, compression, threads=gzipThreads) or filename
+			)
+			if self._profiler:
+				self._profiler.exit()
+		return outputFilenames
 
-	def compressOutDir(self, filename: str, compression: str) -> str:
+	def _notResumableReason(
+		self,
+		groups: List[List[Any]],
+		targets: List[Tuple[str, str, Any, bool, Optional[Callable]]],
+	) -> str:
 		"""
-		filename is the existing file path
-		compression is the archive extension (without dot): "gz", "bz2", "zip"
+		returns the reason why writeMulti can not save checkpoints
+		(and resume from them), or empty string if it can
 		"""
-		try:
-			os.remove(f"{filename}.{compression}")
-		except OSError:
-			pass
-		if compression == "gz":
-			output, error = subprocess.Popen(
-				["gzip", filename],
-				stdout=subprocess.PIPE,
-			).communicate()
-			if error:
-				log.error(
-					error + "\n" +
-					f"Failed to compress file \"{filename}\""
-				)
-		elif compression == "bz2":
-			output, error = subprocess.Popen(
-				["bzip2", filename],
-				stdout=subprocess.PIPE,
-			).communicate()
-			if error:
-				log.error(
-					error + "\n" +
-					f"Failed to compress file \"{filename}\""
-				)
-		elif compression == "zip":
-			error = self.zipOutDir(filename)
-			if error:
-				log.error(
-					error + "\n" +
-					f"Failed to compress file \"{filename}\""
-				)
+		if not self._readers:
+			return "not in direct mode"
+		if len(groups) > 1 or groups[0][0]:
+			return "sorting is enabled"
+		if self.getPref("save_info_json", False):
+			return "save_info_json is enabled"
+		for reader in self._readers:
+			if not isResumableReader(reader):
+				return f"{reader.formatName} reader does not support it"
+			if not isSeekableReader(reader):
+				return f"{reader.formatName} reader does not support it for this input"
+		for _, format, writer, _, _ in targets:
+			if not isResumableWriter(writer):
+				return f"{format} writer does not support it"
+		return ""
 
-		compressedFilename = f"{filename}.{compression}"
-		if isfile(compressedFilename):
-			return compressedFilename
+	def _setSort(
+		self,
+		sort: bool,
+		sortKey: Optional[Callable[[bytes], Any]],
+	) -> None:
+		"""
+		in direct mode, sets sort parameters to be used by `_updateIter`
+		in indirect mode, sorts the loaded entries (if sort is True)
+		"""
+		self._sort = sort
+		if not sort:
+			# unsorted outputs are written before sorting loaded entries
+			return
+		if self._readers:
+			self._sortKey = sortKey
+			return
+		t0 = now()
+		if self._profiler:
+			self._profiler.enter("sort")
+		self._data.sort(sortKey)
+		if self._profiler:
+			self._profiler.exit(len(self._data))
+		log.info(f"Sorting took {now() - t0:.1f} seconds")
+
+	def _sendEntries(self, gens: List[Tuple[Generator, str, bool]]) -> None:
+		"""
+		sends all entries (from self._iter or self._batchIter)
+		to writer generators
+		"""
+		profiler = self._profiler
+		batchIter = self._batchIter
+		if profiler:
+			from .profiler import entrySize
+			for entry in self:
+				size = entrySize(entry)
+				for gen, genName, _ in gens:
+					profiler.enter(genName)
+					gen.send(entry)
+					profiler.exit(1, size)
+		elif batchIter is not None:
+			for batch in batchIter:
+				for gen, _, isBatch in gens:
+					if isBatch:
+						gen.send(batch)
+						continue
+					for entry in batch:
+						gen.send(entry)
 		else:
-			return filename
+			for entry in self:
+				for gen, _, _ in gens:
+					gen.send(entry)
+
+	def _sendEntriesCheckpoint(
+		self,
+		gens: List[Tuple[Generator, str, bool]],
+		targets: List[Tuple[str, str, Any, bool, Optional[Callable]]],
+		checkpointFile: str,
+		checkpoint: Optional[Dict[str, Any]],
+	) -> None:
+		"""
+		direct mode without sorting, sends all entries to writer
+		generators, and saves a checkpoint every `checkpoint_interval`
+		entries, after sending an entry whose reader has a stable position
+		"""
+		interval = self.getPref("checkpoint_interval", 10000)
+		readerIndex = 0
+		entryCount = 0
+		if checkpoint:
+			readerIndex = checkpoint["reader"]
+			entryCount = checkpoint["entries"]
+		lastCount = entryCount
+		for reader in self._readers:
+			for entry in self._applyEntryFiltersGen(self._readerEntryGen(reader)):
+				for gen, _, _ in gens:
+					gen.send(entry)
+				entryCount += 1
+				if entryCount - lastCount < interval:
+					continue
+				position = reader.tell()
+				if position is None:
+					continue
+				saveCheckpoint(checkpointFile, {
+					"outputs": [target[0] for target in targets],
+					"reader": readerIndex,
+					"position": position,
+					"writers": [target[2].checkpoint() for target in targets],
+					"entries": entryCount,
+				})
+				lastCount = entryCount
+			readerIndex += 1
+
+	def _sendEntriesMultiSort(
+		self,
+		groupGens: List[Tuple[bool, Any, List[Tuple[Generator, str, bool]]]],
+	) -> None:
+		"""
+		direct mode, when outputs need different orders of entries
+
+		entries are read and filtered once, unsorted outputs get them
+		while reading, then for each sortKey an external merge sort
+		is done, and the sorted entries of each sort are sent to its
+		outputs while being fed into the next sort
+
+		sort keys are taken from words before applying entry filters
+		and ties are kept in reading order, so each output gets the same
+		order of entries as converting into it separately
+		"""
+		unsortedGens = []
+		sortedGroups = []
+		for groupSort, groupSortKey, gens in groupGens:
+			if groupSort:
+				sortedGroups.append((groupSortKey, gens))
+			else:
+				unsortedGens += gens
+		sortKeys = [key for key, _ in sortedGroups]
+
+		if self._entryFiltersFunc is None:
+			self._fuseEntryFilters()
+		entryFiltersFunc = self._entryFiltersFunc
+		cacheSize, memoryCheck = self._sortStreamArgs()
+		log.info(
+			f"Stream sorting for {len(sortedGroups)} orders"
+			f", cache size: {cacheSize}"
+		)
+		profiler = self._profiler
+		wordCount = 0
+
+		def sendEntry(entry: BaseEntry, gens: List[Tuple]) -> None:
+			for gen, genName, _ in gens:
+				if profiler:
+					profiler.enter(genName)
+				gen.send(entry)
+				if profiler:
+					profiler.exit(1)
+
+		def pairsGen():
+			nonlocal wordCount
+			for entry in self._readersEntryGen():
+				keys = [key(entry.b_word) for key in sortKeys]
+				entry = entryFiltersFunc(entry)
+				if not entry:
+					continue
+				rawEntry = entry.getRaw(self)
+				sendEntry(entry, unsortedGens)
+				yield keys[0], (rawEntry, wordCount, keys[1:])
+				wordCount += 1
+
+		def sortedGen(items, gens):
+			"""
+			sends sorted entries to `gens`, and yields (key, item) pairs
+			for the next sort
+			"""
+			progressbar = self.ui and self._progressbar
+			if progressbar:
+				self.progressInit("Writing")
+			threshold = self._calcProgressThreshold(wordCount)
+			if profiler:
+				items = profiler.wrapGen("sort", items)
+			for index, (rawEntry, readIndex, keys) in enumerate(items):
+				entry = Entry.fromRaw(
+					self,
+					rawEntry,
+					defaultDefiFormat=self._defaultDefiFormat,
+				)
+				if keys and entry.isData():
+					# DataEntry.save moves the file, keep it for next sort
+					entry.keepFile()
+				sendEntry(entry, gens)
+				if keys:
+					yield (keys[0], readIndex), (rawEntry, readIndex, keys[1:])
+				if progressbar and index % threshold == 0:
+					self.progress(index, wordCount)
+			if progressbar:
+				self.progressEnd()
+
+		items = sortStreamExternal(
+			pairsGen(),
+			cacheSize,
+			cacheDir,
+			memoryCheck=memoryCheck,
+		)
+		for _, gens in sortedGroups[:-1]:
+			items = sortStreamExternal(
+				sortedGen(items, gens),
+				cacheSize,
+				cacheDir,
+				memoryCheck=memoryCheck,
+			)
+		for _ in sortedGen(items, sortedGroups[-1][1]):
+			pass
+
+	def compressOutDir(self, filename: str, compression: str) -> str:
+		"""
+		filename is the existing file path
+		compression is the archive extension (without dot): "gz", "bz2",
+			"xz", "zip"
+		returns path of compressed file, or filename if failed
+		"""
+		return compressFile(
+			filename,
+			compression,
+			threads=self.getPref("gzip_threads", 0),
+		) or filename
 
 	def convert(
 		self,
@@ -1316,45 +2377,202 @@ class Glossary(GlossaryType):
 		sortCacheSize: int = 0,
 		readOptions: Optional[Dict[str, Any]] = None,
 		writeOptions: Optional[Dict[str, Any]] = None,
+		profile: bool = False,
+		profileJson: str = "",
+		cache: bool = False,
+		cacheHash: bool = False,
+		resumable: bool = False,
 	) -> Optional[str]:
 		"""
 		returns absolute path of output file, or None if failed
 
 		defaultSortKey is used when no sortKey was given, or found in plugin
+
+		profile: log time spent in each stage (reader, entry filters,
+			sort, writer) at the end of conversion
+		profileJson: path of a json file to save the same report into
+
+		cache: if input files and everything else that affects the output
+			has not changed since a previous conversion, use the output of
+			that conversion from cache (see pyglossary/conversion_cache.py)
+		cacheHash: same as cache, but find changes in input files by their
+			content, instead of their size and modification time
+
+		resumable: save checkpoints while converting, and if a previous
+			conversion of the same input files (with the same options) into
+			the same output files was interrupted, continue it
+			(see pyglossary/checkpoint.py)
 		"""
+		outputFiles = self.convertMulti(
+			inputFilename,
+			[(outputFilename, outputFormat, writeOptions)],
+			inputFormat=inputFormat,
+			direct=direct,
+			progressbar=progressbar,
+			sort=sort,
+			sortKey=sortKey,
+			defaultSortKey=defaultSortKey,
+			sortCacheSize=sortCacheSize,
+			readOptions=readOptions,
+			profile=profile,
+			profileJson=profileJson,
+			cache=cache,
+			cacheHash=cacheHash,
+			resumable=resumable,
+		)
+		if not outputFiles:
+			return
+		return outputFiles[0]
+
+	def convertMulti(
+		self,
+		inputFilename: str,
+		outputs: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+		inputFormat: str = "",
+		direct: Optional[bool] = None,
+		progressbar: bool = True,
+		sort: Optional[bool] = None,
+		sortKey: Optional[Callable[[bytes], Any]] = None,
+		defaultSortKey: Optional[Callable[[bytes], Any]] = None,
+		sortCacheSize: int = 0,
+		readOptions: Optional[Dict[str, Any]] = None,
+		profile: bool = False,
+		profileJson: str = "",
+		cache: bool = False,
+		cacheHash: bool = False,
+		resumable: bool = False,
+	) -> Optional[List[str]]:
+		"""
+		converts the input file into multiple output files, reading it once
+
+		outputs: list of (outputFilename, outputFormat, writeOptions) tuples
+			outputFormat can be empty (detected from outputFilename)
+			writeOptions can be None
+
+		other arguments are the same as in `convert`
+
+		returns list of absolute paths of output files, or None if failed
+		"""
+		self._profiler = None
+		if profile or profileJson:
+			self._profiler = StageProfiler()
+
 		if not readOptions:
 			readOptions = {}
-		if not writeOptions:
-			writeOptions = {}
 
-		if outputFilename == inputFilename:
-			log.error(f"Input and output files are the same")
-			return
+		writeOutputs = []  # type: List[Tuple[str, str, Dict[str, Any]]]
+		compressions = []  # type: List[str]
+		for outputFilename, outputFormat, writeOptions in outputs:
+			if not writeOptions:
+				writeOptions = {}
+
+			if outputFilename == inputFilename:
+				log.error(f"Input and output files are the same")
+				return
+
+			if writeOptions:
+				log.info(f"writeOptions = {writeOptions}")
+
+			outputArgs = self.detectOutputFormat(
+				filename=outputFilename,
+				format=outputFormat,
+				inputFilename=inputFilename,
+			)
+			if not outputArgs:
+				log.error(f"Writing file {outputFilename!r} failed.")
+				return
+			outputFilename, outputFormat, compression = outputArgs
+
+			if isdir(outputFilename):
+				log.error(f"Directory already exists: {outputFilename}")
+				return
+
+			writeOutputs.append((outputFilename, outputFormat, writeOptions))
+			compressions.append(compression)
 
 		if readOptions:
 			log.info(f"readOptions = {readOptions}")
-		if writeOptions:
-			log.info(f"writeOptions = {writeOptions}")
-
-		outputArgs = self.detectOutputFormat(
-			filename=outputFilename,
-			format=outputFormat,
-			inputFilename=inputFilename,
-		)
-		if not outputArgs:
-			log.error(f"Writing file {outputFilename!r} failed.")
-			return
-		outputFilename, outputFormat, compression = outputArgs
 
 		if direct is None:
 			if sort is not True:
 				direct = True  # FIXME
-
-		if isdir(outputFilename):
-			log.error(f"Directory already exists: {outputFilename}")
-			return
+			elif self._getMemoryBudget().useDirectMode(sum(
+				getsize(path) for path in relatedFilePaths(inputFilename)
+			)):
+				direct = True
 
 		tm0 = now()
+
+		outputDirs = []  # type: List[str]
+		for outputFilename, _, _ in writeOutputs:
+			outputDir = dirname(abspath(outputFilename))
+			if outputDir not in outputDirs:
+				outputDirs.append(outputDir)
+
+		checkpointFile = ""
+		if resumable:
+			conversionKey = self._conversionFingerprint(
+				inputFilename,
+				inputFormat,
+				readOptions,
+				writeOutputs,
+				compressions,
+				outputDirs,
+				direct,
+				sort,
+				sortKey,
+				defaultSortKey,
+				False,
+			)
+			checkpointFile = join(
+				cacheDir,
+				"checkpoints",
+				sha256("\n".join(
+					[conversionKey] + [
+						abspath(outputFilename)
+						for outputFilename, _, _ in writeOutputs
+					]
+				).encode("utf-8")).hexdigest() + ".json",
+			)
+
+		conversionCache = None
+		if cache or cacheHash:
+			conversionCache = ConversionCache(
+				join(cacheDir, "conversions"),
+				maxSize=int(
+					self.getPref("conversion_cache_max_size", 2048) * 1024 * 1024
+				),
+				maxAge=self.getPref("conversion_cache_max_age", 30) * 86400,
+			)
+			cacheKey = self._conversionFingerprint(
+				inputFilename,
+				inputFormat,
+				readOptions,
+				writeOutputs,
+				compressions,
+				outputDirs,
+				direct,
+				sort,
+				sortKey,
+				defaultSortKey,
+				cacheHash,
+			)
+			extra = conversionCache.get(cacheKey, outputDirs)
+			if extra is not None:
+				finalOutputFiles = [
+					join(outputDirs[dirIndex], fname)
+					for dirIndex, fname in extra["outputs"]
+				]
+				for finalOutputFile in finalOutputFiles:
+					log.info(f"Using cached output file {finalOutputFile!r}")
+				return finalOutputFiles
+			for outputFilename, _, _ in writeOutputs:
+				breakHardLinks(outputFilename)
+			outputDirStates = [
+				dirState(outputDir) if isdir(outputDir) else {}
+				for outputDir in outputDirs
+			]
+
 		if not self.read(
 			inputFilename,
 			format=inputFormat,
@@ -1365,27 +2583,130 @@ class Glossary(GlossaryType):
 			return
 		log.info("")
 
-		finalOutputFile = self.write(
-			outputFilename,
-			outputFormat,
+		finalOutputFiles = self.writeMulti(
+			writeOutputs,
 			sort=sort,
 			sortKey=sortKey,
 			defaultSortKey=defaultSortKey,
 			sortCacheSize=sortCacheSize,
-			**writeOptions
+			checkpointFile=checkpointFile,
+			compressions=compressions,
 		)
 		log.info("")
-		if not finalOutputFile:
-			log.error(f"Writing file {outputFilename!r} failed.")
+		if not finalOutputFiles:
+			for outputFilename, _, _ in writeOutputs:
+				log.error(f"Writing file {outputFilename!r} failed.")
 			return
 
-		if compression:
-			finalOutputFile = self.compressOutDir(finalOutputFile, compression)
+		if conversionCache is not None:
+			try:
+				conversionCache.put(
+					cacheKey,
+					outputDirs,
+					[
+						changedNames(outputDirStates[index], dirState(outputDir))
+						for index, outputDir in enumerate(outputDirs)
+					],
+					{
+						"outputs": [
+							(
+								outputDirs.index(dirname(abspath(finalOutputFile))),
+								basename(finalOutputFile),
+							)
+							for finalOutputFile in finalOutputFiles
+						],
+					},
+				)
+			except Exception:
+				log.exception("error while adding output files to cache")
 
-		log.info(f"Writing file {finalOutputFile!r} done.")
+		if self._profiler:
+			self._saveProfile(profile, profileJson)
+
+		for finalOutputFile in finalOutputFiles:
+			log.info(f"Writing file {finalOutputFile!r} done.")
 		log.info(f"Running time of convert: {now()-tm0:.1f} seconds")
 
-		return finalOutputFile
+		return finalOutputFiles
+
+	@staticmethod
+	def _funcName(func: Optional[Callable]) -> Optional[str]:
+		if func is None:
+			return None
+		return (
+			getattr(func, "__module__", "") + "." +
+			getattr(func, "__qualname__", repr(func))
+		)
+
+	def _conversionFingerprint(
+		self,
+		inputFilename: str,
+		inputFormat: str,
+		readOptions: Dict[str, Any],
+		writeOutputs: List[Tuple[str, str, Dict[str, Any]]],
+		compressions: List[str],
+		outputDirs: List[str],
+		direct: Optional[bool],
+		sort: Optional[bool],
+		sortKey: Optional[Callable[[bytes], Any]],
+		defaultSortKey: Optional[Callable[[bytes], Any]],
+		hashInput: bool,
+	) -> str:
+		"""
+		fingerprint of input files and everything else that affects
+		output files of convertMulti
+		"""
+		self.updateEntryFilters()
+		return fingerprint(
+			inputFilename,
+			{
+				"version": VERSION,
+				"inputFormat": self.detectInputFormat(
+					inputFilename,
+					format=inputFormat,
+					quiet=True,
+				),
+				"readOptions": readOptions,
+				"outputs": [
+					(
+						basename(outputFilename),
+						outputFormat,
+						writeOptions,
+						compression,
+						outputDirs.index(dirname(abspath(outputFilename))),
+					)
+					for (outputFilename, outputFormat, writeOptions), compression
+					in zip(writeOutputs, compressions)
+				],
+				"direct": direct,
+				"sort": sort,
+				"sortKey": self._funcName(sortKey),
+				"defaultSortKey": self._funcName(defaultSortKey),
+				"entryFilters": [
+					entryFilter.cacheKey()
+					for entryFilter in self._entryFilters
+				],
+				"enable_alts": self.getPref("enable_alts", True),
+				"save_info_json": self.getPref("save_info_json", False),
+				"info": list(self.iterInfo()),
+			},
+			hashInput=hashInput,
+			outputFilenames=[
+				outputFilename
+				for outputFilename, _, _ in writeOutputs
+			],
+		)
+
+	def _saveProfile(self, profile: bool, profileJson: str) -> None:
+		profiler = self._profiler
+		self._profiler = None
+		if profile:
+			log.info("Profile of conversion:\n" + profiler.report())
+		if profileJson:
+			from .json_utils import dataToPrettyJson
+			with open(profileJson, "w", encoding="utf-8") as _file:
+				_file.write(dataToPrettyJson(profiler.toDict()))
+			log.info(f"Saved profile to {profileJson!r}")
 
 	# ________________________________________________________________________#
 
@@ -1406,27 +2727,24 @@ class Glossary(GlossaryType):
 		newline: str = "\n",
 		resources: bool = True,
 	) -> Generator[None, "BaseEntry", None]:
-		import codecs
+		"""
+		if both filename and fileObj are given, entries are written into
+		fileObj, and filename is only used for resources directory
+		"""
 		if not entryFmt:
 			raise ValueError("entryFmt argument is missing")
-		if filename and fileObj:
-			raise ValueError(f"both filename and fileObj are passed")
 		if not filename:
 			filename = self._filename + ext
 
 		if not outInfoKeysAliasDict:
 			outInfoKeysAliasDict = {}
 
-		if fileObj:
-			mode = getattr(fileObj, "mode", "")
-			if isinstance(mode, int):
-				# for gzip.open with BytesIO, mode == 2
-				pass
-			elif "b" in mode:
-				# binFileObj = fileObj  # needed?
-				fileObj = codecs.getwriter(encoding)(fileObj)
-		else:
-			fileObj = open(filename, "w", encoding=encoding, newline=newline)
+		fileObj = openTextWrite(
+			filename,
+			fileObj=fileObj,
+			encoding=encoding,
+			newline=newline,
+		)
 
 		fileObj.write(head)
 		if writeInfo:
@@ -1456,6 +2774,7 @@ class Glossary(GlossaryType):
 		myResDir = f"{filename}_res"
 		if not isdir(myResDir):
 			os.mkdir(myResDir)
+		resDedup = {}  # type: Dict[str, str]
 
 		while True:
 			entry = yield
@@ -1463,7 +2782,7 @@ class Glossary(GlossaryType):
 				break
 			if entry.isData():
 				if resources:
-					entry.save(myResDir)
+					entry.save(myResDir, dedup=resDedup)
 				continue
 
 			word = entry.s_word
@@ -1505,23 +2824,50 @@ class Glossary(GlossaryType):
 	# ________________________________________________________________________#
 
 	def progressInit(self, *args) -> None:
-		if self.ui:
-			self.ui.progressInit(*args)
+		if not self.ui:
+			return
+		pipeline = self._pipeline
+		if pipeline is not None and pipeline.postUI("progressInit", *args):
+			return
+		self._progressStartTime = now()
+		self.ui.progressInit(*args)
 
-	def progress(self, pos: int, total: int, unit: str = "entries") -> None:
+	def progress(
+		self,
+		pos: int,
+		total: int,
+		unit: str = "entries",
+		estimated: bool = False,
+	) -> None:
+		"""
+		estimated: total is estimated (see pyglossary/size_hint.py)
+		"""
 		if not self.ui:
 			return
 		if total == 0:
 			log.warning(f"pos={pos}, total={total}")
 			return
-		self.ui.progress(
-			min(pos + 1, total) / total,
-			f"{pos:d} / {total:d} {unit}",
-		)
+		pipeline = self._pipeline
+		if pipeline is not None and pipeline.postUI(
+			"progress", pos, total, unit, estimated,
+		):
+			return
+		approx = "~" if estimated else ""
+		text = f"{pos:d} / {approx}{total:d} {unit}"
+		elapsed = now() - self._progressStartTime
+		if elapsed > 0:
+			text += f", {pos / elapsed:.0f} {unit}/s"
+		if pipeline is not None:
+			text += f" ({pipeline.depthText()})"
+		self.ui.progress(min(pos + 1, total) / total, text)
 
 	def progressEnd(self) -> None:
-		if self.ui:
-			self.ui.progressEnd()
+		if not self.ui:
+			return
+		pipeline = self._pipeline
+		if pipeline is not None and pipeline.postUI("progressEnd"):
+			return
+		self.ui.progressEnd()
 
 	# ________________________________________________________________________#
 
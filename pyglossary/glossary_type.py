@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from typing import (
+	Union,
 	Dict,
 	Tuple,
 	List,
@@ -13,7 +14,7 @@ from typing import (
 from collections import OrderedDict as odict
 
 from .entry_base import BaseEntry
-from .entry import Entry, DataEntry
+from .entry import Entry, BytesEntry, DataEntry
 from .langs import Lang
 
 
@@ -24,6 +25,9 @@ class GlossaryType(object):
 	def getDefaultDefiFormat(self) -> str:
 		raise NotImplementedError
 
+	def peekEntries(self, maxCount: int) -> List[BaseEntry]:
+		raise NotImplementedError
+
 	def collectDefiFormat(
 		self,
 		maxCount: int,
@@ -78,12 +82,23 @@ class GlossaryType(object):
 	def newEntry(self, word: str, defi: str, defiFormat: str = "") -> Entry:
 		raise NotImplementedError
 
+	def newBytesEntry(
+		self,
+		b_word: Union[bytes, List[bytes]],
+		b_defi: bytes,
+		defiFormat: str = "",
+	) -> BytesEntry:
+		raise NotImplementedError
+
 	def addEntry(self, word: str, defi: str, defiFormat: str = "") -> None:
 		raise NotImplementedError
 
 	def newDataEntry(self, fname: str, data: bytes) -> DataEntry:
 		raise NotImplementedError
 
+	def newDataEntryFromFile(self, fname: str, fpath: str) -> DataEntry:
+		raise NotImplementedError
+
 	def writeTxt(
 		self,
 		entryFmt: str = "",  # contain {word} and {defi}
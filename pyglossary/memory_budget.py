@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+memory budget manager, that decides how conversion uses memory based on
+actual memory usage (resident set size) of the process and a target
+ceiling (`memory_limit` pref, in MiB)
+
+decisions (each one is logged once):
+	- loading into memory (indirect mode) or converting in direct mode
+		with an external sort (spilling sorted runs to disk)
+	- compressing loaded entries (see EntryList.startCompression)
+	- number of entries kept in memory by external sort, before spilling
+		a sorted run to disk
+	- running garbage collector, instead of every 128 entries
+
+without a limit, only the garbage collector is tuned: objects that exist
+before loading/writing entries (like indexes of readers) are frozen,
+so they are not traversed by every collection, and gc.collect() is not
+called explicitly
+"""
+
+import os
+import sys
+import gc
+from contextlib import contextmanager
+from typing import Iterator
+
+import logging
+log = logging.getLogger("root")
+
+# fractions of limit
+compressRatio = 0.5
+spillRatio = 0.7
+collectRatio = 0.85
+# estimated memory usage of loaded entries, relative to size of input file(s)
+loadRatio = 2.0
+
+
+def _rssStatm() -> int:
+	with open("/proc/self/statm", "rb") as _file:
+		return int(_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _rssPsutil() -> int:
+	import psutil
+	return psutil.Process().memory_info().rss
+
+
+def _rssMaxrss() -> int:
+	import resource
+	maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == "darwin":
+		return maxrss
+	return maxrss * 1024
+
+
+def _findRssFunc():
+	"""
+	returns a function that returns current (or at least peak) resident
+	set size of process in bytes, or None if none of them work here
+	"""
+	for func in (_rssStatm, _rssPsutil, _rssMaxrss):
+		try:
+			func()
+		except Exception:
+			continue
+		return func
+	return None
+
+
+class MemoryBudget(object):
+	def __init__(
+		self,
+		limit: int = 0,
+		checkInterval: int = 1024,
+	) -> None:
+		"""
+		limit: target memory ceiling in bytes, 0 for no limit
+		checkInterval: number of entries between checking memory usage
+		"""
+		self._limit = limit
+		self._checkInterval = checkInterval
+		self._rssFunc = None
+		if limit > 0:
+			self._rssFunc = _findRssFunc()
+			if self._rssFunc is None:
+				log.warning(
+					"Memory budget: can not measure memory usage"
+					", ignoring memory_limit"
+				)
+				self._limit = 0
+		self._logged = set()
+
+	@property
+	def limit(self) -> int:
+		return self._limit
+
+	def usage(self) -> int:
+		"""
+		resident set size of process in bytes, or 0 if there is no limit
+		"""
+		if self._rssFunc is None:
+			return 0
+		return self._rssFunc()
+
+	def _decide(self, name: str, msg: str) -> None:
+		if name in self._logged:
+			return
+		self._logged.add(name)
+		log.info(f"Memory budget: {msg}")
+
+	def _above(self, ratio: float) -> bool:
+		if not self._limit:
+			return False
+		return self.usage() > self._limit * ratio
+
+	def useDirectMode(self, inputSize: int) -> bool:
+		"""
+		inputSize: total size of input file(s) in bytes
+		returns True if loading entries into memory is expected to
+		exceed the limit, so direct mode (with external sort) must be used
+		"""
+		if not self._limit:
+			return False
+		estimate = int(inputSize * loadRatio) + self.usage()
+		if estimate <= self._limit:
+			return False
+		self._decide(
+			"direct",
+			f"loading needs about {estimate >> 20} MiB, more than limit"
+			f" {self._limit >> 20} MiB, using direct mode and external sort",
+		)
+		return True
+
+	def shouldCompress(self, index: int) -> bool:
+		"""
+		called for every entry while loading entries into memory
+		returns True if memory usage is high enough to start compressing
+		definitions of loaded entries
+		"""
+		if index % self._checkInterval or not self._above(compressRatio):
+			return False
+		self._decide(
+			"compress",
+			f"usage is {self.usage() >> 20} MiB after {index} entries"
+			f", compressing loaded entries",
+		)
+		return True
+
+	def shouldSpill(self, count: int) -> bool:
+		"""
+		called by external sort for every `checkInterval` items
+		count: number of items that are kept in memory
+		returns True if memory usage is high enough to spill them to disk
+		"""
+		if not self._above(spillRatio):
+			return False
+		self._decide(
+			"spill",
+			f"usage is {self.usage() >> 20} MiB with {count} entries"
+			f" in sort buffer, spilling sorted runs of {count} entries",
+		)
+		return True
+
+	def collect(self, index: int) -> None:
+		"""
+		called for every entry while loading or writing entries
+		runs garbage collector if memory usage is close to the limit
+		"""
+		if index % self._checkInterval or not self._above(collectRatio):
+			return
+		self._decide(
+			"collect",
+			f"usage is {self.usage() >> 20} MiB, running garbage collector"
+			f" every {self._checkInterval} entries while above"
+			f" {int(self._limit * collectRatio) >> 20} MiB",
+		)
+		gc.collect()
+
+	@contextmanager
+	def frozenGC(self) -> Iterator[None]:
+		"""
+		moves all current objects into permanent generation of garbage
+		collector while the block runs, so long-lived objects (like
+		indexes of readers) are not traversed by every collection
+		"""
+		if not hasattr(gc, "freeze"):  # Python < 3.7
+			yield
+			return
+		gc.collect()
+		gc.freeze()
+		log.debug(f"Froze {gc.get_freeze_count()} objects in garbage collector")
+		try:
+			yield
+		finally:
+			gc.unfreeze()
+
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import dirname, abspath
+import sys
+import gc
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.memory_budget import MemoryBudget
+
+MiB = 1024 * 1024
+
+
+class MockMemoryBudget(MemoryBudget):
+	def __init__(self, limit, rss):
+		MemoryBudget.__init__(self, limit=limit, checkInterval=10)
+		self.rss = rss
+		self._rssFunc = lambda: self.rss
+
+
+class MemoryBudgetTest(unittest.TestCase):
+	def test_noLimit(self):
+		budget = MemoryBudget()
+		self.assertEqual(budget.limit, 0)
+		self.assertEqual(budget.usage(), 0)
+		self.assertFalse(budget.useDirectMode(10 ** 12))
+		self.assertFalse(budget.shouldCompress(0))
+		self.assertFalse(budget.shouldSpill(1024))
+
+	def test_usage(self):
+		budget = MemoryBudget(limit=1024 * MiB)
+		self.assertGreater(budget.usage(), MiB)
+
+	def test_useDirectMode(self):
+		budget = MockMemoryBudget(100 * MiB, 20 * MiB)
+		self.assertFalse(budget.useDirectMode(30 * MiB))
+		self.assertTrue(budget.useDirectMode(50 * MiB))
+
+	def test_shouldCompress(self):
+		budget = MockMemoryBudget(100 * MiB, 40 * MiB)
+		self.assertFalse(budget.shouldCompress(10))
+		budget.rss = 60 * MiB
+		self.assertFalse(budget.shouldCompress(11))
+		self.assertTrue(budget.shouldCompress(20))
+
+	def test_shouldSpill(self):
+		budget = MockMemoryBudget(100 * MiB, 60 * MiB)
+		self.assertFalse(budget.shouldSpill(1024))
+		budget.rss = 80 * MiB
+		self.assertTrue(budget.shouldSpill(2048))
+
+	def test_frozenGC(self):
+		if not hasattr(gc, "freeze"):
+			return
+		budget = MemoryBudget()
+		with budget.frozenGC():
+			self.assertGreater(gc.get_freeze_count(), 0)
+		self.assertEqual(gc.get_freeze_count(), 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -56,6 +56,17 @@ class Option(object):
 	def groupValues(self) -> Optional[Dict[str, Any]]:
 		return None
 
+	def toDict(self) -> Dict[str, Any]:
+		"JSON-serializable dict, for the plugin index, see optionFromDict"
+		return {
+			"class": self.__class__.__name__,
+			"typ": self.typ,
+			"customValue": self.customValue,
+			"values": self.values,
+			"comment": self.comment,
+			"disabled": self.disabled,
+		}
+
 
 class BoolOption(Option):
 	def __init__(self, **kwargs):
@@ -248,3 +259,20 @@ class HtmlColorOption(Option):
 	def __init__(self, **kwargs):
 		Option.__init__(self, "str", customValue=True, **kwargs)
 		# FIXME: use a specific type?
+
+
+def optionFromDict(data: Dict[str, Any]) -> Option:
+	"""
+		re-creates an Option object from the result of Option.toDict()
+		__init__ is not called, because subclasses have different arguments
+	"""
+	cls = globals().get(data["class"])
+	if not (isinstance(cls, type) and issubclass(cls, Option)):
+		raise ValueError(f"invalid option class {data['class']!r}")
+	opt = cls.__new__(cls)
+	opt.typ = data["typ"]
+	opt.customValue = data["customValue"]
+	opt.values = data["values"]
+	opt.comment = data["comment"]
+	opt.disabled = data["disabled"]
+	return opt
@@ -35,6 +35,43 @@ class indir(object):
 		self.oldpwd = None
 
 
+def copyFile(src: str, dst: str, link: bool = False) -> None:
+	"""
+	copies file `src` to `dst` without reading it into memory, using
+	os.copy_file_range (which copies inside kernel, or clones the file on
+	filesystems that support copy-on-write), or shutil.copyfile (which uses
+	os.sendfile on Linux)
+
+	link: make a hard link if possible, instead of copying
+	does nothing if `dst` is the same file as `src`
+	"""
+	if os.path.exists(dst):
+		if os.path.samefile(src, dst):
+			return
+		os.remove(dst)
+	if link:
+		try:
+			os.link(src, dst)
+			return
+		except OSError:
+			pass
+	copyRange = getattr(os, "copy_file_range", None)  # Python 3.8+, Linux
+	if copyRange is not None:
+		with open(src, "rb") as srcFile, open(dst, "wb") as dstFile:
+			size = os.fstat(srcFile.fileno()).st_size
+			try:
+				while size > 0:
+					count = copyRange(srcFile.fileno(), dstFile.fileno(), size)
+					if count == 0:
+						break
+					size -= count
+				return
+			except OSError:
+				# not supported by kernel or filesystem
+				pass
+	shutil.copyfile(src, dst)
+
+
 def my_url_show(link: str) -> None:
 	import subprocess
 	for path in (
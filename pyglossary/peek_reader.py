@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+peek-ahead buffer for readers in direct mode (see Glossary.peekEntries)
+
+entries that are read ahead (for example by a writer that checks the
+format of first definitions in its open() method) are kept in a buffer
+and yielded again before the rest of the entries, so the input is not
+opened again, or loaded into memory
+"""
+
+from collections import deque
+from typing import (
+	Any,
+	Iterator,
+	List,
+	Optional,
+)
+
+from .entry_base import BaseEntry
+from .entry_batch import iterBatches
+
+
+class PeekReader(object):
+	"""
+	wraps a Reader, other attributes and methods (like formatName and
+	close) are taken from the wrapped reader
+	"""
+
+	def __init__(self, reader: Any, batchSize: int) -> None:
+		"""
+		batchSize: size of batches that are read from reader, if it
+			supports the batch protocol (see pyglossary/entry_batch.py)
+		"""
+		self._reader = reader
+		self._native = hasattr(reader, "readBatches")
+		if self._native:
+			self._source = reader.readBatches(batchSize)
+		else:
+			self._source = iterBatches(reader, 1)
+		# batches that are read ahead, and not yielded yet
+		self._buffer = deque()  # type: deque
+		self._count = 0  # number of entries in self._buffer
+		# True if position of reader is right after the last yielded entry
+		self._stable = True
+
+	def __getattr__(self, name: str) -> Any:
+		attr = getattr(self._reader, name)
+		if name == "tell":
+			return self._tell
+		return attr
+
+	def __len__(self) -> int:
+		return len(self._reader)
+
+	def peek(self, count: int) -> List[BaseEntry]:
+		"""
+		returns the first `count` entries that are not yielded yet
+		(or less, if there are not enough entries left)
+		"""
+		while self._count < count:
+			try:
+				batch = next(self._source)
+			except StopIteration:
+				break
+			self._buffer.append(batch)
+			self._count += len(batch)
+		entries = []
+		for batch in self._buffer:
+			entries += batch[:count - len(entries)]
+			if len(entries) >= count:
+				break
+		return entries
+
+	def _batches(self) -> Iterator[List[BaseEntry]]:
+		while self._buffer:
+			batch = self._buffer.popleft()
+			self._count -= len(batch)
+			yield batch
+		yield from self._source
+
+	def __iter__(self) -> Iterator[BaseEntry]:
+		for batch in self._batches():
+			lastIndex = len(batch) - 1
+			for index, entry in enumerate(batch):
+				self._stable = index == lastIndex and not self._buffer
+				yield entry
+
+	def readBatches(self, batchSize: int) -> Iterator[List[BaseEntry]]:
+		"""
+		batch protocol (see pyglossary/entry_batch.py)
+		if the reader supports it, batches have the size that was given
+		to the constructor
+		"""
+		if not self._native:
+			yield from iterBatches(self, batchSize)
+			return
+		for batch in self._batches():
+			self._stable = not self._buffer
+			yield batch
+
+	def _tell(self) -> Optional[Any]:
+		"""
+		checkpoint protocol (see pyglossary/checkpoint.py)
+		position of reader is ahead of the yielded entries while there are
+		read-ahead entries left
+		"""
+		if not self._stable:
+			return None
+		return self._reader.tell()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath
+import sys
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.entry import Entry
+from pyglossary.peek_reader import PeekReader
+from pyglossary.glossary import Glossary
+
+
+class MockReader(object):
+	formatName = "Mock"
+
+	def __init__(self, count):
+		self._count = count
+		self._pos = 0
+
+	def __len__(self):
+		return self._count
+
+	def __iter__(self):
+		while self._pos < self._count:
+			self._pos += 1
+			if self._pos % 10 == 0:
+				yield None
+				continue
+			yield Entry(f"word{self._pos}", f"defi{self._pos}")
+
+	def tell(self):
+		return self._pos
+
+
+class MockBatchReader(MockReader):
+	def readBatches(self, batchSize):
+		batch = []
+		for entry in MockReader.__iter__(self):
+			if entry is None:
+				continue
+			batch.append(entry)
+			if len(batch) >= batchSize:
+				yield batch
+				batch = []
+		if batch:
+			yield batch
+
+
+def words(entries):
+	return [entry.s_word for entry in entries]
+
+
+class PeekReaderTest(unittest.TestCase):
+	def expectedWords(self, count):
+		return words(e for e in MockReader(count) if e is not None)
+
+	def test_iter(self):
+		for readerClass in (MockReader, MockBatchReader):
+			reader = PeekReader(readerClass(50), 4)
+			self.assertEqual(words(reader.peek(5)), self.expectedWords(6)[:5])
+			self.assertEqual(words(reader.peek(3)), self.expectedWords(6)[:3])
+			self.assertEqual(words(reader), self.expectedWords(50))
+
+	def test_readBatches(self):
+		for readerClass in (MockReader, MockBatchReader):
+			reader = PeekReader(readerClass(50), 4)
+			reader.peek(10)
+			batches = list(reader.readBatches(4))
+			self.assertEqual(
+				words(entry for batch in batches for entry in batch),
+				self.expectedWords(50),
+			)
+
+	def test_peek_all(self):
+		reader = PeekReader(MockReader(5), 4)
+		self.assertEqual(len(reader.peek(100)), 5)
+		self.assertEqual(len(list(reader)), 5)
+
+	def test_attributes(self):
+		reader = PeekReader(MockReader(5), 4)
+		self.assertEqual(reader.formatName, "Mock")
+		self.assertEqual(len(reader), 5)
+		self.assertFalse(hasattr(reader, "seek"))
+
+	def test_tell(self):
+		reader = PeekReader(MockBatchReader(9), 4)
+		reader.peek(6)
+		positions = [(entry.s_word, reader.tell()) for entry in reader]
+		# reader is ahead of yielded entries, until the end of last batch
+		# that was read ahead, and then inside each batch
+		self.assertEqual(positions, [
+			("word1", None),
+			("word2", None),
+			("word3", None),
+			("word4", None),
+			("word5", None),
+			("word6", None),
+			("word7", None),
+			("word8", 8),
+			("word9", 9),
+		])
+
+
+class GlossaryPeekTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+		self.inputPath = join(self.dir, "in.txt")
+		with open(self.inputPath, "w", encoding="utf-8") as _file:
+			for index in range(500):
+				_file.write(f"word{index}\tdefinition {index}\n")
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def convert(self, name, direct):
+		outputPath = join(self.dir, name, "out.ifo")
+		glos = Glossary()
+		self.assertTrue(glos.convert(
+			inputFilename=self.inputPath,
+			outputFilename=outputPath,
+			outputFormat="Stardict",
+			direct=direct,
+		))
+		result = {}
+		for ext in ("ifo", "idx", "dict"):
+			with open(join(self.dir, name, "out." + ext), "rb") as _file:
+				result[ext] = _file.read()
+		return result
+
+	def test_collectDefiFormat(self):
+		glos = Glossary()
+		self.assertTrue(glos.read(self.inputPath, direct=True))
+		self.assertEqual(
+			glos.collectDefiFormat(100),
+			{"h": 0, "m": 1.0, "x": 0},
+		)
+		self.assertEqual(len(list(glos)), 500)
+
+	def test_stardict_direct(self):
+		direct = self.convert("direct", True)
+		self.assertIn(b"\nsametypesequence=m\n", direct["ifo"])
+		self.assertEqual(direct, self.convert("indirect", False))
+
+
+if __name__ == "__main__":
+	unittest.main()
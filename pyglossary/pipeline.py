@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+threaded pipeline, for running stages of conversion (reader and entry
+filters) in separate threads, connected by bounded queues, while writers
+run in the calling thread (see `pipeline_threads` pref)
+
+file I/O, zlib/lzma/bz2 (de)compression and some parts of lxml release
+the GIL, so a reader can read and decompress the next batches while
+a writer is compressing or writing the previous ones
+
+items are passed in the same order, and an exception raised in a stage
+is raised again in the thread that iterates over the next stage
+"""
+
+import threading
+import queue
+from typing import (
+	Iterable,
+	Iterator,
+	Any,
+)
+
+import logging
+log = logging.getLogger("root")
+
+# seconds to wait for a full (or empty) queue, before checking if
+# pipeline is closed
+_waitTimeout = 0.1
+
+
+class _End(object):
+	pass
+
+
+class _Error(object):
+	def __init__(self, exc: BaseException) -> None:
+		self.exc = exc
+
+
+class ThreadedPipeline(object):
+	def __init__(self, queueSize: int = 16) -> None:
+		"""
+		queueSize: maximum number of items in the queue of each stage
+		"""
+		self._queueSize = queueSize
+		self._stages = []
+		self._threads = []
+		self._closed = threading.Event()
+		self._uiLock = threading.Lock()
+		# (methodName, args) of UI calls from stage threads
+		self._uiEvents = []
+
+	def stage(self, items: Iterable[Any], name: str) -> Iterator[Any]:
+		"""
+		returns an iterator over `items`, that are taken from `items` by a
+		new thread, which is started when the iterator is used first
+		"""
+		itemQueue = queue.Queue(self._queueSize)
+		self._stages.append((name, itemQueue))
+		return self._consume(items, name, itemQueue)
+
+	def _put(self, itemQueue: queue.Queue, item: Any) -> bool:
+		while not self._closed.is_set():
+			try:
+				itemQueue.put(item, timeout=_waitTimeout)
+			except queue.Full:
+				continue
+			return True
+		return False
+
+	def _run(self, items: Iterable[Any], itemQueue: queue.Queue) -> None:
+		try:
+			for item in items:
+				if not self._put(itemQueue, item):
+					return
+		except BaseException as e:
+			self._put(itemQueue, _Error(e))
+			return
+		self._put(itemQueue, _End())
+
+	def _consume(
+		self,
+		items: Iterable[Any],
+		name: str,
+		itemQueue: queue.Queue,
+	) -> Iterator[Any]:
+		thread = threading.Thread(
+			target=self._run,
+			args=(items, itemQueue),
+			name=f"pyglossary-{name}",
+			daemon=True,
+		)
+		self._threads.append(thread)
+		thread.start()
+		while True:
+			try:
+				item = itemQueue.get(timeout=_waitTimeout)
+			except queue.Empty:
+				if self._closed.is_set():
+					return
+				continue
+			if isinstance(item, _End):
+				return
+			if isinstance(item, _Error):
+				raise item.exc
+			yield item
+
+	def depthText(self) -> str:
+		"""
+		number of items in queue of each stage, for progress UI
+		"""
+		return ", ".join(
+			f"{name} queue: {itemQueue.qsize()}/{self._queueSize}"
+			for name, itemQueue in self._stages
+		)
+
+	def postUI(self, methodName: str, *args) -> bool:
+		"""
+		if called in a stage thread, keeps the UI call to be done by
+		`flushUI` in the thread that uses the pipeline (UI toolkits are
+		not thread-safe) and returns True, otherwise returns False
+		consecutive progress calls are merged into the last one
+		"""
+		if threading.current_thread() not in self._threads:
+			return False
+		with self._uiLock:
+			events = self._uiEvents
+			if events and methodName == "progress" and events[-1][0] == "progress":
+				events[-1] = (methodName, args)
+			else:
+				events.append((methodName, args))
+		return True
+
+	def flushUI(self, target: Any) -> None:
+		"""
+		calls the UI methods of `target` that were posted by stage threads
+		"""
+		if not self._uiEvents:
+			return
+		with self._uiLock:
+			events = self._uiEvents
+			self._uiEvents = []
+		for methodName, args in events:
+			getattr(target, methodName)(*args)
+
+	def close(self) -> None:
+		"""
+		stops stage threads (after their current item) and waits for them
+		"""
+		self._closed.set()
+		for thread in self._threads:
+			if thread is not threading.current_thread():
+				thread.join()
+		self._threads = []
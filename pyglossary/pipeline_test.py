@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath
+import sys
+import tempfile
+import threading
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.pipeline import ThreadedPipeline
+from pyglossary.glossary import Glossary
+
+
+class MockUI(object):
+	def __init__(self, pref):
+		self.pref = pref
+		self.calls = []
+
+	def progressInit(self, title):
+		self.calls.append(("progressInit", threading.current_thread()))
+
+	def progress(self, rat, text=""):
+		self.calls.append(("progress", threading.current_thread()))
+
+	def progressEnd(self):
+		self.calls.append(("progressEnd", threading.current_thread()))
+
+
+class ThreadedPipelineTest(unittest.TestCase):
+	def test_order(self):
+		pipeline = ThreadedPipeline(queueSize=2)
+		items = pipeline.stage(range(1000), "a")
+		items = pipeline.stage((x * 2 for x in items), "b")
+		self.assertEqual(list(items), [x * 2 for x in range(1000)])
+		pipeline.close()
+
+	def test_exception(self):
+		def gen():
+			yield 1
+			raise ValueError("bad item")
+
+		pipeline = ThreadedPipeline()
+		items = pipeline.stage(pipeline.stage(gen(), "a"), "b")
+		self.assertEqual(next(items), 1)
+		with self.assertRaises(ValueError):
+			next(items)
+		pipeline.close()
+
+	def test_close(self):
+		def gen():
+			index = 0
+			while True:
+				yield index
+				index += 1
+
+		pipeline = ThreadedPipeline(queueSize=4)
+		items = pipeline.stage(pipeline.stage(gen(), "a"), "b")
+		self.assertEqual(next(items), 0)
+		pipeline.close()
+		self.assertEqual(
+			[
+				thread for thread in threading.enumerate()
+				if thread.name.startswith("pyglossary-")
+			],
+			[],
+		)
+
+	def test_postUI(self):
+		ui = MockUI({})
+		pipeline = ThreadedPipeline()
+
+		def gen():
+			for index in range(3):
+				pipeline.postUI("progressInit", "title") or ui.progressInit("title")
+				pipeline.postUI("progress", 0.5) or ui.progress(0.5)
+				pipeline.postUI("progress", 0.6) or ui.progress(0.6)
+				yield index
+
+		self.assertFalse(pipeline.postUI("progress", 0.1))
+		for _ in pipeline.stage(gen(), "a"):
+			pipeline.flushUI(ui)
+		pipeline.flushUI(ui)
+		pipeline.close()
+		self.assertEqual(
+			[name for name, _ in ui.calls],
+			["progressInit", "progress"] * 3,
+		)
+		for _, thread in ui.calls:
+			self.assertIs(thread, threading.current_thread())
+
+
+class GlossaryPipelineTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+		self.inputPath = join(self.dir, "in.txt")
+		with open(self.inputPath, "w", encoding="utf-8") as _file:
+			for index in range(3000):
+				_file.write(f"word{index % 700}\tdefinition <b>{index}</b>\n")
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def convert(self, outputName, pref, **kwargs):
+		outputPath = join(self.dir, outputName)
+		ui = MockUI(pref)
+		glos = Glossary(ui=ui)
+		self.assertTrue(glos.convert(
+			inputFilename=self.inputPath,
+			outputFilename=outputPath,
+			outputFormat="Tabfile",
+			**kwargs
+		))
+		for _, thread in ui.calls:
+			self.assertIs(thread, threading.current_thread())
+		with open(outputPath, encoding="utf-8") as _file:
+			return _file.read()
+
+	def test_convert(self):
+		for kwargs in (
+			{},
+			{"direct": False},
+			{"sort": True, "defaultSortKey": lambda b_word: b_word},
+		):
+			self.assertEqual(
+				self.convert(
+					"out1.txt",
+					{"pipeline_threads": True, "batch_size": 64},
+					**kwargs
+				),
+				self.convert("out2.txt", {}, **kwargs),
+			)
+
+
+if __name__ == "__main__":
+	unittest.main()
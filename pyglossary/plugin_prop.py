@@ -25,11 +25,12 @@ from typing import (
 	Any,
 )
 
-from .option import Option
+from .option import Option, optionFromDict
 from .flags import (
 	YesNoAlwaysNever,
 	DEFAULT_NO,
 )
+import sys
 import logging
 
 log = logging.getLogger("root")
@@ -37,25 +38,70 @@ log = logging.getLogger("root")
 class PluginProp(object):
 	def __init__(self, plugin) -> None:
 		self._p = plugin
+		self._index = None  # type: Optional[Dict[str, Any]]
+		self._moduleName = ""
+		self._directory = ""
+		self._optionsProp = None  # type: Optional[Dict[str, Option]]
 		self._Reader = None
 		self._ReaderLoaded = False
 		self._Writer = None
 		self._WriterLoaded = False
 
+	@classmethod
+	def fromIndex(
+		cls,
+		moduleName: str,
+		directory: str,
+		index: Dict[str, Any],
+	) -> "PluginProp":
+		"""
+		index is a plugin entry of the plugin index (see Glossary.loadPlugins)
+		the plugin module is not imported until Reader or Writer class
+		is needed
+		"""
+		prop = cls(None)
+		prop._index = index
+		prop._moduleName = moduleName
+		prop._directory = directory
+		return prop
+
+	def _importModule(self) -> Optional[Any]:
+		log.debug(f"Importing plugin module {self._moduleName!r}")
+		sys.path.append(self._directory)
+		try:
+			return __import__(self._moduleName)
+		except ModuleNotFoundError as e:
+			log.error(
+				f"Module {e.name!r} not found"
+				f", can not load plugin {self._moduleName!r}"
+			)
+		except Exception:
+			log.exception(f"Error while importing plugin {self._moduleName}")
+		finally:
+			sys.path.remove(self._directory)
+
 	@property
 	def pluginModule(self):
+		if self._p is None and self._index is not None:
+			self._p = self._importModule()
 		return self._p
 
 	@property
 	def name(self) -> str:
+		if self._index is not None:
+			return self._index["name"]
 		return self._p.format
 
 	@property
 	def description(self) -> str:
+		if self._index is not None:
+			return self._index["description"]
 		return self._p.description
 
 	@property
 	def extensions(self) -> Tuple[str, ...]:
+		if self._index is not None:
+			return tuple(self._index["extensions"])
 		return self._p.extensions
 
 	@property
@@ -67,18 +113,29 @@ class PluginProp(object):
 
 	@property
 	def singleFile(self) -> bool:
+		if self._index is not None:
+			return self._index["singleFile"]
 		return self._p.singleFile
 
 	@property
 	def optionsProp(self) -> Dict[str, Option]:
-		return getattr(self._p, "optionsProp", {})
+		if self._index is None:
+			return getattr(self._p, "optionsProp", {})
+		if self._optionsProp is None:
+			self._optionsProp = {
+				name: optionFromDict(data)
+				for name, data in self._index["optionsProp"].items()
+			}
+		return self._optionsProp
 
 	@property
 	def sortOnWrite(self) -> YesNoAlwaysNever:
+		if self._index is not None:
+			return self._index["sortOnWrite"]
 		return getattr(self._p, "sortOnWrite", DEFAULT_NO)
 
 	def _loadReaderClass(self) -> Optional[Any]:
-		cls = getattr(self._p, "Reader", None)
+		cls = getattr(self.pluginModule, "Reader", None)
 		if cls is None:
 			return None
 		for attr in (
@@ -105,6 +162,7 @@ class PluginProp(object):
 		else:
 			cls.depends = {}
 
+		cls.formatName = self.name
 		return cls
 
 
@@ -118,7 +176,7 @@ class PluginProp(object):
 		return cls
 
 	def _loadWriterClass(self) -> Optional[Any]:
-		cls = getattr(self._p, "Writer", None)
+		cls = getattr(self.pluginModule, "Writer", None)
 		if cls is None:
 			return None
 		for attr in (
@@ -155,6 +213,47 @@ class PluginProp(object):
 		self._WriterLoaded = True
 		return cls
 
+	@property
+	def canRead(self) -> bool:
+		if self._index is not None:
+			return self._index["canRead"]
+		return self.readerClass is not None
+
 	@property
 	def canWrite(self) -> bool:
+		if self._index is not None:
+			return self._index["canWrite"]
 		return self.writerClass is not None
+
+
+class PluginClassDict(dict):
+	"""
+	format name => Reader or Writer class
+
+	the class (and so the plugin module) is loaded on first access
+	"""
+	def __init__(self, plugins: Dict[str, PluginProp], attr: str) -> None:
+		dict.__init__(self)
+		self._plugins = plugins
+		self._attr = attr
+
+	def __missing__(self, format: str) -> Any:
+		plugin = self._plugins.get(format)
+		cls = getattr(plugin, self._attr) if plugin else None
+		if cls is None:
+			raise KeyError(format)
+		self[format] = cls
+		return cls
+
+	def __contains__(self, format: str) -> bool:
+		try:
+			self[format]
+		except KeyError:
+			return False
+		return True
+
+	def get(self, format: str, default: Any = None) -> Any:
+		try:
+			return self[format]
+		except KeyError:
+			return default
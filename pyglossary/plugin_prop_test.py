@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath, isfile
+import os
+import sys
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+from pyglossary.plugin_prop import PluginClassDict
+from pyglossary.option import EncodingOption, optionFromDict
+
+pluginName = "plugin_index_test_fmt"
+
+pluginCode = """
+from pyglossary.option import EncodingOption, BoolOption
+
+enable = True
+format = "PluginIndexTest"
+description = "Plugin Index Test"
+extensions = (".pitest", ".pit")
+singleFile = True
+sortOnWrite = "default_yes"
+optionsProp = {
+	"encoding": EncodingOption(),
+	"flag": BoolOption(comment="some flag"),
+}
+
+
+class Reader(object):
+	_encoding = "utf-8"
+	def __init__(self, glos): pass
+	def open(self, filename, fileObj=None): pass
+	def close(self): pass
+	def __len__(self): return 0
+	def __iter__(self): return iter([])
+
+
+class Writer(object):
+	_flag = False
+	def __init__(self, glos): pass
+	def open(self, filename, fileObj=None): pass
+	def write(self): yield
+	def finish(self): pass
+"""
+
+
+def newGlossaryClass(indexFile: str) -> type:
+	plugins = {}
+
+	class TestGlossary(Glossary):
+		pluginIndexFile = indexFile
+		pluginByDesc = {}
+		pluginByExt = {}
+		readerClasses = PluginClassDict(plugins, "readerClass")
+		writerClasses = PluginClassDict(plugins, "writerClass")
+		formatsReadOptions = {}
+		formatsWriteOptions = {}
+		formatsReadFileObj = {}
+		formatsWriteFileObj = {}
+		readFormats = []
+		writeFormats = []
+		readExt = []
+		writeExt = []
+		readDesc = []
+		writeDesc = []
+
+	TestGlossary.plugins = plugins
+	return TestGlossary
+
+
+def formatTables(cls: type) -> dict:
+	prop = cls.plugins["PluginIndexTest"]
+	return {
+		"readFormats": cls.readFormats,
+		"writeFormats": cls.writeFormats,
+		"readOptions": cls.formatsReadOptions,
+		"writeOptions": cls.formatsWriteOptions,
+		"readFileObj": cls.formatsReadFileObj,
+		"writeFileObj": cls.formatsWriteFileObj,
+		"byExt": sorted(cls.pluginByExt),
+		"byDesc": sorted(cls.pluginByDesc),
+		"extensions": prop.extensions,
+		"singleFile": prop.singleFile,
+		"sortOnWrite": prop.sortOnWrite,
+		"options": sorted(prop.optionsProp),
+	}
+
+
+class PluginIndexTest(unittest.TestCase):
+	def setUp(self):
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.pluginsDir = join(self.tmpDir.name, "plugins")
+		os.mkdir(self.pluginsDir)
+		self.pluginPath = join(self.pluginsDir, pluginName + ".py")
+		with open(self.pluginPath, "w") as _file:
+			_file.write(pluginCode)
+		self.indexFile = join(self.tmpDir.name, "cache", "plugin_index.json")
+
+	def tearDown(self):
+		sys.modules.pop(pluginName, None)
+		self.tmpDir.cleanup()
+
+	def loadPlugins(self) -> type:
+		sys.modules.pop(pluginName, None)
+		cls = newGlossaryClass(self.indexFile)
+		cls.loadPlugins(self.pluginsDir)
+		return cls
+
+	def test_index(self):
+		cls1 = self.loadPlugins()
+		self.assertIn(pluginName, sys.modules)
+		self.assertTrue(isfile(self.indexFile))
+		tables = formatTables(cls1)
+		self.assertEqual(tables["readOptions"], {"PluginIndexTest": ["encoding"]})
+		self.assertEqual(tables["writeOptions"], {"PluginIndexTest": ["flag"]})
+		self.assertEqual(tables["readFileObj"], {"PluginIndexTest": True})
+		self.assertEqual(tables["writeFileObj"], {"PluginIndexTest": True})
+
+		cls2 = self.loadPlugins()
+		self.assertNotIn(pluginName, sys.modules)
+		self.assertEqual(formatTables(cls2), tables)
+		prop = cls2.plugins["PluginIndexTest"]
+		self.assertIsInstance(prop.optionsProp["encoding"], EncodingOption)
+		self.assertEqual(prop.optionsProp["flag"].comment, "some flag")
+		self.assertTrue(prop.canRead)
+		self.assertNotIn(pluginName, sys.modules)
+
+		self.assertEqual(
+			cls2.detectInputFormat("test.pitest"),
+			"PluginIndexTest",
+		)
+		self.assertNotIn(pluginName, sys.modules)
+
+		Reader = cls2.readerClasses["PluginIndexTest"]
+		self.assertIn(pluginName, sys.modules)
+		self.assertEqual(Reader.formatName, "PluginIndexTest")
+		self.assertIn("PluginIndexTest", cls2.writerClasses)
+		self.assertNotIn("Unknown", cls2.writerClasses)
+
+	def test_invalidate(self):
+		self.loadPlugins()
+		with open(self.pluginPath, "a") as _file:
+			_file.write("\nextensions = ('.pitest2',)\n")
+		stat = os.stat(self.pluginPath)
+		os.utime(self.pluginPath, (stat.st_atime, stat.st_mtime + 10))
+
+		cls = self.loadPlugins()
+		self.assertIn(pluginName, sys.modules)
+		self.assertEqual(
+			cls.plugins["PluginIndexTest"].extensions,
+			(".pitest2",),
+		)
+
+		cls = self.loadPlugins()
+		self.assertNotIn(pluginName, sys.modules)
+		self.assertEqual(
+			cls.plugins["PluginIndexTest"].extensions,
+			(".pitest2",),
+		)
+
+
+class OptionDictTest(unittest.TestCase):
+	def test_roundtrip(self):
+		opt = EncodingOption(comment="test")
+		opt2 = optionFromDict(opt.toDict())
+		self.assertIsInstance(opt2, EncodingOption)
+		self.assertEqual(opt2.toDict(), opt.toDict())
+		self.assertTrue(opt2.validateRaw("utf-16"))
+		self.assertEqual(opt2.groupValues(), opt.groupValues())
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -49,7 +49,7 @@ class Reader(object):
 		self._glos = glos
 		self._clear()
 		self._re_bword = re.compile(
-			'(<a href=[^<>]+?>)',
+			b'(<a href=[^<>]+?>)',
 			re.I,
 		)
 		try:
@@ -78,12 +78,12 @@ class Reader(object):
 			return 0
 		return len(self._slobObj)
 
-	def _href_sub(self, m: "re.Match") -> str:
+	def _href_sub(self, m: "re.Match") -> bytes:
 		st = m.group(0)
-		if "//" in st:
+		if b"//" in st:
 			return st
-		st = st.replace('href="', 'href="bword://')
-		st = st.replace("href='", "href='bword://")
+		st = st.replace(b'href="', b'href="bword://')
+		st = st.replace(b"href='", b"href='bword://")
 		return st
 
 	def __iter__(self):
@@ -122,9 +122,13 @@ class Reader(object):
 			elif ctype == MIME_TEXT:
 				defiFormat = "m"
 
-			defi = blob.content.decode("utf-8")
-			defi = self._re_bword.sub(self._href_sub, defi)
-			yield self._glos.newEntry(word, defi, defiFormat=defiFormat)
+			# definition is decoded only if needed
+			b_defi = self._re_bword.sub(self._href_sub, blob.content)
+			yield self._glos.newBytesEntry(
+				word.encode("utf-8"),
+				b_defi,
+				defiFormat=defiFormat,
+			)
 
 
 class Writer(object):
@@ -172,6 +176,8 @@ class Writer(object):
 		# must not pass compression=None to slob.create()
 		self._slobWriter = slobWriter = slob.create(filename, **kwargs)
 		slobWriter.tag("label", self._glos.getInfo("name"))
+		# content hash => key of data entries, see DataEntry.contentHash
+		self._resKeys = {}  # type: Dict[str, str]
 
 	def finish(self):
 		self._filename = None
@@ -188,14 +194,20 @@ class Writer(object):
 		if not content_type:
 			log.error(f'unknown content type for {rel_path!r}')
 			return
-		content = entry.data
 		key = self._resPrefix + rel_path
 		try:
 			key.encode(slobWriter.encoding)
 		except UnicodeEncodeError:
 			log.error('Failed to add, broken unicode in key: {!a}'.format(key))
 			return
-		slobWriter.add(content, key, content_type=content_type)
+		digest = entry.contentHash()
+		if digest is not None and slobWriter.max_redirects:
+			targetKey = self._resKeys.get(digest)
+			if targetKey is not None:
+				slobWriter.add_alias(key, targetKey)
+				return
+			self._resKeys[digest] = key
+		slobWriter.add(entry.data, key, content_type=content_type)
 
 	def write(self) -> Generator[None, "BaseEntry", None]:
 		content_type = self._content_type
@@ -208,7 +220,7 @@ class Writer(object):
 				self.addDataEntry(entry)
 
 			words = entry.l_word
-			b_defi = entry.defi.encode("utf-8")
+			b_defi = entry.b_defi
 			_ctype = content_type
 			if not _ctype:
 				entry.detectDefiFormat()
@@ -242,6 +242,7 @@ class Writer(object):
 		myResDir = join(dirname, "OtherResources")
 		if not isdir(myResDir):
 			os.mkdir(myResDir)
+		resDedup = {}  # type: Dict[str, str]
 
 		with open(filePathBase + ".xml", "w", encoding="utf-8") as toFile:
 			write_header(glos, toFile, frontBackMatter)
@@ -250,7 +251,7 @@ class Writer(object):
 				if entry is None:
 					break
 				if entry.isData():
-					entry.save(myResDir)
+					entry.save(myResDir, dedup=resDedup)
 					continue
 
 				words = entry.l_word
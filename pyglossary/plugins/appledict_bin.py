@@ -83,9 +83,14 @@ class Reader(object):
 		self._file.seek(0x60)
 
 	def __len__(self):
-		# FIXME: returning zero will disable the progress bar
 		return 0
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		return SizeHint(byteTotal=self._limit)
+
 	def close(self):
 		if self._file is not None:
 			self._file.close()
@@ -282,6 +282,12 @@ class Reader(object):
 	def __len__(self):
 		return 0
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		return self._yaml.sizeHint()
+
 	def open(self, filename: str) -> None:
 		if isdir(filename):
 			filename = join(filename, "kedict.yml")
@@ -19,7 +19,8 @@
 
 from formats_common import *
 import csv
-from pyglossary.file_utils import fileCountLines
+import re
+from pyglossary.file_utils import fileCountLines, fileEstimateCount
 
 
 enable = True
@@ -116,6 +117,22 @@ class Reader(object):
 				self._leadingLinesCount
 		return self._wordCount + len(self._resFileNames)
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		number of rows is estimated from the beginning of file, unless
+		they are already counted by len(reader)
+		"""
+		resCount = len(self._resFileNames)
+		if self._wordCount is not None:
+			return SizeHint(count=self._wordCount + resCount, exact=True)
+		rowCount = fileEstimateCount(
+			self._filename,
+			re.compile("\n"),
+			encoding=self._encoding,
+		)
+		return SizeHint(count=rowCount - self._leadingLinesCount + resCount)
+
 	def _iterRows(self):
 		if self._bufferRow:
 			yield self._bufferRow
@@ -151,11 +168,7 @@ class Reader(object):
 
 		resDir = self._resDir
 		for fname in self._resFileNames:
-			with open(join(resDir, fname), "rb") as fromFile:
-				yield self._glos.newDataEntry(
-					fname,
-					fromFile.read(),
-				)
+			yield self._glos.newDataEntryFromFile(fname, join(resDir, fname))
 
 
 class Writer(object):
@@ -168,9 +181,17 @@ class Writer(object):
 	def __init__(self, glos: GlossaryType):
 		self._glos = glos
 
-	def open(self, filename: str):
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	):
 		self._filename = filename
-		self._file = open(filename, "w", encoding=self._encoding)
+		self._file = openTextWrite(
+			filename,
+			fileObj=fileObj,
+			encoding=self._encoding,
+		)
 		self._resDir = resDir = filename + "_res"
 		self._csvWriter = csv.writer(
 			self._file,
@@ -198,6 +219,7 @@ class Writer(object):
 		add_defi_format = self._add_defi_format
 		glos = self._glos
 		resDir = self._resDir
+		resDedup = {}  # type: Dict[str, str]
 		writer = self._csvWriter
 		while True:
 			entry = yield
@@ -205,7 +227,7 @@ class Writer(object):
 				break
 			if entry.isData():
 				if resources:
-					entry.save(resDir)
+					entry.save(resDir, dedup=resDedup)
 				continue
 
 			words = entry.l_word
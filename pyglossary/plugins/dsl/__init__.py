@@ -19,10 +19,13 @@
 # GNU General Public License for more details.
 
 import re
+import codecs
+from io import TextIOWrapper
 import html.entities
 from xml.sax.saxutils import escape, quoteattr
 
 from formats_common import *
+from pyglossary.file_utils import fileEstimateCount
 
 from . import layer
 from . import tag
@@ -166,6 +169,11 @@ re_m = re.compile(r"\[m(\d)\](.*?)\[/m\]")
 re_wrapped_in_quotes = re.compile("^(\\'|\")(.*)(\\1)$")
 re_end = re.compile(r"\\$")
 re_ref = re.compile("<<(.*?)>>")
+# headword lines, for estimating number of entries
+re_headword = re.compile(r"^[^\s#]", re.M)
+
+# bytes of a compressed file that are decoded for detecting encoding
+_encodingSampleSize = 64 * 1024
 
 
 # single instance of parser
@@ -327,24 +335,48 @@ class Reader(object):
 		self._glos = glos
 		self.clean_tags = _clean_tags
 		self._file = None
+		# DecompressedFile that self._file reads, if file is compressed
+		self._compressedFile = None
+		self._fileEncoding = "utf-8"
 		self._bufferLine = ""
 
 	def close(self):
 		if self._file:
 			self._file.close()
 		self._file = None
+		self._compressedFile = None
 
 	def __len__(self) -> int:
 		# FIXME
 		return 0
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		number of entries is estimated by headword lines (lines that do
+		not start with space, tab or #) in the beginning of file
+		for a compressed file, entries have byte progress instead
+		"""
+		if self._compressedFile is not None:
+			return SizeHint(byteTotal=self._compressedFile.compressedSize)
+		return SizeHint(count=fileEstimateCount(
+			self._filename,
+			re_headword,
+			encoding=self._fileEncoding,
+		))
+
 	def _clean_tags_only_markup(self, line, audio):
 		return _parse(line)
 
 	def open(
 		self,
 		filename: str,
+		fileObj: Optional["file"] = None,
 	) -> None:
+		"""
+		fileObj: binary file object of decompressed data of a compressed
+			file (like mydic.dsl.dz, see pyglossary/compression.py)
+		"""
 		self._filename = filename
 		if self._onlyFixMarkUp:
 			self.clean_tags = self._clean_tags_only_markup
@@ -353,8 +385,13 @@ class Reader(object):
 
 		encoding = self._encoding
 		if not encoding:
-			encoding = self.detectEncoding()
-		self._file = open(filename, "r", encoding=encoding)
+			encoding = self.detectEncoding(fileObj)
+		self._fileEncoding = encoding
+		if fileObj is None:
+			self._file = open(filename, "r", encoding=encoding)
+		else:
+			self._compressedFile = fileObj
+			self._file = TextIOWrapper(fileObj, encoding=encoding)
 
 		# read header
 		for line in self._file:
@@ -366,18 +403,32 @@ class Reader(object):
 				break
 			self.processHeaderLine(line)
 
-	def detectEncoding(self):
+	def _testEncoding(
+		self,
+		encoding: str,
+		fileObj: Optional["file"],
+	) -> None:
+		"""
+		raises UnicodeDecodeError if the first lines are not in `encoding`
+		"""
+		if fileObj is not None:
+			# compressed file can not seek, so a sample is peeked
+			sample = fileObj.peek(_encodingSampleSize)
+			codecs.getincrementaldecoder(encoding)().decode(sample)
+			return
+		with open(self._filename, "r", encoding=encoding) as _file:
+			for i in range(10):
+				_file.readline()
+
+	def detectEncoding(self, fileObj: Optional["file"] = None):
 		for testEncoding in ("utf-8", "utf-16"):
-			with open(self._filename, "r", encoding=testEncoding) as fileObj:
-				try:
-					for i in range(10):
-						fileObj.readline()
-				except UnicodeDecodeError:
-					log.info(f"Encoding of DSL file is not {testEncoding}")
-					continue
-				else:
-					log.info(f"Encoding of DSL file detected: {testEncoding}")
-					return testEncoding
+			try:
+				self._testEncoding(testEncoding, fileObj)
+			except UnicodeDecodeError:
+				log.info(f"Encoding of DSL file is not {testEncoding}")
+				continue
+			log.info(f"Encoding of DSL file detected: {testEncoding}")
+			return testEncoding
 		raise ValueError(
 			"Could not detect encoding of DSL file"
 			", specify it by: --read-options encoding=ENCODING"
@@ -394,6 +445,14 @@ class Reader(object):
 		elif line.startswith("#CONTENTS_LANGUAGE"):
 			self._glos.targetLangName = unwrap_quotes(line[19:])
 
+	def _byteProgress(self) -> Optional[Tuple[int, int]]:
+		if self._compressedFile is None:
+			return None
+		return (
+			self._compressedFile.compressedTell(),
+			self._compressedFile.compressedSize,
+		)
+
 	def _iterLines(self) -> Iterator[str]:
 		if self._bufferLine:
 			line = self._bufferLine
@@ -452,6 +511,7 @@ class Reader(object):
 				yield self._glos.newEntry(
 					[current_key] + current_key_alters,
 					"\n".join(current_text),
+					byteProgress=self._byteProgress(),
 				)
 
 			# start new entry
@@ -466,4 +526,5 @@ class Reader(object):
 			yield self._glos.newEntry(
 				[current_key] + current_key_alters,
 				"\n".join(current_text),
+				byteProgress=self._byteProgress(),
 			)
@@ -28,6 +28,7 @@ enable = True
 format = "Dictfile"
 description = "Kobo E-Reader Dictfile"
 extensions = (".df",)
+singleFile = True
 # https://github.com/pgaskin/dictutil
 
 optionsProp = {
@@ -107,8 +108,16 @@ class Writer(object):
 			return
 		self._file.close()
 
-	def open(self, filename: str) -> None:
-		self._file = open(filename, "w", encoding=self._encoding)
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	) -> None:
+		self._file = openTextWrite(
+			filename,
+			fileObj=fileObj,
+			encoding=self._encoding,
+		)
 		# dictgen's ParseDictFile does not seem to support glossary info / metedata
 
 	def write(
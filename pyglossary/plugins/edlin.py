@@ -149,11 +149,7 @@ class Reader(object):
 
 		resDir = self._resDir
 		for fname in self._resFileNames:
-			with open(join(resDir, fname), "rb") as fromFile:
-				yield self._glos.newDataEntry(
-					fname,
-					fromFile.read(),
-				)
+			yield self._glos.newDataEntryFromFile(fname, join(resDir, fname))
 
 
 class Writer(object):
@@ -234,6 +230,7 @@ class Writer(object):
 			raise ValueError("glossary is empty")
 
 		count = 1
+		resDedup = {}  # type: Dict[str, str]
 		rootHash = thisHash = self.getEntryHash(thisEntry)
 		prevHash = None
 
@@ -242,7 +239,7 @@ class Writer(object):
 			if nextEntry is None:
 				break
 			if nextEntry.isData():
-				nextEntry.save(self._resDir)
+				nextEntry.save(self._resDir, dedup=resDedup)
 				continue
 			nextHash = self.getEntryHash(nextEntry)
 			self.saveEntry(thisEntry, thisHash, prevHash, nextHash)
@@ -44,7 +44,9 @@ from pyglossary.text_utils import (
 	replaceStringTable,
 )
 from pyglossary.os_utils import indir
+from pyglossary.file_utils import openTextWrite
 from pyglossary.entry_base import BaseEntry
+from pyglossary.size_hint import SizeHint
 
 from pyglossary.glossary_type import GlossaryType
 
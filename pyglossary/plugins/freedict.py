@@ -342,6 +342,14 @@ class Reader(object):
 	def __len__(self) -> int:
 		return self._wordCount
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		if self._wordCount:
+			return SizeHint(count=self._wordCount, exact=True)
+		return SizeHint(byteTotal=self._fileSize)
+
 	def close(self) -> None:
 		if self._file:
 			self._file.close()
@@ -410,9 +418,13 @@ class Writer(object):
 		self._file = None
 		self._filename = None
 
-	def open(self, filename: str):
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	):
 		self._filename = filename
-		self._file = open(filename, "w", encoding="utf-8")
+		self._file = openTextWrite(filename, fileObj=fileObj)
 
 	def write(self) -> Generator[None, "BaseEntry", None]:
 		glos = self._glos
@@ -446,13 +458,14 @@ class Writer(object):
 </teiHeader>
 <text><body>""")
 
+		resDedup = {}  # type: Dict[str, str]
 		while True:
 			entry = yield
 			if entry is None:
 				break
 			if entry.isData():
 				if resources:
-					entry.save(f"{filename}_res")
+					entry.save(f"{filename}_res", dedup=resDedup)
 				continue
 			word = xml_escape(entry.s_word)
 			defi = xml_escape(entry.defi)
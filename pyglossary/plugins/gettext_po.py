@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from formats_common import *
+import re
 
 enable = True
 format = "GettextPo"
@@ -68,6 +69,18 @@ class Reader(object):
 			)
 		return self._wordCount
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		from pyglossary.file_utils import fileEstimateCount
+		if self._wordCount is not None:
+			return SizeHint(count=self._wordCount, exact=True)
+		return SizeHint(count=fileEstimateCount(
+			self._filename,
+			re.compile("^msgid", re.M),
+		))
+
 	def __iter__(self):
 		try:
 			from polib import unescape as po_unescape
@@ -124,9 +137,13 @@ class Writer(object):
 		self._filename = None
 		self._file = None
 
-	def open(self, filename: str):
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	):
 		self._filename = filename
-		self._file = _file = open(filename, mode="wt", encoding="utf-8")
+		self._file = _file = openTextWrite(filename, fileObj=fileObj)
 		_file.write('#\nmsgid ""\nmsgstr ""\n')
 		for key, value in self._glos.iterInfo():
 			_file.write(f'"{key}: {value}\\n"\n')
@@ -144,6 +161,7 @@ class Writer(object):
 			e.msg += f", run `{pip} install polib` to install"
 			raise e
 		resources = self._resources
+		resDedup = {}  # type: Dict[str, str]
 		_file = self._file
 		while True:
 			entry = yield
@@ -151,7 +169,7 @@ class Writer(object):
 				break
 			if entry.isData():
 				if resources:
-					entry.save(filename + "_res")
+					entry.save(filename + "_res", dedup=resDedup)
 				continue
 			_file.write(
 				f"msgid {po_escape(entry.s_word)}\n"
@@ -391,6 +391,7 @@ class Writer(object):
 		defiHasHeadwords = glos.getInfo("definition_has_headwords") == "True"
 
 		resDir = self._resDir
+		resDedup = {}  # type: Dict[str, str]
 		entryIndex = -1
 		while True:
 			entryIndex += 1
@@ -399,7 +400,7 @@ class Writer(object):
 				break
 			if entry.isData():
 				if resources:
-					entry.save(resDir)
+					entry.save(resDir, dedup=resDedup)
 				continue
 			defi = entry.defi
 			defiFormat = entry.defiFormat
@@ -273,6 +273,14 @@ class Reader(object):
 	def __len__(self) -> int:
 		return self._wordCount
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		if self._wordCount:
+			return SizeHint(count=self._wordCount, exact=True)
+		return SizeHint(byteTotal=self._fileSize)
+
 	def close(self) -> None:
 		if self._file:
 			self._file.close()
@@ -22,12 +22,21 @@ class Writer(object):
 	def __init__(self, glos: GlossaryType) -> None:
 		self._glos = glos
 		self._filename = None
+		self._file = None
 
-	def open(self, filename: str):
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	):
 		self._filename = filename
+		self._file = fileObj
 
 	def finish(self):
 		self._filename = None
+		if self._file:
+			self._file.close()
+			self._file = None
 
 	def write(self) -> Generator[None, "BaseEntry", None]:
 		from json import dumps
@@ -45,6 +54,7 @@ class Writer(object):
 		yield from glos.writeTxt(
 			entryFmt="\t{word}: {defi},\n",
 			filename=self._filename,
+			fileObj=self._file,
 			encoding=encoding,
 			writeInfo=writeInfo,
 			wordEscapeFunc=escape,
@@ -51,13 +51,15 @@ class Reader(object):
 	def __init__(self, glos):
 		self._glos = glos
 		self.clear()
-		self._re_internal_link = re.compile('href=(["\'])(entry://|[dx]:)')
+		self._re_internal_link = re.compile(b'href=(["\'])(entry://|[dx]:)')
 
 	def clear(self):
 		self._filename = ""
 		self._mdx = None
 		self._mdd = []
 		self._wordCount = 0
+		# number of mdx/mdd items that are read, see tell and seek
+		self._position = 0
 		self._dataEntryCount = 0
 
 		# dict of mainWord -> newline-separated altenatives
@@ -137,17 +139,27 @@ class Reader(object):
 
 		glos = self._glos
 		linksDict = self._linksDict
+		position = 0
 		for b_word, b_defi in self._mdx.items():
-			word = b_word.decode("utf-8")
-			defi = b_defi.decode("utf-8").strip()
-			if defi.startswith("@@@LINK="):
+			# items before the position given to seek are skipped
+			# without being parsed
+			position += 1
+			if position <= self._position:
+				continue
+			self._position = position
+			b_defi = b_defi.strip()
+			if b_defi.startswith(b"@@@LINK="):
 				continue
-			defi = self._re_internal_link.sub(r'href=\1bword://', defi)
-			words = word
-			altsStr = linksDict.get(word, "")
+			b_defi = self._re_internal_link.sub(rb'href=\1bword://', b_defi)
+			b_words = b_word
+			altsStr = linksDict.get(b_word.decode("utf-8"), "")
 			if altsStr:
-				words = [word] + altsStr.split("\n")
-			yield glos.newEntry(words, defi)
+				b_words = [b_word] + [
+					alt.encode("utf-8")
+					for alt in altsStr.split("\n")
+				]
+			# definition is decoded only if needed
+			yield glos.newBytesEntry(b_words, b_defi)
 
 		self._mdx = None
 		del linksDict
@@ -156,11 +168,24 @@ class Reader(object):
 
 		for mdd in self._mdd:
 			for b_fname, b_data in mdd.items():
+				position += 1
+				if position <= self._position:
+					continue
+				self._position = position
 				fname = toStr(b_fname)
 				fname = fname.replace("\\", os.sep).lstrip(os.sep)
 				yield glos.newDataEntry(fname, b_data)
 		self._mdd = []
 
+	def tell(self) -> int:
+		"""
+		checkpoint protocol (see pyglossary/checkpoint.py)
+		"""
+		return self._position
+
+	def seek(self, position: int) -> None:
+		self._position = position
+
 	def __len__(self):
 		return self._wordCount + self._dataEntryCount
 
@@ -34,9 +34,17 @@ class Writer(object):
 			self._file.close()
 			self._file = None
 
-	def open(self, filename: str):
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	):
 		self._filename = filename
-		self._file = open(filename, "wt", encoding=self._encoding)
+		self._file = openTextWrite(
+			filename,
+			fileObj=fileObj,
+			encoding=self._encoding,
+		)
 		self._writeInfo()
 
 	def _writeInfo(self):
@@ -8,10 +8,16 @@ from os.path import (
 )
 import re
 import gzip
+import mmap
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, chain, count, repeat
+from operator import add
 from time import time as now
 from collections import Counter
 #from typing_extensions import Literal
 
+from pyglossary.entry_batch import entryWriterFromBatchWriter
 from pyglossary.text_utils import (
 	uint32ToBytes,
 	uint32FromBytes,
@@ -93,6 +99,78 @@ infoKeys = (
 
 
 
+# a record of .idx file is a word that ends with NUL, and 32-bit offset
+# and size of its definition block, a record of .syn file is an alternate
+# that ends with NUL, and 32-bit index of its entry (big-endian)
+# these patterns split the files into words and fields of records
+re_idxRecordSep = re.compile(b"\x00(.{8})", re.S)
+re_synRecordSep = re.compile(b"\x00(.{4})", re.S)
+
+# .idx and .syn files are parsed in chunks of this size
+parseChunkSize = 1024 * 1024
+
+
+def parseRecords(
+	data: "Union[bytes, mmap.mmap]",
+	sepPattern: "re.Pattern",
+	fieldsSize: int,
+) -> Tuple[array, array, bool]:
+	"""
+	parses records of .idx or .syn file, by splitting each chunk of file
+	with `sepPattern`, so records are found by regex engine (not a Python
+	loop) and words are not kept as separate bytes objects
+
+	returns (wordStarts, fields, ok)
+		wordStarts: offset of word of each record in `data`, and end of
+			the last record, so record i has word
+			data[wordStarts[i]:wordStarts[i + 1] - fieldsSize - 1]
+		fields: uint32 fields of all records
+		ok: False if file ends with an incomplete record
+	"""
+	wordStarts = array("I")
+	fields = array("I")
+	recordExtraSize = fieldsSize + 1
+	dataLen = len(data)
+	chunkSize = parseChunkSize
+	ok = True
+	pos = 0
+	while pos < dataLen:
+		chunk = data[pos:pos + chunkSize]
+		# [word1, fields1, word2, fields2, ..., rest]
+		parts = sepPattern.split(chunk)
+		rest = parts.pop()
+		if not parts:
+			if pos + len(chunk) >= dataLen:
+				ok = False
+				break
+			# a word that is longer than chunk
+			chunkSize *= 2
+			continue
+		wordStarts.extend(accumulate(chain(
+			(pos,),
+			map(add, map(len, parts[0::2]), repeat(recordExtraSize)),
+		)))
+		pos = wordStarts.pop()
+		fields.frombytes(b"".join(parts[1::2]))
+		if rest and pos + len(rest) >= dataLen:
+			ok = False
+			break
+	wordStarts.append(pos)
+	if sys.byteorder == "little":
+		fields.byteswap()
+	return wordStarts, fields, ok
+
+
+def readFileData(filename: str) -> "Union[bytes, mmap.mmap]":
+	"""
+	returns read-only memory map of file, or its content if it's empty
+	"""
+	with open(filename, "rb") as _file:
+		if os.fstat(_file.fileno()).st_size == 0:
+			return b""
+		return mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 # re_newline = re.compile("[\n\r]+")
 re_newline = re.compile("\n\r?|\r\n?")
 
@@ -115,40 +193,52 @@ def verifySameTypeSequence(s: str) -> bool:
 
 
 class Reader(object):
+	# words and definitions are decoded as strict utf-8
+	validUtf8 = True
+
 	def __init__(self, glos: GlossaryType):
 		self._glos = glos
 		self.clear()
 		"""
-		indexData format
-		indexData[i] - i-th record in index file,
-						a tuple (previously a list) of length 3
-		indexData[i][0] - b_word (bytes)
-		indexData[i][1] - definition block offset in dict file (int)
-		indexData[i][2] - definition block size in dict file (int)
-		REMOVED:
-			indexData[i][3] - list of definitions
-			indexData[i][3][j][0] - definition data
-			indexData[i][3][j][1] - definition type - "h", "m" or "x"
-			indexData[i][4] - list of synonyms (strings)
-
-		synDict:
-			a dict { entryIndex -> altList }
+		index (see parseRecords), for i-th record in index file:
+		idxData[wordStarts[i]:wordStarts[i + 1] - 9] - b_word (bytes)
+		defiOffsets[i] - definition block offset in dict file
+		defiSizes[i] - definition block size in dict file
+
+		synonyms, for j-th alternate in sorted order of their entry index:
+		synEntryIndexes[j] - index of entry
+		synRecords[j] - index of record in syn file, and its alternate is
+			synData[synStarts[synRecords[j]]:synStarts[synRecords[j] + 1] - 5]
+
+		idxData and synData are memory maps of .idx and .syn files
+		(or content of .idx.gz file), and other ones are array("I")
 		"""
 
 	def close(self) -> None:
 		if self._dictFile:
 			self._dictFile.close()
+		for data in (self._idxData, self._synData):
+			if isinstance(data, mmap.mmap):
+				data.close()
 		self.clear()
 
 	def clear(self) -> None:
 		self._dictFile = None
 		self._filename = ""  # base file path, no extension
-		self._indexData = []
-		self._synDict = {}
+		self._idxData = b""
+		self._wordStarts = array("I")
+		self._defiOffsets = array("I")
+		self._defiSizes = array("I")
+		self._synData = b""
+		self._synStarts = array("I")
+		self._synEntryIndexes = array("I")
+		self._synRecords = array("I")
 		self._sametypesequence = ""
 		self._resDir = ""
 		self._resFileNames = []
 		self._wordCount = None
+		# index of next entry (in index, and then in resFileNames)
+		self._nextIndex = 0
 
 	def open(self, filename: str) -> None:
 		if splitext(filename)[1].lower() == ".ifo":
@@ -160,9 +250,9 @@ class Reader(object):
 		sametypesequence = self._glos.getInfo("sametypesequence")
 		if not verifySameTypeSequence(sametypesequence):
 			return False
-		self._indexData = self.readIdxFile()
-		self._wordCount = len(self._indexData)
-		self._synDict = self.readSynFile()
+		self.readIdxFile()
+		self._wordCount = len(self._defiOffsets)
+		self.readSynFile()
 		self._sametypesequence = sametypesequence
 		if isfile(self._filename + ".dict.dz"):
 			self._dictFile = gzip.open(self._filename + ".dict.dz", mode="rb")
@@ -200,38 +290,34 @@ class Reader(object):
 					continue
 				self._glos.setInfo(key, value)
 
-	def readIdxFile(self) -> List[Tuple[bytes, int, int]]:
+	def readIdxFile(self) -> None:
 		if isfile(self._filename + ".idx.gz"):
 			with gzip.open(self._filename + ".idx.gz") as idxFile:
-				idxBytes = idxFile.read()
+				self._idxData = idxFile.read()
 		else:
-			with open(self._filename + ".idx", "rb") as idxFile:
-				idxBytes = idxFile.read()
-
-		indexData = []
-		pos = 0
-		while pos < len(idxBytes):
-			beg = pos
-			pos = idxBytes.find(b"\x00", beg)
-			if pos < 0:
-				log.error("Index file is corrupted")
-				break
-			b_word = idxBytes[beg:pos]
-			pos += 1
-			if pos + 8 > len(idxBytes):
-				log.error("Index file is corrupted")
-				break
-			offset = uint32FromBytes(idxBytes[pos:pos + 4])
-			pos += 4
-			size = uint32FromBytes(idxBytes[pos:pos + 4])
-			pos += 4
-			indexData.append((b_word, offset, size))
+			self._idxData = readFileData(self._filename + ".idx")
 
-		return indexData
+		wordStarts, fields, ok = parseRecords(
+			self._idxData,
+			re_idxRecordSep,
+			8,
+		)
+		if not ok:
+			log.error("Index file is corrupted")
+		self._wordStarts = wordStarts
+		self._defiOffsets = fields[0::2]
+		self._defiSizes = fields[1::2]
 
 	def __iter__(self) -> Iterator[BaseEntry]:
-		indexData = self._indexData
-		synDict = self._synDict
+		idxData = self._idxData
+		wordStarts = self._wordStarts
+		defiOffsets = self._defiOffsets
+		defiSizes = self._defiSizes
+		synData = self._synData
+		synStarts = self._synStarts
+		synEntryIndexes = self._synEntryIndexes
+		synRecords = self._synRecords
+		synCount = len(synEntryIndexes)
 		sametypesequence = self._sametypesequence
 		dictFile = self._dictFile
 
@@ -239,11 +325,31 @@ class Reader(object):
 			log.error(f"{self} is not open, can not iterate")
 			raise StopIteration
 
-		if not indexData:
-			log.warning("indexData is empty")
+		wordCount = len(defiOffsets)
+		if not wordCount:
+			log.warning("index is empty")
 			raise StopIteration
 
-		for entryIndex, (b_word, defiOffset, defiSize) in enumerate(indexData):
+		startIndex = self._nextIndex
+		# position of synonyms of next entries, and their entry index
+		synPos = bisect_left(synEntryIndexes, startIndex)
+		synEntryIndex = synEntryIndexes[synPos] if synPos < synCount else -1
+		for entryIndex, wordStart, wordEnd, defiOffset, defiSize in zip(
+			count(startIndex),
+			wordStarts[startIndex:],
+			wordStarts[startIndex + 1:],
+			defiOffsets[startIndex:],
+			defiSizes[startIndex:],
+		):
+			self._nextIndex = entryIndex + 1
+			b_word = idxData[wordStart:wordEnd - 9]
+			alts = []
+			if entryIndex == synEntryIndex:
+				while synPos < synCount and synEntryIndexes[synPos] == entryIndex:
+					synIndex = synRecords[synPos]
+					alts.append(synData[synStarts[synIndex]:synStarts[synIndex + 1] - 5])
+					synPos += 1
+				synEntryIndex = synEntryIndexes[synPos] if synPos < synCount else -1
 			if not b_word:
 				continue
 
@@ -272,10 +378,10 @@ class Reader(object):
 
 			# defisData is a list of (b_defi, defiFormatCode) tuples
 
-			defis = []
+			b_defis = []
 			defiFormats = []
 			for b_defi, defiFormatCode in defisData:
-				defis.append(b_defi.decode("utf-8"))
+				b_defis.append(b_defi)
 				defiFormats.append(
 					{
 						"m": "m",
@@ -294,64 +400,70 @@ class Reader(object):
 			if not defiFormat:
 				log.warning(f"Definition format {defiFormat!r} is not supported")
 
-			word = b_word.decode("utf-8")
-			try:
-				alts = synDict[entryIndex]
-			except KeyError:  # synDict is dict
-				pass
-			else:
-				word = [word] + alts
+			if alts:
+				b_word = [b_word] + alts
 
-			defis_str = "\n<hr>\n".join(defis)
-			yield self._glos.newEntry(word, defis_str, defiFormat=defiFormat)
+			# words and definitions are decoded only if needed
+			yield self._glos.newBytesEntry(
+				b_word,
+				b"\n<hr>\n".join(b_defis),
+				defiFormat=defiFormat,
+			)
 
-		if isdir(self._resDir):
-			for fname in os.listdir(self._resDir):
-				fpath = join(self._resDir, fname)
-				with open(fpath, "rb") as fromFile:
-					yield self._glos.newDataEntry(
-						fname,
-						fromFile.read(),
-					)
-
-	def readSynFile(self) -> Dict[int, List[str]]:
+		resFileNames = self._resFileNames
+		for resIndex in range(self._nextIndex - wordCount, len(resFileNames)):
+			fname = resFileNames[resIndex]
+			self._nextIndex = wordCount + resIndex + 1
+			yield self._glos.newDataEntryFromFile(
+				fname,
+				join(self._resDir, fname),
+			)
+
+	def tell(self) -> int:
 		"""
-		return synDict, a dict { entryIndex -> altList }
+		checkpoint protocol (see pyglossary/checkpoint.py)
 		"""
-		if not isfile(self._filename + ".syn"):
-			return {}
-		with open(self._filename + ".syn", "rb") as synFile:
-			synBytes = synFile.read()
-		synBytesLen = len(synBytes)
-		synDict = {}
-		pos = 0
-		while pos < synBytesLen:
-			beg = pos
-			pos = synBytes.find(b"\x00", beg)
-			if pos < 0:
-				log.error("Synonym file is corrupted")
-				break
-			b_alt = synBytes[beg:pos]  # b_alt is bytes
-			pos += 1
-			if pos + 4 > len(synBytes):
-				log.error("Synonym file is corrupted")
-				break
-			entryIndex = uint32FromBytes(synBytes[pos:pos + 4])
-			pos += 4
-			if entryIndex >= self._wordCount:
-				log.error(
-					f"Corrupted synonym file. " +
-					f"Word {b_alt} references invalid item"
-				)
-				continue
+		return self._nextIndex
 
-			s_alt = b_alt.decode("utf-8")  # s_alt is str
-			try:
-				synDict[entryIndex].append(s_alt)
-			except KeyError:
-				synDict[entryIndex] = [s_alt]
+	def seek(self, position: int) -> None:
+		self._nextIndex = position
 
-		return synDict
+	def readSynFile(self) -> None:
+		"""
+		reads synonyms, sorted by their entry index (and in the order of
+		syn file for each entry), see __init__
+		"""
+		if not isfile(self._filename + ".syn"):
+			return
+		self._synData = synData = readFileData(self._filename + ".syn")
+		synStarts, entryIndexes, ok = parseRecords(
+			synData,
+			re_synRecordSep,
+			4,
+		)
+		if not ok:
+			log.error("Synonym file is corrupted")
+		# sort is stable, so alternates of each entry keep their order
+		synRecords = array("I", sorted(
+			range(len(entryIndexes)),
+			key=entryIndexes.__getitem__,
+		))
+		synEntryIndexes = array("I", map(entryIndexes.__getitem__, synRecords))
+		del entryIndexes
+
+		validCount = bisect_left(synEntryIndexes, self._wordCount)
+		for synIndex in synRecords[validCount:]:
+			b_alt = synData[synStarts[synIndex]:synStarts[synIndex + 1] - 5]
+			log.error(
+				f"Corrupted synonym file. " +
+				f"Word {b_alt} references invalid item"
+			)
+		del synEntryIndexes[validCount:]
+		del synRecords[validCount:]
+
+		self._synStarts = synStarts
+		self._synEntryIndexes = synEntryIndexes
+		self._synRecords = synRecords
 
 	def parseDefiBlockCompact(
 		self,
@@ -507,7 +619,9 @@ class Writer(object):
 		else:
 			stat = self._glos.collectDefiFormat(100)
 			log.info(f"defiFormat stat: {stat}")
-			if stat["m"] > 0.97:
+			if stat is None:
+				pass
+			elif stat["m"] > 0.97:
 				log.info(f"Auto-selecting sametypesequence=m")
 				self._sametypesequence = "m"
 			elif stat["h"] > 0.5:
@@ -515,6 +629,9 @@ class Writer(object):
 				self._sametypesequence = "h"
 
 	def write(self) -> Generator[None, "BaseEntry", None]:
+		yield from entryWriterFromBatchWriter(self.writeBatch())
+
+	def writeBatch(self) -> Generator[None, "List[BaseEntry]", None]:
 		if self._sametypesequence:
 			yield from self.writeCompact(self._sametypesequence)
 		else:
@@ -531,9 +648,19 @@ class Writer(object):
 			defi = self._br_pattern.sub("<br>", defi)
 		return defi
 
+	def getDefiBytes(self, entry: "BaseEntry", defiFormat: str) -> bytes:
+		"""
+		returns utf-8 encoded definition, fixed by fixDefi if needed
+		b_defi is used as is when possible, to avoid decoding BytesEntry
+		"""
+		if self._stardict_client and defiFormat == "h":
+			return self.fixDefi(entry.defi, defiFormat).encode("utf-8")
+		return entry.b_defi
+
 	def writeCompact(self, defiFormat):
 		"""
 		Build StarDict dictionary with sametypesequence option specified.
+		(batch writer generator, see writeBatch)
 		Every item definition consists of a single article.
 		All articles have the same format, specified in defiFormat parameter.
 
@@ -551,38 +678,38 @@ class Writer(object):
 		wordCount = 0
 		if not isdir(self._resDir):
 			os.mkdir(self._resDir)
+		resDedup = {}  # type: Dict[str, str]
 
 		entryIndex = -1
 		while True:
-			entry = yield
-			if entry is None:
+			entries = yield
+			if entries is None:
 				break
-			if entry.isData():
-				entry.save(self._resDir)
-				continue
-			entryIndex += 1
+			for entry in entries:
+				if entry.isData():
+					entry.save(self._resDir, dedup=resDedup)
+					continue
+				entryIndex += 1
 
-			words = entry.l_word  # list of strs
-			word = words[0]  # str
-			defi = self.fixDefi(entry.defi, defiFormat)
-			# defi is str
+				b_words = entry.lb_word  # list of bytes
+				b_defi = self.getDefiBytes(entry, defiFormat)
 
-			for alt in words[1:]:
-				altIndexList.append((alt.encode("utf-8"), entryIndex))
+				for b_alt in b_words[1:]:
+					altIndexList.append((b_alt, entryIndex))
 
-			b_dictBlock = defi.encode("utf-8")
-			dictFile.write(b_dictBlock)
-			blockLen = len(b_dictBlock)
+				b_dictBlock = b_defi
+				dictFile.write(b_dictBlock)
+				blockLen = len(b_dictBlock)
 
-			b_idxBlock = word.encode("utf-8") + b"\x00" + \
-				uint32ToBytes(dictMark) + \
-				uint32ToBytes(blockLen)
-			idxFile.write(b_idxBlock)
+				b_idxBlock = b_words[0] + b"\x00" + \
+					uint32ToBytes(dictMark) + \
+					uint32ToBytes(blockLen)
+				idxFile.write(b_idxBlock)
 
-			dictMark += blockLen
-			indexFileSize += len(b_idxBlock)
+				dictMark += blockLen
+				indexFileSize += len(b_idxBlock)
 
-			wordCount += 1
+				wordCount += 1
 
 		dictFile.close()
 		idxFile.close()
@@ -603,6 +730,7 @@ class Writer(object):
 		Build StarDict dictionary in general case.
 		Every item definition may consist of an arbitrary number of articles.
 		sametypesequence option is not used.
+		(batch writer generator, see writeBatch)
 		"""
 		dictMark = 0
 		altIndexList = []  # list of tuples (b"alternate", entryIndex)
@@ -616,45 +744,45 @@ class Writer(object):
 		defiFormatCounter = Counter()
 		if not isdir(self._resDir):
 			os.mkdir(self._resDir)
+		resDedup = {}  # type: Dict[str, str]
 
 		entryIndex = -1
 		while True:
-			entry = yield
-			if entry is None:
+			entries = yield
+			if entries is None:
 				break
-			if entry.isData():
-				entry.save(self._resDir)
-				continue
-			entryIndex += 1
+			for entry in entries:
+				if entry.isData():
+					entry.save(self._resDir, dedup=resDedup)
+					continue
+				entryIndex += 1
 
-			entry.detectDefiFormat()  # call no more than once
-			defiFormat = entry.defiFormat
-			defiFormatCounter[defiFormat] += 1
-			if defiFormat not in ("m", "h", "x"):
-				log.error(f"invalid defiFormat={defiFormat}, using 'm'")
-				defiFormat = "m"
+				entry.detectDefiFormat()  # call no more than once
+				defiFormat = entry.defiFormat
+				defiFormatCounter[defiFormat] += 1
+				if defiFormat not in ("m", "h", "x"):
+					log.error(f"invalid defiFormat={defiFormat}, using 'm'")
+					defiFormat = "m"
 
-			words = entry.l_word  # list of strs
-			word = words[0]  # str
-			defi = self.fixDefi(entry.defi, defiFormat)
-			# defi is str
+				b_words = entry.lb_word  # list of bytes
+				b_defi = self.getDefiBytes(entry, defiFormat)
 
-			for alt in words[1:]:
-				altIndexList.append((alt.encode("utf-8"), entryIndex))
+				for b_alt in b_words[1:]:
+					altIndexList.append((b_alt, entryIndex))
 
-			b_dictBlock = (defiFormat + defi).encode("utf-8") + b"\x00"
-			dictFile.write(b_dictBlock)
-			blockLen = len(b_dictBlock)
+				b_dictBlock = defiFormat.encode("ascii") + b_defi + b"\x00"
+				dictFile.write(b_dictBlock)
+				blockLen = len(b_dictBlock)
 
-			b_idxBlock = word.encode("utf-8") + b"\x00" + \
-				uint32ToBytes(dictMark) + \
-				uint32ToBytes(blockLen)
-			idxFile.write(b_idxBlock)
+				b_idxBlock = b_words[0] + b"\x00" + \
+					uint32ToBytes(dictMark) + \
+					uint32ToBytes(blockLen)
+				idxFile.write(b_idxBlock)
 
-			dictMark += blockLen
-			indexFileSize += len(b_idxBlock)
+				dictMark += blockLen
+				indexFileSize += len(b_idxBlock)
 
-			wordCount += 1
+				wordCount += 1
 
 		dictFile.close()
 		idxFile.close()
@@ -1,8 +1,17 @@
+from os.path import join, dirname, abspath
+import sys
+import struct
+import tempfile
 import unittest
 import locale
 import random
 from functools import cmp_to_key
 
+rootDir = dirname(dirname(dirname(abspath(__file__))))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+
 
 def toBytes(s):
 	return bytes(s, "utf-8") if isinstance(s, str) else bytes(s)
@@ -199,5 +208,99 @@ class SortRandomTest(unittest.TestCase):
 			)
 
 
+def parseIdxSimple(idxBytes):
+	records = []
+	pos = 0
+	while pos < len(idxBytes):
+		end = idxBytes.find(b"\x00", pos)
+		if end < 0 or end + 9 > len(idxBytes):
+			break
+		offset, size = struct.unpack(">II", idxBytes[end + 1:end + 9])
+		records.append((idxBytes[pos:end], offset, size))
+		pos = end + 9
+	return records
+
+
+class ParseRecordsTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		from pyglossary.plugins import stardict
+		self.stardict = stardict
+		self.chunkSize = stardict.parseChunkSize
+
+	def tearDown(self):
+		self.stardict.parseChunkSize = self.chunkSize
+
+	def parse(self, idxBytes):
+		stardict = self.stardict
+		wordStarts, fields, ok = stardict.parseRecords(
+			idxBytes,
+			stardict.re_idxRecordSep,
+			8,
+		)
+		records = [
+			(
+				idxBytes[wordStarts[i]:wordStarts[i + 1] - 9],
+				fields[2 * i],
+				fields[2 * i + 1],
+			)
+			for i in range(len(wordStarts) - 1)
+		]
+		return records, ok
+
+	def test_chunks(self):
+		random.seed(1)
+		records = []
+		for index in range(500):
+			# fields have NUL bytes, and some words are longer than chunk
+			b_word = getRandomBytes(10, 5).replace(b"\x00", b"") * (
+				20 if index % 50 == 0 else 1
+			)
+			records.append((b_word, index * 256, index % 3))
+		idxBytes = b"".join(
+			b_word + b"\x00" + struct.pack(">II", offset, size)
+			for b_word, offset, size in records
+		)
+		self.assertEqual(parseIdxSimple(idxBytes), records)
+		for chunkSize in (1024 * 1024, 100, 13):
+			self.stardict.parseChunkSize = chunkSize
+			self.assertEqual(self.parse(idxBytes), (records, True), chunkSize)
+
+	def test_corrupted(self):
+		idxBytes = b"a\x00" + struct.pack(">II", 0, 5) + b"b\x00\x00\x00"
+		self.assertEqual(self.parse(idxBytes), ([(b"a", 0, 5)], False))
+		self.assertEqual(self.parse(b"abc"), ([], False))
+		self.assertEqual(self.parse(b""), ([], True))
+
+
+class ReaderTest(unittest.TestCase):
+	def test_synonyms(self):
+		Glossary.init()
+		tmpDir = tempfile.TemporaryDirectory()
+		self.addCleanup(tmpDir.cleanup)
+		inputFilename = join(tmpDir.name, "a.txt")
+		with open(inputFilename, "w", encoding="utf-8") as _file:
+			_file.write(
+				"b|b2|b1\tdefi b\n"
+				"a\tdefi a\n"
+				"c|c1\tdefi c\n"
+			)
+		glos = Glossary()
+		glos.convert(
+			inputFilename=inputFilename,
+			outputFilename=join(tmpDir.name, "a.ifo"),
+		)
+		glos = Glossary()
+		self.assertTrue(glos.read(join(tmpDir.name, "a.ifo")))
+		self.assertEqual(
+			[(entry.l_word, entry.defi) for entry in glos],
+			[
+				(["a"], "defi a"),
+				(["b", "b1", "b2"], "defi b"),
+				(["c", "c1"], "defi c"),
+			],
+		)
+
+
 if __name__ == "__main__":
 	unittest.main()
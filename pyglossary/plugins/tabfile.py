@@ -66,6 +66,7 @@ class Writer(object):
 		self._glos = glos
 		self._filename = None
 		self._file = None
+		self._resumed = False
 
 	def open(
 		self, 
@@ -73,8 +74,29 @@ class Writer(object):
 		fileObj: Optional["file"] = None,
 	):
 		self._filename = filename
+		if fileObj is None:
+			fileObj = open(filename, "w", encoding=self._encoding, newline="\n")
 		self._file = fileObj
 
+	def checkpoint(self) -> Dict[str, int]:
+		"""
+		checkpoint protocol (see pyglossary/checkpoint.py)
+		"""
+		self._file.flush()
+		return {"offset": self._file.tell()}
+
+	def resume(self, filename: str, state: Dict[str, int]) -> None:
+		offset = state["offset"]
+		if os.path.getsize(filename) < offset:
+			raise ValueError(
+				f"file {filename!r} is smaller than checkpoint offset {offset}"
+			)
+		self._filename = filename
+		self._file = open(filename, "r+", encoding=self._encoding, newline="\n")
+		self._file.seek(offset)
+		self._file.truncate()
+		self._resumed = True
+
 	def finish(self):
 		if self._file:
 			self._file.close()
@@ -85,6 +107,6 @@ class Writer(object):
 			self._filename,
 			fileObj=self._file,
 			encoding=self._encoding,
-			writeInfo=self._writeInfo,
+			writeInfo=self._writeInfo and not self._resumed,
 			resources=self._resources,
 		)
@@ -25,6 +25,13 @@ class Reader(object):
 		# iteration begins and __iter__ method is called
 		return self._wordCount
 
+	def sizeHint(self) -> SizeHint:
+		# optional, used instead of len(reader) for progressbar
+		# must be cheap, if counting entries is slow, return an estimated
+		# count (exact=False), or total size of input in bytes if your
+		# entries have byteProgress (see pyglossary/size_hint.py)
+		return SizeHint(count=self._wordCount, exact=True)
+
 	def open(self, filename) -> None:
 		# open the file, read headers / info and set info to self._glos
 		# and set self._wordCount if you can
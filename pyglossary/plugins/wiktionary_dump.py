@@ -85,6 +85,12 @@ class Reader(object):
 	def __len__(self):
 		return 0
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		return SizeHint(byteTotal=self._fileSize)
+
 	def _readPage(self) -> "lxml.etree.Element":
 		from lxml import etree as ET
 		pageEnd = self._readUntil(b"</page>")
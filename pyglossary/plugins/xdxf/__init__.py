@@ -106,24 +106,39 @@ class Reader(object):
 		self._glos = glos
 		self._filename = ""
 		self._file = None
+		# for a compressed file, that can be parsed only once, the parser
+		# of open() and the article it stopped at are kept for __iter__
+		self._context = None
+		self._firstArticle = None
 		self._encoding = "utf-8"
 		self._xdxf_to_html = None
 		self._re_span_k = re.compile(
 			'<span class="k">[^<>]*</span>(<br/>)?',
 		)
 
-	def open(self, filename: str, html: bool = True):
+	def open(
+		self,
+		filename: str,
+		html: bool = True,
+		fileObj: Optional["file"] = None,
+	):
+		"""
+		fileObj: binary file object of decompressed data of a compressed
+			file (see pyglossary/compression.py)
+		"""
 		# <!DOCTYPE xdxf SYSTEM "http://xdxf.sourceforge.net/xdxf_lousy.dtd">
 		from lxml import etree as ET
 		self._filename = filename
 		if self._html:
 			self._xdxf_to_html = xdxf_to_html_transformer()
 		context = ET.iterparse(
-			filename,
+			filename if fileObj is None else fileObj,
 			events=("end",),
 		)
 		for action, elem in context:
 			if elem.tag in ("meta_info", "ar", "k", "abr", "dtrn"):
+				if elem.tag == "ar":
+					self._firstArticle = elem
 				break
 			# every other tag before </meta_info> or </ar> is considered info
 			if not elem.text:
@@ -132,24 +147,53 @@ class Reader(object):
 			key = self.infoKeyMap.get(elem.tag, elem.tag)
 			self._glos.setInfo(key, elem.text)
 
+		self._glos.setDefaultDefiFormat("x")
+		if fileObj is not None:
+			self._context = context
+			self._file = fileObj
+			self._fileSize = fileObj.compressedSize
+			return
 		del context
+		self._firstArticle = None
 		self._fileSize = os.path.getsize(filename)
 		self._file = open(self._filename, mode="rb")
-		self._glos.setDefaultDefiFormat("x")
+
+	def _iterArticles(self) -> "Iterator[lxml.etree.Element]":
+		if self._context is None:
+			from lxml import etree as ET
+			context = ET.iterparse(
+				self._file,
+				events=("end",),
+				tag="ar",
+			)
+			for action, article in context:
+				yield article
+			return
+		if self._firstArticle is not None:
+			yield self._firstArticle
+			self._firstArticle = None
+		for action, elem in self._context:
+			if elem.tag == "ar":
+				yield elem
+
+	def _tell(self) -> int:
+		if self._context is not None:
+			return self._file.compressedTell()
+		return self._file.tell()
 
 	def __len__(self):
 		return 0
 
+	def sizeHint(self) -> SizeHint:
+		"""
+		size hint protocol (see pyglossary/size_hint.py)
+		"""
+		return SizeHint(byteTotal=self._fileSize)
+
 	def __iter__(self):
 		from lxml.etree import tostring
-		from lxml import etree as ET
 
-		context = ET.iterparse(
-			self._file,
-			events=("end",),
-			tag="ar",
-		)
-		for action, article in context:
+		for article in self._iterArticles():
 			article.tail = None
 			words = [toStr(w) for w in self.titles(article)]
 			defi = tostring(article, encoding=self._encoding)
@@ -167,7 +211,7 @@ class Reader(object):
 				words,
 				defi,
 				defiFormat=defiFormat,
-				byteProgress=(self._file.tell(), self._fileSize),
+				byteProgress=(self._tell(), self._fileSize),
 			)
 			# clean up preceding siblings to save memory
 			# this reduces memory usage from ~64 MB to ~30 MB
@@ -178,6 +222,8 @@ class Reader(object):
 		if self._file:
 			self._file.close()
 			self._file = None
+		self._context = None
+		self._firstArticle = None
 
 	def read_metadata_old(self):
 		full_name = self._xdxf.find("full_name").text
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+from time import perf_counter as now
+from collections import OrderedDict as odict
+
+from typing import (
+	Dict,
+	Any,
+	Iterator,
+	Optional,
+)
+
+from .entry_base import BaseEntry
+
+import logging
+log = logging.getLogger("root")
+
+
+def entrySize(entry: BaseEntry) -> int:
+	if entry.isData():
+		return entry.size()
+	return len(entry.b_word) + len(entry.b_defi)
+
+
+class StageStats(object):
+	__slots__ = [
+		"name",
+		"time",
+		"calls",
+		"entries",
+		"bytes",
+	]
+
+	def __init__(self, name: str) -> None:
+		self.name = name
+		self.time = 0.0  # exclusive time, in seconds
+		self.calls = 0
+		self.entries = 0
+		self.bytes = 0
+
+	def toDict(self) -> Dict[str, Any]:
+		time = self.time
+		return odict([
+			("name", self.name),
+			("time", round(time, 6)),
+			("calls", self.calls),
+			("entries", self.entries),
+			("bytes", self.bytes),
+			("entries_per_sec", round(self.entries / time, 1) if time else 0),
+			("bytes_per_sec", round(self.bytes / time, 1) if time else 0),
+		])
+
+
+class StageProfiler(object):
+	"""
+		collects time spent in each stage of conversion
+		(reading, entry filters, sorting, writing)
+
+		stages can be nested (for example a generator that pulls entries
+		from another one), time of each stage is exclusive: while an inner
+		stage is running, time of outer stage is not counted
+	"""
+
+	def __init__(self) -> None:
+		self._stats = odict()  # type: Dict[str, StageStats]
+		self._stack = []
+		self._lastTime = 0.0
+		self._startTime = now()
+
+	def _get(self, name: str) -> StageStats:
+		stats = self._stats.get(name)
+		if stats is None:
+			stats = self._stats[name] = StageStats(name)
+		return stats
+
+	def enter(self, name: str) -> None:
+		t = now()
+		if self._stack:
+			self._stack[-1].time += t - self._lastTime
+		stats = self._get(name)
+		stats.calls += 1
+		self._stack.append(stats)
+		self._lastTime = t
+
+	def exit(self, entries: int = 0, _bytes: int = 0) -> None:
+		t = now()
+		stats = self._stack.pop()
+		stats.time += t - self._lastTime
+		stats.entries += entries
+		stats.bytes += _bytes
+		self._lastTime = t
+
+	def wrapGen(
+		self,
+		name: str,
+		gen: Iterator[Optional[BaseEntry]],
+		countBytes: bool = False,
+	) -> Iterator[Optional[BaseEntry]]:
+		"""
+			counts time spent in `next(gen)` as stage `name`
+		"""
+		it = iter(gen)
+		while True:
+			self.enter(name)
+			try:
+				entry = next(it)
+			except StopIteration:
+				self.exit()
+				return
+			except BaseException:
+				self.exit()
+				raise
+			if entry is None:
+				self.exit()
+			elif countBytes:
+				self.exit(1, entrySize(entry))
+			else:
+				self.exit(1)
+			yield entry
+
+	def toDict(self) -> Dict[str, Any]:
+		total = now() - self._startTime
+		stages = [stats.toDict() for stats in self._stats.values()]
+		other = total - sum(stats.time for stats in self._stats.values())
+		return odict([
+			("total_time", round(total, 6)),
+			("other_time", round(other, 6)),
+			("stages", stages),
+		])
+
+	def report(self) -> str:
+		data = self.toDict()
+		total = data["total_time"]
+		nameWidth = max(
+			[len("Stage"), len("other")] +
+			[len(stage["name"]) for stage in data["stages"]]
+		)
+		lines = [
+			f"{'Stage':<{nameWidth}}  {'Time (s)':>9}  {'%':>5}  "
+			f"{'Calls':>9}  {'Entries/s':>10}  {'KB/s':>10}",
+		]
+
+		def percent(time: float) -> float:
+			return 100 * time / total if total else 0
+
+		for stage in data["stages"]:
+			lines.append(
+				f"{stage['name']:<{nameWidth}}  {stage['time']:>9.3f}  "
+				f"{percent(stage['time']):>5.1f}  {stage['calls']:>9}  "
+				f"{stage['entries_per_sec']:>10.0f}  "
+				f"{stage['bytes_per_sec'] / 1024:>10.1f}"
+			)
+		other = data["other_time"]
+		lines.append(
+			f"{'other':<{nameWidth}}  {other:>9.3f}  {percent(other):>5.1f}"
+		)
+		lines.append(f"{'total':<{nameWidth}}  {total:>9.3f}")
+		return "\n".join(lines)
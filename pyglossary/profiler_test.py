@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import dirname, abspath
+import sys
+import time
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.profiler import StageProfiler
+from pyglossary.entry import Entry
+
+
+class StageProfilerTest(unittest.TestCase):
+	def test_nested_exclusive(self):
+		profiler = StageProfiler()
+
+		def innerGen():
+			for word in ("a", "b", None, "c"):
+				time.sleep(0.01)
+				yield Entry(word, "defi") if word else None
+
+		def outerGen():
+			for entry in profiler.wrapGen("inner", innerGen(), countBytes=True):
+				time.sleep(0.02)
+				yield entry
+
+		entries = list(profiler.wrapGen("outer", outerGen()))
+		self.assertEqual(len(entries), 4)
+
+		data = profiler.toDict()
+		stages = {stage["name"]: stage for stage in data["stages"]}
+		self.assertEqual(list(stages), ["outer", "inner"])
+
+		inner = stages["inner"]
+		self.assertEqual(inner["calls"], 5)
+		self.assertEqual(inner["entries"], 3)
+		self.assertEqual(inner["bytes"], 3 * len("a" + "defi"))
+		self.assertGreaterEqual(inner["time"], 0.04)
+		self.assertLess(inner["time"], 0.07)
+
+		outer = stages["outer"]
+		self.assertEqual(outer["entries"], 3)
+		self.assertGreaterEqual(outer["time"], 0.08)
+		self.assertLess(outer["time"], 0.11)
+
+		self.assertIn("inner", profiler.report())
+
+
+if __name__ == "__main__":
+	unittest.main()
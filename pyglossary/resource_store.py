@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+content-addressed store of resource files (data entries), used in
+indirect mode instead of writing each resource into its own temp file
+
+files are named by sha256 of their content, so a resource that appears
+under several file names (which is common in MDD, BGL and Slob inputs)
+is written only once, and data entries with the same content have the
+same content hash (see DataEntry.contentHash), which writers can use
+to write it once and link (or alias) the other file names to it
+"""
+
+import os
+from os.path import join, isfile, dirname, basename
+import shutil
+import tempfile
+from hashlib import sha256
+from typing import Optional, Tuple
+
+import logging
+log = logging.getLogger("root")
+
+
+class ResourceStore(object):
+	def __init__(self, parentDir: str, prefix: str = "") -> None:
+		"""
+		a new temporary directory is created in `parentDir`
+		when the first file is added
+		"""
+		self._parentDir = parentDir
+		self._prefix = prefix
+		self._dir = ""
+		self._addCount = 0
+		self._fileCount = 0
+
+	def add(self, data: bytes) -> Tuple[str, str]:
+		"""
+		returns (contentHash, path) of the file that contains `data`
+		"""
+		if not self._dir:
+			os.makedirs(self._parentDir, exist_ok=True)
+			self._dir = tempfile.mkdtemp(
+				prefix=self._prefix + "_store_",
+				dir=self._parentDir,
+			)
+		digest = sha256(data).hexdigest()
+		path = join(self._dir, digest[:2], digest)
+		self._addCount += 1
+		if not isfile(path):
+			os.makedirs(dirname(path), exist_ok=True)
+			with open(path, "wb") as _file:
+				_file.write(data)
+			self._fileCount += 1
+		return digest, path
+
+	def contentHash(self, path: str) -> Optional[str]:
+		"""
+		returns content hash of file `path` if it's in the store,
+		or None otherwise
+		"""
+		if not self._dir or dirname(dirname(path)) != self._dir:
+			return None
+		return basename(path)
+
+	def close(self) -> None:
+		"""
+		removes the directory of store
+		"""
+		if not self._dir:
+			return
+		if self._addCount > self._fileCount:
+			log.info(
+				f"Resource store: {self._addCount} resources"
+				f", {self._fileCount} unique"
+			)
+		shutil.rmtree(self._dir, ignore_errors=True)
+		self._dir = ""
+		self._addCount = 0
+		self._fileCount = 0
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath, isdir, isfile
+import os
+import sys
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.glossary import Glossary
+from pyglossary.entry import DataEntry
+from pyglossary.resource_store import ResourceStore
+
+
+class ResourceStoreTest(unittest.TestCase):
+	def setUp(self):
+		Glossary.init()
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.dir = self.tmpDir.name
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def readFile(self, path):
+		with open(path, "rb") as _file:
+			return _file.read()
+
+	def test_add(self):
+		store = ResourceStore(join(self.dir, "cache"), prefix="test")
+		self.assertFalse(isdir(join(self.dir, "cache")))
+		digest1, path1 = store.add(b"abc")
+		digest2, path2 = store.add(b"def")
+		digest3, path3 = store.add(b"abc")
+		self.assertEqual(digest1, digest3)
+		self.assertEqual(path1, path3)
+		self.assertNotEqual(digest1, digest2)
+		self.assertEqual(self.readFile(path1), b"abc")
+		self.assertEqual(self.readFile(path2), b"def")
+		self.assertEqual(store.contentHash(path1), digest1)
+		self.assertEqual(store.contentHash(path2), digest2)
+		self.assertIsNone(store.contentHash(join(self.dir, "abc")))
+		store.close()
+		self.assertFalse(isfile(path1))
+		self.assertEqual(os.listdir(join(self.dir, "cache")), [])
+
+	def test_save_dedup(self):
+		outDir = join(self.dir, "out")
+		dedup = {}
+		entry1 = DataEntry("a.png", b"abc")
+		entry2 = DataEntry("b/c.png", b"abc")
+		entry3 = DataEntry("d.png", b"def")
+		path1 = entry1.save(outDir, dedup=dedup)
+		path2 = entry2.save(outDir, dedup=dedup)
+		path3 = entry3.save(outDir, dedup=dedup)
+		self.assertEqual(len(dedup), 2)
+		self.assertEqual(self.readFile(path2), b"abc")
+		self.assertTrue(os.path.samefile(path1, path2))
+		self.assertFalse(os.path.samefile(path1, path3))
+
+	def test_glossary_dedup(self):
+		glos = Glossary()
+		for index in range(3):
+			glos.addEntryObj(glos.newEntry(f"word{index}", "defi"))
+			glos.addEntryObj(glos.newDataEntry(f"img{index}.png", b"image"))
+		glos.addEntryObj(glos.newDataEntry("other.png", b"other"))
+		store = glos._resourceStore
+		self.assertEqual(store._addCount, 4)
+		self.assertEqual(store._fileCount, 2)
+		filename = join(self.dir, "out", "test.ifo")
+		os.makedirs(dirname(filename))
+		self.assertTrue(glos.write(filename, format="Stardict"))
+		resDir = join(self.dir, "out", "res")
+		paths = [join(resDir, f"img{index}.png") for index in range(3)]
+		for path in paths:
+			self.assertEqual(self.readFile(path), b"image")
+		self.assertTrue(os.path.samefile(paths[0], paths[1]))
+		self.assertTrue(os.path.samefile(paths[0], paths[2]))
+		self.assertEqual(self.readFile(join(resDir, "other.png")), b"other")
+		glos.clear()
+		self.assertIsNone(glos._resourceStore)
+		self.assertEqual(self.readFile(paths[0]), b"image")
+
+
+if __name__ == "__main__":
+	unittest.main()
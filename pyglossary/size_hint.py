@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2020 Saeed Rasooli <saeed.gnu@gmail.com> (ilius)
+# This file is part of PyGlossary project, https://github.com/ilius/pyglossary
+#
+# This program is a free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. Or on Debian systems, from /usr/share/common-licenses/GPL
+# If not, see <http://www.gnu.org/licenses/gpl.txt>.
+
+"""
+size hint protocol, for progress and ETA of reading entries, without
+reading the whole input before converting it
+
+a Reader can (optionally) have a method:
+	sizeHint() -> SizeHint
+which must be cheap (not counting entries of the whole input), and is used
+instead of len(reader), which may be slow (like counting lines of a file)
+or return 0 if the number of entries is not known
+
+if a reader gives byteTotal, its entries should have byteProgress
+(see BaseEntry.byteProgress)
+"""
+
+from typing import Any
+
+import logging
+log = logging.getLogger("root")
+
+
+class SizeHint(object):
+	__slots__ = [
+		"count",
+		"exact",
+		"byteTotal",
+	]
+
+	def __init__(
+		self,
+		count: int = 0,
+		exact: bool = False,
+		byteTotal: int = 0,
+	) -> None:
+		"""
+		count: number of entries (including data entries), 0 if not known
+		exact: True if count is exact, False if it's estimated
+		byteTotal: total size of input in bytes, 0 if not known
+		"""
+		self.count = count
+		self.exact = exact
+		self.byteTotal = byteTotal
+
+	def __repr__(self) -> str:
+		return (
+			f"SizeHint(count={self.count!r}, exact={self.exact!r}"
+			f", byteTotal={self.byteTotal!r})"
+		)
+
+	def progressTotal(self) -> int:
+		"""
+		returns total number of entries that progress of reading should
+		be based on, or 0 if it should be based on byteProgress of entries
+		"""
+		if self.exact or not self.byteTotal:
+			return self.count
+		return 0
+
+
+def readerSizeHint(reader: Any) -> SizeHint:
+	"""
+	returns size hint of reader, falls back to len(reader) for readers
+	that do not support the size hint protocol
+	"""
+	sizeHint = getattr(reader, "sizeHint", None)
+	if sizeHint is not None:
+		try:
+			return sizeHint()
+		except Exception:
+			log.exception("")
+			return SizeHint()
+	try:
+		count = len(reader)
+	except Exception:
+		log.exception("")
+		return SizeHint()
+	return SizeHint(count=count, exact=count > 0)
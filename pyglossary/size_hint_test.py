@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import join, dirname, abspath
+import re
+import sys
+import logging
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary.size_hint import SizeHint, readerSizeHint
+from pyglossary.file_utils import fileEstimateCount
+from pyglossary.glossary import Glossary
+
+
+class LenReader(object):
+	def __init__(self, count):
+		self._count = count
+
+	def __len__(self):
+		if self._count < 0:
+			raise NotImplementedError
+		return self._count
+
+
+class HintReader(LenReader):
+	def sizeHint(self):
+		return SizeHint(byteTotal=1000)
+
+
+class MockUI(object):
+	def __init__(self):
+		self.pref = {}
+		self.texts = []
+
+	def progressInit(self, title):
+		pass
+
+	def progress(self, rat, text=""):
+		self.texts.append(text)
+
+	def progressEnd(self):
+		pass
+
+
+class SizeHintTest(unittest.TestCase):
+	def test_progressTotal(self):
+		self.assertEqual(SizeHint(count=10, exact=True).progressTotal(), 10)
+		self.assertEqual(SizeHint(count=10).progressTotal(), 10)
+		self.assertEqual(SizeHint(count=10, byteTotal=99).progressTotal(), 0)
+		self.assertEqual(
+			SizeHint(count=10, exact=True, byteTotal=99).progressTotal(),
+			10,
+		)
+
+	def test_readerSizeHint(self):
+		logging.getLogger("root").disabled = True
+		try:
+			hint = readerSizeHint(LenReader(-1))
+		finally:
+			logging.getLogger("root").disabled = False
+		self.assertEqual(repr(hint), repr(SizeHint()))
+		hint = readerSizeHint(LenReader(5))
+		self.assertEqual((hint.count, hint.exact), (5, True))
+		hint = readerSizeHint(LenReader(0))
+		self.assertEqual((hint.count, hint.exact), (0, False))
+		hint = readerSizeHint(HintReader(5))
+		self.assertEqual((hint.count, hint.byteTotal), (0, 1000))
+
+
+class FileEstimateCountTest(unittest.TestCase):
+	def setUp(self):
+		self.tmpDir = tempfile.TemporaryDirectory()
+		self.path = join(self.tmpDir.name, "test.txt")
+		with open(self.path, "w", encoding="utf-8") as _file:
+			for index in range(1000):
+				_file.write(f"word{index:04d}\tdefinition\n")
+
+	def tearDown(self):
+		self.tmpDir.cleanup()
+
+	def test_exact(self):
+		self.assertEqual(fileEstimateCount(self.path, re.compile("\n")), 1000)
+
+	def test_sample(self):
+		count = fileEstimateCount(self.path, re.compile("\n"), sampleSize=1000)
+		self.assertEqual(count, 1000)
+		count = fileEstimateCount(
+			self.path,
+			re.compile("^word0", re.M),
+			sampleSize=5000,
+		)
+		self.assertEqual(count, 1000)
+
+
+class GlossarySizeHintTest(unittest.TestCase):
+	def test_csv_progress(self):
+		Glossary.init()
+		with tempfile.TemporaryDirectory() as tmpDir:
+			inputPath = join(tmpDir, "in.csv")
+			with open(inputPath, "w", encoding="utf-8") as _file:
+				for index in range(2000):
+					_file.write(f"word{index},definition {index}\n")
+			ui = MockUI()
+			glos = Glossary(ui=ui)
+			self.assertTrue(glos.convert(
+				inputFilename=inputPath,
+				outputFilename=join(tmpDir, "out.txt"),
+				outputFormat="Tabfile",
+				direct=True,
+			))
+		self.assertTrue(ui.texts)
+		for text in ui.texts:
+			self.assertRegex(text, r"^\d+ / ~2000 entries, \d+ entries/s$")
+
+
+if __name__ == "__main__":
+	unittest.main()
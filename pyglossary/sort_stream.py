@@ -1,18 +1,26 @@
 # -*- coding: utf-8 -*-
 
-from heapq import heappush, heappop
+import os
+from os.path import join
+import shutil
+from tempfile import mkdtemp
+from operator import itemgetter
+from pickle import (
+	Pickler,
+	Unpickler,
+	HIGHEST_PROTOCOL,
+)
+
 from heapq import merge
 
 from typing import (
 	TypeVar,
-	#Dict,
-	#Tuple,
+	Tuple,
 	List,
-	Sequence,
 	Any,
-	Optional,
 	Iterator,
 	Callable,
+	Optional,
 )
 
 
@@ -23,97 +31,122 @@ log = logging.getLogger("root")
 T = TypeVar("T")
 
 
-def hsortStream(
-	stream: Iterator[T],
-	maxHeapSize: int,
-	key: Optional[Callable[[T], Any]] = None,
-) -> Iterator[T]:
-	"""
-		stream: a generator or iterable
-		maxHeapSize: int, maximum size of heap
-		key: a key function, as in `list.sort` method, or `sorted` function
-			if key is None, we consume less memory
-
-		the sort is Stable (unlike normal heapsort) because we include the
-			index (after item / output of key function)
-	"""
-	hp = []
-	if key:
-		for index, item in enumerate(stream):
-			if len(hp) >= maxHeapSize:
-				yield heappop(hp)[2]
-			heappush(hp, (
-				key(item),  # for sorting order
-				index,  # for sort being Stable
-				item,  # for fetching result
-			))
-		while hp:
-			yield heappop(hp)[2]
-	else:  # consume less memory
-		for index, item in enumerate(stream):
-			if len(hp) >= maxHeapSize:
-				yield heappop(hp)[0]
-			heappush(hp, (
-				item,  # for sorting order, and fetching result
-				index,  # for sort being Stable
-			))
-		while hp:
-			yield heappop(hp)[0]
-
-
-def hsortStreamList(
-	streams: Sequence[Iterator[T]],
-	*args,
-	**kwargs
-) -> Iterator[T]:
-	streams = [
-		hsortStream(stream, *args, **kwargs)
-		for stream in streams
-	]
-	return merge(*tuple(streams))
-
-
-def stdinIntegerStream():
-	while True:
-		line = input(" Input item: ")
-		if not line:
-			break
-		yield int(line)
+# number of items pickled together in a run file, also the number of items
+# that are kept in memory for each run while merging
+runChunkSize = 1024
 
+# maximum number of run files that are opened and merged at once
+# if there are more runs, they are merged in multiple passes
+maxMergeRuns = 256
 
-def stdinStringStream():
-	while True:
-		line = raw_input(" Input item: ")
-		if not line:
-			break
-		yield line
+# number of items between calls of memoryCheck, see sortStreamExternal
+memoryCheckInterval = 1024
 
 
-def randomChoiceGenerator(choices, count):
-	import random
-	for _ in range(count):
-		yield random.choice(choices)
-
-
-def test_hsortStreamList(count=10):
-	for item in hsortStreamList(
-		[
-			randomChoiceGenerator(range(0, 50), count),
-			randomChoiceGenerator(range(30, 50), count),
-			randomChoiceGenerator(range(10, 40), count),
-		],
-		maxHeapSize=5,
-		key=None,
-	):
-		print(item)
-
-
-def main():
-	test_hsortStreamList()
-#	stream = stdinIntegerStream()
-#	for line in hsortStream(stream, 3):
-#		print(f"------ Placed item: {line}")
-
-
-if __name__ == "__main__":
-	main()
+class _RunFile(object):
+	"""
+		a sorted run of (key, item) pairs spilled to disk
+	"""
+	def __init__(self, path: str) -> None:
+		self.path = path
+
+	def dump(self, pairs: Iterator[Tuple[Any, T]]) -> None:
+		with open(self.path, "wb") as _file:
+			pickler = Pickler(_file, protocol=HIGHEST_PROTOCOL)
+			chunk = []
+			for pair in pairs:
+				chunk.append(pair)
+				if len(chunk) >= runChunkSize:
+					pickler.dump(chunk)
+					chunk = []
+			if chunk:
+				pickler.dump(chunk)
+
+	def __iter__(self) -> Iterator[Tuple[Any, T]]:
+		with open(self.path, "rb") as _file:
+			unpickler = Unpickler(_file)
+			while True:
+				try:
+					chunk = unpickler.load()
+				except EOFError:
+					break
+				yield from chunk
+		os.remove(self.path)
+
+
+def _mergeRuns(runs: List[Iterator[Tuple[Any, T]]]) -> Iterator[Tuple[Any, T]]:
+	# heapq.merge is stable, so for equal keys the items of the older
+	# run (which came first in the input stream) are yielded first
+	return merge(*runs, key=itemgetter(0))
+
+
+def sortStreamExternal(
+	stream: Iterator[Tuple[Any, T]],
+	runSize: int,
+	tmpDir: str,
+	memoryCheck: Optional[Callable[[int], bool]] = None,
+) -> Iterator[T]:
+	"""
+		stream: a generator or iterable of (key, item) pairs
+			both key and item must be picklable
+		runSize: int, maximum number of items kept in memory
+		tmpDir: directory to create a temporary directory in, for run files
+		memoryCheck: called with number of items in memory, every
+			memoryCheckInterval items, if it returns True, the items are
+			spilled as a sorted run, and runSize is reduced to their number
+			(see MemoryBudget.shouldSpill)
+
+		yields items sorted by key, without loading the whole stream
+		into memory. up to `runSize` pairs are sorted in memory and spilled
+		to a temporary file as a sorted run, then the runs are merged.
+
+		the sort is Stable, like `list.sort`
+	"""
+	if runSize < 1:
+		raise ValueError(f"invalid runSize={runSize}")
+
+	runDir = ""
+	runs = []  # type: List[_RunFile]
+	pairs = []  # type: List[Tuple[Any, T]]
+	try:
+		for pair in stream:
+			pairs.append(pair)
+			if len(pairs) < runSize:
+				if memoryCheck is None or len(pairs) % memoryCheckInterval:
+					continue
+				if not memoryCheck(len(pairs)):
+					continue
+				runSize = len(pairs)
+				memoryCheck = None
+			pairs.sort(key=itemgetter(0))
+			if not runDir:
+				os.makedirs(tmpDir, exist_ok=True)
+				runDir = mkdtemp(prefix="sort_", dir=tmpDir)
+				log.debug(f"Spilling sorted runs to {runDir}")
+			run = _RunFile(join(runDir, str(len(runs))))
+			run.dump(pairs)
+			runs.append(run)
+			pairs = []
+
+		pairs.sort(key=itemgetter(0))
+		if not runs:
+			for _, item in pairs:
+				yield item
+			return
+
+		log.info(f"Merging {len(runs) + 1} sorted runs")
+		# the last run (in memory) comes last in the stream, so it must be
+		# the last one in merge, for the sort to be stable
+		while len(runs) + 1 > maxMergeRuns:
+			newRuns = []
+			for start in range(0, len(runs), maxMergeRuns):
+				run = _RunFile(join(runDir, f"m{len(runs)}_{start}"))
+				run.dump(_mergeRuns(runs[start:start + maxMergeRuns]))
+				newRuns.append(run)
+			runs = newRuns
+
+		for _, item in _mergeRuns(runs + [pairs]):
+			yield item
+	finally:
+		if runDir:
+			shutil.rmtree(runDir, ignore_errors=True)
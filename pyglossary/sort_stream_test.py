@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os.path import dirname, abspath
+import os
+import sys
+import random
+import tempfile
+import unittest
+
+rootDir = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, rootDir)
+
+from pyglossary import sort_stream
+from pyglossary.sort_stream import sortStreamExternal
+
+
+class SortStreamExternalTest(unittest.TestCase):
+	def setUp(self):
+		self.tmpDir = tempfile.mkdtemp()
+
+	def tearDown(self):
+		os.rmdir(self.tmpDir)
+
+	def case(self, items, runSize, key=None):
+		if key is None:
+			key = lambda x: x
+		expected = sorted(items, key=key)
+		actual = list(sortStreamExternal(
+			((key(item), item) for item in items),
+			runSize,
+			self.tmpDir,
+		))
+		self.assertEqual(actual, expected)
+		# run files must be removed
+		self.assertEqual(os.listdir(self.tmpDir), [])
+
+	def test_empty(self):
+		self.case([], 10)
+
+	def test_in_memory(self):
+		self.case([5, 3, 9, 1, 1, 0], 10)
+
+	def test_spill(self):
+		random.seed(0)
+		items = [random.randint(0, 1000) for _ in range(5000)]
+		self.case(items, 100)
+		self.case(items, 1)
+		self.case(items, 4999)
+		self.case(items, 5000)
+
+	def test_not_nearly_sorted(self):
+		items = list(range(3000, 0, -1))
+		self.case(items, 7)
+
+	def test_stable(self):
+		random.seed(1)
+		items = [
+			(random.choice("abcde"), index)
+			for index in range(3000)
+		]
+		self.case(items, 50, key=lambda x: x[0])
+
+	def test_multi_pass_merge(self):
+		maxMergeRuns = sort_stream.maxMergeRuns
+		sort_stream.maxMergeRuns = 4
+		try:
+			random.seed(2)
+			items = [
+				(random.randint(0, 100), index)
+				for index in range(2000)
+			]
+			self.case(items, 30, key=lambda x: x[0])
+		finally:
+			sort_stream.maxMergeRuns = maxMergeRuns
+
+	def test_memoryCheck(self):
+		random.seed(3)
+		items = [
+			(random.randint(0, 100), index)
+			for index in range(10000)
+		]
+		counts = []
+
+		def memoryCheck(count):
+			counts.append(count)
+			return count >= 3000
+
+		expected = sorted(items, key=lambda x: x[0])
+		actual = list(sortStreamExternal(
+			((item[0], item) for item in items),
+			100000,
+			self.tmpDir,
+			memoryCheck=memoryCheck,
+		))
+		self.assertEqual(actual, expected)
+		self.assertEqual(counts, [1024, 2048, 3072])
+		self.assertEqual(os.listdir(self.tmpDir), [])
+
+	def test_invalid_runSize(self):
+		with self.assertRaises(ValueError):
+			list(sortStreamExternal(iter([]), 0, self.tmpDir))
+
+
+if __name__ == "__main__":
+	unittest.main()
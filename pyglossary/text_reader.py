@@ -1,13 +1,24 @@
 from pyglossary.file_utils import fileCountLines
 from pyglossary.entry_base import BaseEntry
 from pyglossary.entry import Entry
+from pyglossary.size_hint import SizeHint
 
 from pyglossary.glossary_type import GlossaryType
+from pyglossary.compression import (
+	inputCompressionExts,
+	detectCompression,
+	openDecompressed,
+)
 
 import os
 from os.path import isfile
+from io import TextIOWrapper
 from typing import (
 	Tuple,
+	List,
+	Dict,
+	Any,
+	Optional,
 	Iterator,
 )
 
@@ -18,10 +29,15 @@ log = logging.getLogger("root")
 class TextGlossaryReader(object):
 	_encoding = "utf-8"
 
+	# text is decoded strictly, see FixUnicodeFilter
+	validUtf8 = True
+
 	def __init__(self, glos: GlossaryType, hasInfo: bool = True):
 		self._glos = glos
 		self._filename = ""
 		self._file = None
+		# DecompressedFile that self._file reads, if file is compressed
+		self._compressedFile = None
 		self._hasInfo = hasInfo
 		self._pendingEntries = []
 		self._wordCount = 0
@@ -38,25 +54,50 @@ class TextGlossaryReader(object):
 			return line
 		return self._file.readline()
 
-	def open(self, filename: str) -> None:
+	def _openFile(self, filename: str, fileObj: Optional["file"]) -> None:
+		"""
+		fileObj: binary file object of decompressed data of a compressed
+			file (see pyglossary/compression.py), or None
+		"""
+		if fileObj is None:
+			self._file = open(filename, "r", encoding=self._encoding)
+			return
+		self._compressedFile = fileObj
+		self._file = TextIOWrapper(fileObj, encoding=self._encoding)
+
+	def open(
+		self,
+		filename: str,
+		fileObj: Optional["file"] = None,
+	) -> None:
 		self._filename = filename
-		self._file = open(filename, "r", encoding=self._encoding)
+		self._openFile(filename, fileObj)
 		if self._hasInfo:
 			self.loadInfo()
 		if not self._wordCount:
-			self._fileSize = os.path.getsize(filename)
+			if fileObj is None:
+				self._fileSize = os.path.getsize(filename)
+			else:
+				self._fileSize = fileObj.compressedSize
 			log.debug(f"File size of {filename}: {self._fileSize}")
 
 	def openNextFile(self) -> bool:
 		self.close()
 		nextFilename = f"{self._filename}.{self._fileIndex + 1}"
+		fileObj = None
 		if not isfile(nextFilename):
-			# TODO: detect compressed file, like file.txt.1.gz
-			log.warn(f"WARNING: next file not found: {nextFilename}")
-			return False
+			# compressed file, like file.txt.1.gz
+			for ext in inputCompressionExts:
+				compression = detectCompression(f"{nextFilename}.{ext}")
+				if compression:
+					fileObj = openDecompressed(f"{nextFilename}.{ext}", compression)
+					break
+			else:
+				log.warn(f"WARNING: next file not found: {nextFilename}")
+				return False
 		self._fileIndex += 1
 		log.info(f"Reading next file: {nextFilename}")
-		self._file = open(nextFilename, "r", encoding=self._encoding)
+		self._openFile(nextFilename, fileObj)
 		if self._hasInfo:
 			self.loadInfo()
 		return True
@@ -69,11 +110,15 @@ class TextGlossaryReader(object):
 		except Exception:
 			log.exception(f"error while closing file {self._filename!r}")
 		self._file = None
+		self._compressedFile = None
 
 	def newEntry(self, word, defi) -> "BaseEntry":
 		byteProgress = None
 		if self._fileSize:
-			byteProgress = (self._file.tell(), self._fileSize)
+			if self._compressedFile is not None:
+				byteProgress = (self._compressedFile.compressedTell(), self._fileSize)
+			else:
+				byteProgress = (self._file.tell(), self._fileSize)
 		return Entry(
 			word,
 			defi,
@@ -133,9 +178,89 @@ class TextGlossaryReader(object):
 		###
 		return self.newEntry(word, defi)
 
+	def readBatches(self, batchSize: int) -> Iterator[List[BaseEntry]]:
+		"""
+			batch protocol (see pyglossary/entry_batch.py)
+			only the last entry of each batch has byteProgress, because
+			calling tell() on a text file is slow
+		"""
+		nextPair = self.nextPair
+		batch = []
+		while True:
+			if self._pendingEntries:
+				self._pos += len(self._pendingEntries)
+				batch += self._pendingEntries
+				self._pendingEntries = []
+			self._pos += 1
+			try:
+				wordDefi = nextPair()
+			except StopIteration:
+				if self._fileIndex < self._fileCount - 1:
+					if self.openNextFile():
+						continue
+				self._wordCount = self._pos
+				break
+			if not wordDefi:
+				continue
+			if len(batch) + 1 < batchSize:
+				batch.append(Entry(wordDefi[0], wordDefi[1]))
+				continue
+			batch.append(self.newEntry(wordDefi[0], wordDefi[1]))
+			yield batch
+			batch = []
+		if batch:
+			yield batch
+
+	def seekable(self) -> bool:
+		"""
+			checkpoint protocol (see pyglossary/checkpoint.py)
+			a compressed file can not seek
+		"""
+		return self._compressedFile is None
+
+	def tell(self) -> Optional[Dict[str, Any]]:
+		"""
+			checkpoint protocol (see pyglossary/checkpoint.py)
+			returns None while there are pending entries (after loadInfo)
+			or reading a compressed file, which can not seek
+		"""
+		if self._pendingEntries or not self._file:
+			return None
+		if self._compressedFile is not None:
+			return None
+		return {
+			"fileIndex": self._fileIndex,
+			"offset": self._file.tell(),
+			"bufferLine": self._bufferLine,
+			"pos": self._pos,
+		}
+
+	def seek(self, position: Dict[str, Any]) -> None:
+		fileIndex = position["fileIndex"]
+		if fileIndex != self._fileIndex:
+			self.close()
+			self._fileIndex = fileIndex
+			self._file = open(
+				f"{self._filename}.{fileIndex}",
+				"r",
+				encoding=self._encoding,
+			)
+		self._file.seek(position["offset"])
+		self._bufferLine = position["bufferLine"]
+		self._pendingEntries = []
+		self._pos = position["pos"]
+
 	def __len__(self) -> int:
 		return self._wordCount
 
+	def sizeHint(self) -> SizeHint:
+		"""
+			size hint protocol (see pyglossary/size_hint.py)
+		"""
+		if self._wordCount:
+			return SizeHint(count=self._wordCount, exact=True)
+		return SizeHint(byteTotal=self._fileSize)
+
 	def __iter__(self) -> Iterator[BaseEntry]:
 		return self
 
@@ -53,7 +53,21 @@ class UIBase(object):
 		"remove_html_all",
 		"normalize_html",
 		"enable_alts",
+		"link_resources",
 		"save_info_json",
+		"filter_workers",
+		"filter_batch_size",
+		"batch_size",
+		"pipeline_threads",
+		"pipeline_queue_size",
+		"conversion_cache_max_size",
+		"conversion_cache_max_age",
+		"checkpoint_interval",
+		"memory_limit",
+		"entry_compress",
+		"entry_compress_level",
+		"entry_block_size",
+		"gzip_threads",
 		## Reverse Options:
 		"reverse_matchWord",
 		"reverse_showRel",
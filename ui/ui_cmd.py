@@ -223,7 +223,12 @@ class UI(UIBase):
 		readOptions=None,
 		writeOptions=None,
 		convertOptions=None,
+		extraOutputs=None,
 	):
+		"""
+		extraOutputs: list of (filename, format) tuples, to write into
+			in the same conversion, reading input file only once
+		"""
 		if not prefOptions:
 			prefOptions = {}
 		if not readOptions:
@@ -276,6 +281,18 @@ class UI(UIBase):
 			self.setText("Reversing: ")
 			self.pbar.update_step = 0.1
 			self.reverseLoop(savePath=outputFilename)
+		elif extraOutputs:
+			finalOutputFiles = self.glos.convertMulti(
+				inputFilename,
+				[(outputFilename, outputFormat, writeOptions)] + [
+					(filename, format, None)
+					for filename, format in extraOutputs
+				],
+				inputFormat=inputFormat,
+				readOptions=readOptions,
+				**convertOptions
+			)
+			return bool(finalOutputFiles)
 		else:
 			finalOutputFile = self.glos.convert(
 				inputFilename,
@@ -70,7 +70,7 @@ _ = str  # later replace with translator function
 
 def getCompressedFileExt(fpath):
 	fname, ext = splitext(fpath.lower())
-	if ext in (".gz", ".bz2", ".zip"):
+	if ext in (".gz", ".bz2", ".xz", ".zip"):
 		fname, ext = splitext(fname)
 	return ext
 